@@ -36,10 +36,9 @@ for airport_code, airport_name in origin_airports:
 
         if flights:
             # Add airport info to each flight for later display
-            for flight in flights:
-                flight._origin_airport = airport_name
-                flight._origin_code = airport_code
-            all_flights.extend(flights)
+            all_flights.extend(
+                flight.with_search_origin(airport_code, airport_name) for flight in flights
+            )
 
         # Get cheapest return flights for this day (return 2-4 days later)
         return_date_from = search_date + timedelta(days=return_days_min)
@@ -53,10 +52,9 @@ for airport_code, airport_name in origin_airports:
 
         if trips:
             # Add airport info to each trip for later display
-            for trip in trips:
-                trip._origin_airport = airport_name
-                trip._origin_code = airport_code
-            all_trips.extend(trips)
+            all_trips.extend(
+                trip.with_search_origin(airport_code, airport_name) for trip in trips
+            )
 
 print(f"\n✈️  Found {len(all_flights)} one-way flights and {len(all_trips)} return trips from all airports")
 print("=" * 80)
@@ -73,14 +71,12 @@ for flight in all_flights:
 # Add outbound legs of return trips
 for trip in all_trips:
     flight = trip.outbound
-    flight._origin_code = trip._origin_code
     if flight.price <= 30:
         outbound_flights.append(('return-outbound', flight, flight.price))
 
 # Add inbound legs of return trips
 for trip in all_trips:
-    flight = trip.inbound
-    flight._origin_code = trip._origin_code  # This will be the return destination (searched airport)
+    flight = trip.inbound  # searchOrigin is the return destination (searched airport)
     # Limit return-in flights to 2026-01-05
     if flight.departureTime.date() <= datetime(2026, 2, 5).date() and flight.price <= 30:
         inbound_flights.append(('return-inbound', flight, flight.price))
@@ -100,7 +96,7 @@ for i, (flight_type, flight, price) in enumerate(outbound_flights, 1):
     origin_city = flight.originFull.split(',')[0] if ',' in flight.originFull else flight.originFull
     dest_city = flight.destinationFull.split(',')[0] if ',' in flight.destinationFull else flight.destinationFull
     type_label = "ONE-WAY" if flight_type == 'one-way' else "RETURN-OUT"
-    print(f"{i:3d}. [{type_label}] {departure_datetime} {price}€ {origin_city} ({flight._origin_code}) → {dest_city} ({flight.destination})")
+    print(f"{i:3d}. [{type_label}] {departure_datetime} {price}€ {origin_city} ({flight.searchOrigin}) → {dest_city} ({flight.destination})")
 
 print("\n" + "=" * 80)
 
@@ -112,7 +108,7 @@ for i, (flight_type, flight, price) in enumerate(inbound_flights, 1):
     departure_datetime = flight.departureTime.strftime('%Y-%m-%d %H:%M')
     origin_city = flight.originFull.split(',')[0] if ',' in flight.originFull else flight.originFull
     dest_city = flight.destinationFull.split(',')[0] if ',' in flight.destinationFull else flight.destinationFull
-    print(f"{i:3d}. [RETURN-IN]  {departure_datetime} {price}€ {origin_city} ({flight.origin}) → {dest_city} ({flight._origin_code})")
+    print(f"{i:3d}. [RETURN-IN]  {departure_datetime} {price}€ {origin_city} ({flight.origin}) → {dest_city} ({flight.searchOrigin})")
 
 print("\n" + "=" * 80)
 print("📊 SUMMARY:")
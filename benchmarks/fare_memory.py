@@ -0,0 +1,166 @@
+"""
+Memory used per parsed fare for a large sweep, with the current ``Flight``/``Trip`` types compared against the plain
+(dict-backed, monkey-patched) dataclasses they replaced.
+
+    python benchmarks/fare_memory.py --fares 100000
+"""
+import argparse
+import json
+import random
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from os import path
+
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from ryanair.ryanair import _RyanairBase  # noqa: E402
+from ryanair.types import Flight, Trip  # noqa: E402
+
+
+@dataclass
+class _PlainFlight:
+    departureTime: datetime
+    flightNumber: str
+    price: float
+    currency: str
+    origin: str
+    originFull: str
+    destination: str
+    destinationFull: str
+
+
+@dataclass
+class _PlainTrip:
+    totalPrice: float
+    outbound: _PlainFlight
+    inbound: _PlainFlight
+
+
+def _airport(i):
+    return {
+        "countryName": f"Country {i % 40}",
+        "iataCode": "".join(chr(ord("A") + i // 26**k % 26) for k in (2, 1, 0)),
+        "name": f"Airport {i}",
+        "seoName": f"airport-{i}",
+        "city": {"name": f"City {i}", "code": f"CITY{i}", "countryCode": "xx"},
+    }
+
+
+def _leg(rng, origin, destination, day):
+    return {
+        "departureAirport": origin,
+        "arrivalAirport": destination,
+        "departureDate": (
+            day + timedelta(minutes=rng.randrange(0, 1440, 5))
+        ).isoformat(),
+        "arrivalDate": (day + timedelta(hours=26)).isoformat(),
+        "price": {
+            "value": round(rng.uniform(10, 300), 2),
+            "valueMainUnit": "10",
+            "valueFractionalUnit": "00",
+            "currencyCode": "EUR",
+            "currencySymbol": "€",
+        },
+        "flightKey": "FR~1234~ ~~DUB~08/23/2023 08:20~BRS~08/23/2023 09:30~~",
+        "flightNumber": f"FR{rng.randrange(100, 9999)}",
+        "previousPrice": None,
+        "priceUpdated": 1692369051000,
+    }
+
+
+def synthetic_fares(n, n_airports=300, seed=0):
+    """``n`` round-trip fares in the shape of the ``fares`` array, each decoded separately like a real sweep."""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    chunk = []
+    for _ in range(n):
+        origin, destination = rng.sample(range(n_airports), 2)
+        day = start + timedelta(days=rng.randrange(365))
+        chunk.append(
+            {
+                "outbound": _leg(rng, _airport(origin), _airport(destination), day),
+                "inbound": _leg(
+                    rng,
+                    _airport(destination),
+                    _airport(origin),
+                    day + timedelta(days=3),
+                ),
+                "summary": {"price": {"value": 0}},
+            }
+        )
+    # Round-trip through JSON so strings are distinct objects, as they are when decoded from responses
+    return json.loads(json.dumps(chunk))
+
+
+def _plain_flight(flight):
+    return _PlainFlight(
+        origin=flight["departureAirport"]["iataCode"],
+        originFull=", ".join(
+            (
+                flight["departureAirport"]["name"],
+                flight["departureAirport"]["countryName"],
+            )
+        ),
+        destination=flight["arrivalAirport"]["iataCode"],
+        destinationFull=", ".join(
+            (flight["arrivalAirport"]["name"], flight["arrivalAirport"]["countryName"])
+        ),
+        departureTime=datetime.fromisoformat(flight["departureDate"]),
+        flightNumber=f"{flight['flightNumber'][:2]} {flight['flightNumber'][2:]}",
+        price=flight["price"]["value"],
+        currency=flight["price"]["currencyCode"],
+    )
+
+
+def build_plain(fares):
+    trips = []
+    for fare in fares:
+        outbound, inbound = _plain_flight(fare["outbound"]), _plain_flight(
+            fare["inbound"]
+        )
+        trip = _PlainTrip(
+            totalPrice=outbound.price + inbound.price,
+            outbound=outbound,
+            inbound=inbound,
+        )
+        trip._origin_airport = outbound._origin_airport = "Searched Airport"
+        trip._origin_code = outbound._origin_code = "SRC"
+        trips.append(trip)
+    return trips
+
+
+def build_current(fares):
+    parser = _RyanairBase(currency="EUR")
+    return [
+        trip.with_search_origin("SRC", "Searched Airport")
+        for trip in parser._parse_cheapest_return_flights(fares)
+    ]
+
+
+def measure(build, fares):
+    tracemalloc.start()
+    result = build(fares)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return retained / len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fares", type=int, default=100_000)
+    args = parser.parse_args()
+
+    fares = synthetic_fares(args.fares)
+    before = measure(build_plain, fares)
+    after = measure(build_current, fares)
+    print(f"{args.fares} round-trip fares (retained bytes per fare, incl. both legs)")
+    print(f"  plain dataclasses + monkey-patched labels: {before:8.0f}")
+    print(
+        f"  slotted Flight/Trip, interned strings:     {after:8.0f}  ({after / before:.0%})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+"""
+Timings of the parsing and computation hot paths, saved as JSON and compared against a saved baseline.
+
+    python benchmarks/hot_paths.py run --output baseline.json
+    python benchmarks/hot_paths.py run --output current.json
+    python benchmarks/hot_paths.py compare baseline.json current.json --threshold 0.1
+
+``compare`` exits with status 1 if any benchmark got slower than the baseline by more than the threshold.
+"""
+import argparse
+import atexit
+import json
+import os
+import platform
+import random
+import sys
+import timeit
+from datetime import datetime, timedelta, timezone
+from os import path
+
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+import travel_helper  # noqa: E402
+from ryanair import airport_utils, decoding  # noqa: E402
+from ryanair.airport_utils import Airport, _haversine, load_airports  # noqa: E402
+from ryanair.fake_server import synthetic_fares_response  # noqa: E402
+from ryanair.ryanair import _RyanairBase  # noqa: E402
+from ryanair.types import Flight  # noqa: E402
+
+ONE_WAY_URL = "https://services-api.ryanair.com/farfnd/v4/oneWayFares"
+ROUND_TRIP_URL = "https://services-api.ryanair.com/farfnd/v4/roundTripFares"
+QUERY = {
+    "departureAirportIataCode": "CGN",
+    "outboundDepartureDateFrom": "2024-01-01",
+    "outboundDepartureDateTo": "2024-03-31",
+    "inboundDepartureDateFrom": "2024-01-03",
+    "inboundDepartureDateTo": "2024-04-04",
+}
+
+# name -> setup(size) returning the zero-argument callable to time
+BENCHMARKS = {}
+
+
+class SkipBenchmark(Exception):
+    """A benchmark can't run here, e.g. because an optional dependency is missing."""
+
+
+def benchmark(name, sizes=(None,)):
+    def register(setup):
+        for size in sizes:
+            BENCHMARKS[name if size is None else f"{name}[{size}]"] = (setup, size)
+        return setup
+
+    return register
+
+
+def _fares(url, n):
+    # Round-trip through JSON so strings are distinct objects, as they are when decoded from responses
+    return json.loads(
+        json.dumps(synthetic_fares_response(url, QUERY, destinations=n)["fares"])
+    )
+
+
+def _airports():
+    """The airports table, or a synthetic one in its shape if ``airports.csv`` isn't installed."""
+    airports = load_airports()
+    if not airports:
+        rng = random.Random(0)
+        for code in (
+            "CGN",
+            "NRN",
+            *("".join(rng.sample("ABCDEFGHIJKLMNOPQRSTUVWXYZ", 3)) for _ in range(500)),
+        ):
+            airports[code] = Airport(
+                IATA_code=code,
+                lat=rng.uniform(27, 65),
+                lng=rng.uniform(-20, 35),
+                location="XX-1,XX",
+            )
+    return airports
+
+
+@benchmark("parse_cheapest_flight", sizes=(10_000,))
+def _parse_cheapest_flight(n):
+    parser = _RyanairBase(currency="EUR")
+    legs = [fare["outbound"] for fare in _fares(ONE_WAY_URL, n)]
+    return lambda: [parser._parse_cheapest_flight(leg) for leg in legs]
+
+
+@benchmark("parse_cheapest_return_flights_as_trip", sizes=(10_000,))
+def _parse_return_trip(n):
+    parser = _RyanairBase(currency="EUR")
+    fares = _fares(ROUND_TRIP_URL, n)
+    return lambda: [
+        parser._parse_cheapest_return_flights_as_trip(fare["outbound"], fare["inbound"])
+        for fare in fares
+    ]
+
+
+@benchmark("decode_and_parse_return_trips", sizes=("json", "orjson", "msgspec"))
+def _decode_and_parse(decoder):
+    """Response body to ``Trip`` objects, per 10k round-trip fares."""
+    parser = _RyanairBase(currency="EUR")
+    body = json.dumps({"fares": _fares(ROUND_TRIP_URL, 10_000)}).encode("utf8")
+    if decoder == "json":
+        return lambda: parser._parse_cheapest_return_flights(json.loads(body)["fares"])
+    if decoder == "orjson":
+        if decoding.orjson is None:
+            raise SkipBenchmark("orjson is not installed")
+        return lambda: parser._parse_cheapest_return_flights(
+            decoding.orjson.loads(body)["fares"]
+        )
+    if decoding.msgspec is None:
+        raise SkipBenchmark("msgspec is not installed")
+    return lambda: parser._parse_typed_return_flights(decoding.decode_fares(body))
+
+
+@benchmark("parse_return_trips_to_frame", sizes=("objects", "columns", "processes"))
+def _parse_to_frame(mode):
+    """Forty response bodies of 2.5k round-trip fares to a ``FareFrame``, parsed into ``Trip`` objects, into
+    columns in this process, or into columns in a pool of one worker process per core.
+    """
+    try:
+        from ryanair.frame import FareFrame
+        from ryanair.parallel import FareParserPool
+    except ImportError:
+        raise SkipBenchmark("numpy is not installed")
+
+    bodies = [
+        json.dumps(
+            synthetic_fares_response(
+                ROUND_TRIP_URL,
+                {**QUERY, "departureAirportIataCode": f"A{i:02}"},
+                destinations=2_500,
+            )
+        ).encode("utf8")
+        for i in range(40)
+    ]
+    if mode == "objects":
+        parser = _RyanairBase(currency="EUR")
+        return lambda: FareFrame.from_fares(
+            [
+                trip
+                for body in bodies
+                for trip in parser._decode_and_parse(
+                    body,
+                    parser._parse_cheapest_return_flights,
+                    parser._parse_typed_return_flights,
+                )
+            ]
+        )
+    pool = FareParserPool(processes=0 if mode == "columns" else os.cpu_count())
+    atexit.register(pool.close)
+    return lambda: pool.parse(bodies, is_return=True)
+
+
+@benchmark("load_airports")
+def _load_airports(_):
+    if not load_airports():
+        raise SkipBenchmark("airports.csv is not installed")
+
+    def run():
+        airport_utils.AIRPORTS = None
+        return load_airports()
+
+    return run
+
+
+@benchmark("haversine", sizes=(10_000,))
+def _haversine_many(n):
+    rng = random.Random(0)
+    points = [
+        (
+            rng.uniform(-90, 90),
+            rng.uniform(-180, 180),
+            rng.uniform(-90, 90),
+            rng.uniform(-180, 180),
+        )
+        for _ in range(n)
+    ]
+    return lambda: [_haversine(*point) for point in points]
+
+
+@benchmark("flight_duration_str", sizes=(1_000,))
+def _flight_duration_str(n):
+    rng = random.Random(0)
+    codes = sorted(_airports())
+    pairs = [tuple(rng.sample(codes, 2)) for _ in range(n)]
+    return lambda: [
+        travel_helper._flight_duration_str(origin, destination)
+        for origin, destination in pairs
+    ]
+
+
+@benchmark("parse_price_night", sizes=(10_000,))
+def _parse_price_night(n):
+    rng = random.Random(0)
+    formats = ("€{:.0f}", "€{:.2f}", "{:.0f} €", "EUR {:,.2f}", "")
+    hotels = [
+        {"Price Per Night": rng.choice(formats).format(rng.uniform(20, 2000))}
+        if i % 10
+        else {}
+        for i in range(n)
+    ]
+    return lambda: [travel_helper._parse_price_night(hotel) for hotel in hotels]
+
+
+@benchmark("extract_array_from_text", sizes=(500,))
+def _extract_array_from_text(n):
+    try:
+        from trivago.fetch_hotels_mcp import extract_array_from_text
+    except ImportError:
+        raise SkipBenchmark("mcp is not installed")
+
+    rng = random.Random(0)
+    hotels = [
+        {
+            "Accommodation Name": f"Hotel {i} [City Centre]",
+            "Accommodation URL": f"https://www.trivago.com/en-US/oar/hotel-{i}?search=200-{i}",
+            "Price Per Night": f"€{rng.randrange(20, 500)}",
+            "Price Per Stay": f"€{rng.randrange(60, 2000)}",
+            "Review Rating": f"{rng.uniform(5, 10):.1f}",
+        }
+        for i in range(n)
+    ]
+    text = "map[output:" + json.dumps(hotels, indent=2, ensure_ascii=False) + "]"
+    return lambda: extract_array_from_text(text)
+
+
+@benchmark("build_html", sizes=(10, 100, 1_000))
+def _build_html(n):
+    rng = random.Random(0)
+    codes = sorted(_airports())
+
+    def flight(origin, destination, departure, price):
+        return Flight(
+            departureTime=departure,
+            flightNumber=f"FR {rng.randrange(100, 9999)}",
+            price=price,
+            currency="EUR",
+            origin=origin,
+            originFull=f"{origin} Airport, Germany",
+            destination=destination,
+            destinationFull=f"{destination} Airport, Somewhere",
+        )
+
+    trips = []
+    for _ in range(n):
+        origin, destination = rng.choice(("CGN", "NRN")), rng.choice(codes)
+        departure = datetime(2024, 1, 4, 18) + timedelta(days=7 * rng.randrange(16))
+        outbound = flight(
+            origin, destination, departure, round(rng.uniform(10, 300), 2)
+        )
+        inbound = flight(
+            destination,
+            origin,
+            departure + timedelta(days=3),
+            round(rng.uniform(10, 300), 2),
+        )
+        trips.append((outbound, inbound, outbound.price))
+    trips.sort(key=lambda trip: trip[2] + trip[1].price)
+    return lambda: travel_helper._build_html(trips, [])
+
+
+def time_call(func, repeat=5):
+    """Best time per call over ``repeat`` runs, each of as many calls as fill about 0.2 seconds."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    return {"seconds": best, "number": number, "repeat": repeat}
+
+
+def run(names=None, repeat=5, log=sys.stderr):
+    results = {}
+    for name, (setup, size) in BENCHMARKS.items():
+        if names and not any(selected in name for selected in names):
+            continue
+        try:
+            func = setup(size)
+        except SkipBenchmark as e:
+            print(f"{name:45} skipped: {e}", file=log)
+            continue
+        results[name] = time_call(func, repeat)
+        print(f"{name:45} {results[name]['seconds'] * 1000:10.3f} ms", file=log)
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.1) -> list:
+    """
+    ``(name, baseline seconds, current seconds, status)`` for every benchmark in either run, where status is
+    ``"regression"`` or ``"improvement"`` if the time changed by more than ``threshold`` (a fraction of the
+    baseline), ``"ok"`` if it didn't, and ``"new"``/``"missing"`` if only one of the runs has it.
+    """
+    before, after = baseline["results"], current["results"]
+    rows = []
+    for name in sorted(set(before) | set(after)):
+        old = before.get(name, {}).get("seconds")
+        new = after.get(name, {}).get("seconds")
+        if old is None:
+            status = "new"
+        elif new is None:
+            status = "missing"
+        elif new > old * (1 + threshold):
+            status = "regression"
+        elif new < old * (1 - threshold):
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append((name, old, new, status))
+    return rows
+
+
+def _format_ms(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:.3f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser(
+        "run", help="run the benchmarks and save the results"
+    )
+    run_parser.add_argument(
+        "--output", "-o", metavar="PATH", help="results file (default: print to stdout)"
+    )
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument(
+        "names", nargs="*", help="only run benchmarks whose names contain one of these"
+    )
+
+    compare_parser = commands.add_parser(
+        "compare", help="compare results against a baseline"
+    )
+    compare_parser.add_argument("baseline", metavar="BASELINE")
+    compare_parser.add_argument("current", metavar="CURRENT")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="slowdown flagged as a regression, as a fraction (default: 0.1)",
+    )
+    args = parser.parse_args()
+
+    if args.command == "run":
+        results = run(args.names, args.repeat)
+        if args.output:
+            with open(args.output, "w", encoding="utf8") as f:
+                json.dump(results, f, indent=2)
+        else:
+            print(json.dumps(results, indent=2))
+        return
+
+    with open(args.baseline, encoding="utf8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf8") as f:
+        current = json.load(f)
+    rows = compare(baseline, current, args.threshold)
+    print(f"{'benchmark':45} {'baseline ms':>12} {'current ms':>12} {'change':>8}")
+    for name, old, new, status in rows:
+        change = f"{new / old - 1:+.1%}" if old and new is not None else ""
+        flag = "" if status == "ok" else f"  {status.upper()}"
+        print(
+            f"{name:45} {_format_ms(old):>12} {_format_ms(new):>12} {change:>8}{flag}"
+        )
+    if any(status == "regression" for *_, status in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
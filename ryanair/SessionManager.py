@@ -1,16 +1,412 @@
+import abc
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from http.cookiejar import CookieJar
+from typing import Dict, Optional, Tuple
+
 import requests
+from requests.adapters import HTTPAdapter
+from requests.cookies import RequestsCookieJar, create_cookie
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+logger = logging.getLogger("ryanair")
+
+DEFAULT_COOKIE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "ryanair-py", "session.json"
+)
+
+
+class _SharedCookies:
+    """Session cookies bootstrapped once and shared by every SessionManager using the same cookie file."""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.jar = RequestsCookieJar()
+        self.expires_at = 0.0
+        self.bootstrapped_at = 0.0
+        self.loaded = False
+        self.lock = threading.RLock()
+
+    def valid(self) -> bool:
+        return time.time() < self.expires_at
+
+    def set(self, jar: CookieJar, max_age: float, persist: bool = True):
+        now = time.time()
+        cookies = list(jar)
+        expiries = [cookie.expires for cookie in cookies if cookie.expires]
+        self.jar.clear()
+        for cookie in cookies:
+            self.jar.set_cookie(cookie)
+        self.bootstrapped_at = now
+        self.expires_at = min([now + max_age] + expiries)
+        if persist:
+            self._save()
+
+    def invalidate(self):
+        self.jar.clear()
+        self.expires_at = 0.0
+
+    def load(self):
+        self.loaded = True
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf8") as f:
+                stored = json.load(f)
+            self.jar.clear()
+            for cookie in stored["cookies"]:
+                self.jar.set_cookie(create_cookie(**cookie))
+            self.expires_at = stored["expires_at"]
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable session cookies {self.path}: {e}")
+
+    def _save(self):
+        if not self.path:
+            return
+        stored = {
+            "expires_at": self.expires_at,
+            "cookies": [
+                {
+                    "name": cookie.name,
+                    "value": cookie.value,
+                    "domain": cookie.domain,
+                    "path": cookie.path,
+                    "expires": cookie.expires,
+                    "secure": cookie.secure,
+                }
+                for cookie in self.jar
+            ],
+        }
+        try:
+            directory = os.path.dirname(self.path) or "."
+            os.makedirs(directory, exist_ok=True)
+            # mkstemp creates the file readable by its owner only, which suits cookies
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf8") as f:
+                json.dump(stored, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"Could not persist session cookies to {self.path}: {e}")
+
+
+class Transport(abc.ABC):
+    """
+    How a :class:`SessionManager` talks HTTP. Every transport applies the same timeouts: ``connect_timeout`` to
+    establish a connection and ``read_timeout`` between bytes received, so a hung request fails (and is retried)
+    instead of stalling a whole sweep. Subclasses implement :meth:`new_session`.
+    """
+
+    # Whether requests need the cookies set by the main website; transports that don't talk to Ryanair skip the visit
+    needs_session_cookies = True
+
+    def __init__(self, connect_timeout: float = 5.0, read_timeout: float = 30.0):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        return self.connect_timeout, self.read_timeout
+
+    def httpx_timeout(self) -> "httpx.Timeout":
+        return httpx.Timeout(self.read_timeout, connect=self.connect_timeout, pool=None)
+
+    @abc.abstractmethod
+    def new_session(self, manager: "SessionManager"):
+        """A ``requests.Session``-like object for one thread, sending the cookies of ``manager``."""
+
+    def async_transport(self, limits: "httpx.Limits") -> "httpx.AsyncBaseTransport":
+        """The ``httpx`` transport :class:`~ryanair.AsyncRyanair` sends its requests through."""
+        return httpx.AsyncHTTPTransport(limits=limits)
+
+    def close(self):
+        pass
+
+
+class RequestsTransport(Transport):
+    """
+    ``requests`` over HTTP/1.1. All sessions (one per thread) share one connection pool, keeping up to
+    ``pool_maxsize`` keep-alive connections per host; ``pool_block`` makes requests wait for a free connection
+    rather than open extra ones that are discarded afterwards.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 32,
+        pool_block: bool = False,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+    ):
+        super().__init__(connect_timeout, read_timeout)
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self._adapter = None
+        self._lock = threading.Lock()
+
+    def new_session(self, manager: "SessionManager"):
+        with self._lock:
+            if self._adapter is None:
+                self._adapter = self._new_adapter()
+        session = _LazySession(
+            manager if self.needs_session_cookies else None, self.timeout
+        )
+        session.cookies = manager.cookies
+        session.mount("https://", self._adapter)
+        session.mount("http://", self._adapter)
+        return session
+
+    def _new_adapter(self) -> HTTPAdapter:
+        return HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block,
+        )
+
+    def async_transport(self, limits: "httpx.Limits") -> "httpx.AsyncBaseTransport":
+        if type(self)._new_adapter is not RequestsTransport._new_adapter:
+            # Requests would skip whatever the custom adapter does, e.g. go to the live API instead of a recording
+            raise TypeError(
+                f"{type(self).__name__} sends requests through a custom adapter, which AsyncRyanair can't use; "
+                f"override async_transport() to support it"
+            )
+        return super().async_transport(limits)
+
+    def close(self):
+        if self._adapter is not None:
+            self._adapter.close()
+
+
+class HTTP2Transport(Transport):
+    """
+    ``httpx`` over HTTP/2: concurrent requests from all threads are multiplexed as streams over a single connection
+    per host (at most ``max_connections`` in total). Requires ``httpx`` with HTTP/2 support
+    (``pip install ryanair-py[http2]``).
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 10,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+    ):
+        if httpx is None:
+            raise ImportError(
+                "HTTP2Transport requires httpx, install it with `pip install httpx[http2]`"
+            )
+        super().__init__(connect_timeout, read_timeout)
+        self.max_connections = max_connections
+        self._client = None
+        self._lock = threading.Lock()
+
+    def new_session(self, manager: "SessionManager"):
+        with self._lock:
+            if self._client is None:
+                # httpx.Client is thread-safe, so every session shares it (and its connections)
+                self._client = httpx.Client(
+                    http2=True,
+                    limits=httpx.Limits(max_connections=self.max_connections),
+                    timeout=self.httpx_timeout(),
+                    cookies=manager.cookies,
+                )
+        return _HTTP2Session(manager, self._client)
+
+    def async_transport(self, limits: "httpx.Limits") -> "httpx.AsyncBaseTransport":
+        return httpx.AsyncHTTPTransport(limits=limits, http2=True)
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+
+class _LazySession(requests.Session):
+    """A requests.Session that makes sure the session cookies are bootstrapped before its first request."""
+
+    def __init__(
+        self,
+        manager: Optional["SessionManager"],
+        timeout: Optional[Tuple[float, float]] = None,
+    ):
+        super().__init__()
+        self._manager = manager
+        self._timeout = timeout
+
+    def request(self, method, url, *args, **kwargs):
+        if (
+            self._manager is not None
+            and url != SessionManager.BASE_SITE_FOR_SESSION_URL
+        ):
+            self._manager.ensure_session()
+        if self._timeout is not None:
+            kwargs.setdefault("timeout", self._timeout)
+        return super().request(method, url, *args, **kwargs)
+
+
+class _HTTP2Response:
+    """The parts of ``requests.Response`` the clients use, for an ``httpx.Response``."""
+
+    def __init__(self, response: "httpx.Response"):
+        self._response = response
+
+    @property
+    def status_code(self) -> int:
+        return self._response.status_code
+
+    @property
+    def headers(self):
+        return self._response.headers
+
+    @property
+    def content(self) -> bytes:
+        return self._response.content
+
+    def iter_content(self, chunk_size: Optional[int] = None):
+        return self._response.iter_bytes(chunk_size)
+
+    def raise_for_status(self):
+        if self._response.is_error:
+            # Surfaced like requests' errors, so error handling doesn't depend on the transport
+            raise requests.HTTPError(
+                f"{self.status_code} Error for url: {self._response.url}", response=self
+            )
+
+    def close(self):
+        self._response.close()
+
+
+class _HTTP2Session:
+    """``requests.Session``-like ``get`` over a shared ``httpx.Client``."""
+
+    def __init__(self, manager: "SessionManager", client: "httpx.Client"):
+        self._manager = manager
+        self._client = client
+
+    @property
+    def cookies(self):
+        return self._client.cookies.jar
+
+    def get(self, url, params=None, stream=False, **kwargs):
+        if url != SessionManager.BASE_SITE_FOR_SESSION_URL:
+            self._manager.ensure_session()
+        request = self._client.build_request("GET", url, params=params, **kwargs)
+        return _HTTP2Response(
+            self._client.send(request, stream=stream, follow_redirects=True)
+        )
 
 
 class SessionManager:
+    """
+    Session cookies for the Ryanair APIs, fetched by visiting the main website.
+
+    Nothing is fetched until the first request is made. The cookies are shared by all SessionManagers in the
+    process and persisted to ``cookie_path`` (``None`` to keep them in memory only) until they expire, so later
+    runs skip the website visit altogether. :meth:`refresh` fetches new ones when the old ones stop working.
+    Requests go through ``transport``, by default a :class:`RequestsTransport`.
+    """
+
     BASE_SITE_FOR_SESSION_URL = "https://www.ryanair.com/ie/en"
+    COOKIE_PATH = DEFAULT_COOKIE_PATH
+    # Upper bound on how long cookies are reused, even if they claim to last longer
+    SESSION_MAX_AGE = 12 * 60 * 60
+    # Don't visit the website again when another thread has just refreshed the cookies
+    MIN_REFRESH_INTERVAL = 60
+
+    _shared: Dict[Optional[str], _SharedCookies] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self, cookie_path: Optional[str] = ..., transport: Optional[Transport] = None
+    ):
+        path = self.COOKIE_PATH if cookie_path is ... else cookie_path
+        self.transport = transport if transport is not None else RequestsTransport()
+        with SessionManager._shared_lock:
+            if path not in SessionManager._shared:
+                SessionManager._shared[path] = _SharedCookies(path)
+            self._cookies = SessionManager._shared[path]
+        self.session = self._lazy_session()
+
+    @property
+    def cookies(self) -> RequestsCookieJar:
+        return self._cookies.jar
+
+    def ensure_session(self):
+        """Make sure valid session cookies are available, visiting the main website only if needed."""
+        shared = self._cookies
+        if shared.valid():
+            return
+        with shared.lock:
+            if not shared.loaded:
+                shared.load()
+            if not shared.valid():
+                self._bootstrap()
+
+    def refresh(self):
+        """Replace the session cookies, e.g. after a request was refused because the session expired."""
+        shared = self._cookies
+        with shared.lock:
+            if self.recently_refreshed():
+                return
+            logger.info("Refreshing the Ryanair session cookies")
+            shared.invalidate()
+            self._bootstrap()
 
-    def __init__(self):
-        self.session = requests.Session()
+    def recently_refreshed(self) -> bool:
+        return time.time() - self._cookies.bootstrapped_at < self.MIN_REFRESH_INTERVAL
+
+    def valid_cookies(self) -> Optional[RequestsCookieJar]:
+        """The shared session cookies if they (in memory or on disk) are still valid, without fetching new ones."""
+        shared = self._cookies
+        with shared.lock:
+            if not shared.loaded:
+                shared.load()
+            return shared.jar if shared.valid() else None
+
+    def store_cookies(self, jar: CookieJar):
+        """Share (and persist) session cookies bootstrapped by another client, e.g. ``AsyncRyanair``."""
+        if not isinstance(jar, CookieJar):
+            return
+        with self._cookies.lock:
+            self._set_cookies(jar)
+
+    def invalidate(self):
+        with self._cookies.lock:
+            self._cookies.invalidate()
+
+    def _bootstrap(self):
         self._update_session_cookie()
+        self._set_cookies(self._cookies.jar)
+
+    def _set_cookies(self, jar: CookieJar):
+        if len(jar):
+            self._cookies.set(jar, self.SESSION_MAX_AGE)
+            return
+        # Nothing worth saving for other runs; visit the website again after a while rather than on every request
+        logger.warning("The Ryanair website set no session cookies")
+        self._cookies.set(jar, self.MIN_REFRESH_INTERVAL, persist=False)
 
     def _update_session_cookie(self):
-        # Visit main website to get session cookies
-        self.session.get(self.BASE_SITE_FOR_SESSION_URL)
+        # Visit main website to get session cookies; a refused visit (e.g. by a WAF) leaves nothing to reuse
+        self.session.get(self.BASE_SITE_FOR_SESSION_URL).raise_for_status()
 
     def get_session(self):
         return self.session
+
+    def new_session(self):
+        # requests.Session isn't guaranteed to be thread-safe, so each thread gets its own,
+        # all sharing the bootstrapped cookie jar
+        return self._lazy_session()
+
+    def close(self):
+        self.transport.close()
+
+    def _lazy_session(self):
+        return self.transport.new_session(self)
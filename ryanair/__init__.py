@@ -1 +1 @@
-from ryanair.ryanair import Ryanair
+from ryanair.ryanair import Ryanair, AsyncRyanair
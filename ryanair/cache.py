@@ -0,0 +1,367 @@
+"""
+Response caches that can sit under the clients' ``_retryable_query``, so repeated identical queries are answered
+without going to the network (or through the retry/backoff machinery) at all.
+"""
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from datetime import date, datetime
+from datetime import time as dt_time
+from typing import Callable, Dict, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+logger = logging.getLogger("ryanair")
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "ryanair-py", "responses.sqlite3"
+)
+
+# Seconds a cached response stays fresh, per endpoint
+DEFAULT_TTLS = {
+    "oneWayFares": 60 * 60,
+    "roundTripFares": 60 * 60,
+    "cheapestPerDay": 3 * 60 * 60,
+    "routes": 24 * 60 * 60,
+}
+
+
+def endpoint_name(url: str) -> str:
+    """Short name of the API endpoint a URL points at, e.g. ``oneWayFares`` or ``cheapestPerDay``."""
+    segments = [segment for segment in urlparse(url).path.split("/") if segment]
+    for name in ("cheapestPerDay", "oneWayFares", "roundTripFares", "routes"):
+        if name in segments:
+            return name
+    return segments[-1] if segments else url
+
+
+def _canonical_value(value) -> str:
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, dt_time):
+        return value.strftime("%H:%M")
+    return str(value)
+
+
+def cache_key(url: str, params: Optional[dict] = None) -> str:
+    """Canonical form of a query, so ``date`` objects and their ISO strings (in any param order) share an entry."""
+    if not params:
+        return url
+    items = sorted((str(k), _canonical_value(v)) for k, v in params.items())
+    return url + "?" + "&".join(f"{k}={v}" for k, v in items)
+
+
+class SQLiteResponseCache:
+    """
+    On-disk response cache shared safely between processes: SQLite in WAL mode, zlib-compressed response bodies,
+    per-endpoint TTLs, and eviction of the oldest entries once the payloads exceed ``max_bytes``.
+
+    Freshness is decided when an entry is read, from its age: ``max_ages`` (per endpoint) lets one instance accept
+    older entries than its TTLs without changing how long other instances sharing the file consider them fresh.
+    Expired entries are kept for ``retain`` seconds (or the longest of ``max_ages``) before they are evicted.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        ttls: Optional[Dict[str, float]] = None,
+        default_ttl: float = 60 * 60,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_ages: Optional[Dict[str, float]] = None,
+        retain: float = 24 * 60 * 60,
+    ):
+        self.path = path
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.max_ages = dict(max_ages or {})
+        self.retain = max([retain, *self.max_ages.values()])
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._local = threading.local()
+        # Guards the counters, as threads share the cache (each with its own connection)
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, endpoint TEXT NOT NULL, created_at REAL NOT NULL, "
+                "expires_at REAL NOT NULL, size INTEGER NOT NULL, payload BLOB NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_created_at ON responses (created_at)"
+            )
+
+    def ttl_for(self, url: str) -> float:
+        return self.ttls.get(endpoint_name(url), self.default_ttl)
+
+    def max_age_for(self, url: str) -> float:
+        """How old an entry this instance serves, which is its TTL unless ``max_ages`` says otherwise."""
+        return self.max_ages.get(endpoint_name(url), self.ttl_for(url))
+
+    def get(
+        self, url: str, params: Optional[dict] = None, max_age: Optional[float] = None
+    ) -> Optional[bytes]:
+        """The cached response if it was stored less than ``max_age`` (default: :meth:`max_age_for`) seconds ago."""
+        entry = self.get_entry(url, params, max_age)
+        return entry[0] if entry is not None else None
+
+    def get_entry(
+        self, url: str, params: Optional[dict] = None, max_age: Optional[float] = None
+    ) -> Optional[Tuple[bytes, float]]:
+        """Like :meth:`get`, but the cached response together with the time it was stored."""
+        if max_age is None:
+            max_age = self.max_age_for(url)
+        try:
+            row = (
+                self._connection()
+                .execute(
+                    "SELECT payload, created_at FROM responses WHERE key = ? AND created_at > ?",
+                    (cache_key(url, params), time.time() - max_age),
+                )
+                .fetchone()
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache read failed: {e}")
+            return None
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return zlib.decompress(row[0]), row[1]
+
+    def get_or_fetch(
+        self, url: str, params: Optional[dict], fetch: Callable[[], bytes]
+    ) -> bytes:
+        value = self.get(url, params)
+        if value is None:
+            value = fetch()
+            self.set(url, params, value)
+        return value
+
+    def set(self, url: str, params: Optional[dict], value: bytes):
+        payload = zlib.compress(value)
+        now = time.time()
+        try:
+            with self._connection() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        cache_key(url, params),
+                        endpoint_name(url),
+                        now,
+                        now + self.ttl_for(url),
+                        len(payload),
+                        payload,
+                    ),
+                )
+                self._evict(conn, now)
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache write failed: {e}")
+
+    def clear(self):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM responses")
+
+    def _evict(self, conn, now):
+        expired = conn.execute(
+            "DELETE FROM responses WHERE expires_at <= ? AND created_at <= ?",
+            (now, now - self.retain),
+        ).rowcount
+        with self._lock:
+            self.evictions += expired
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[
+            0
+        ]
+        if total <= self.max_bytes:
+            return
+        # Drop the oldest entries until we're comfortably below the limit again
+        excess = total - int(self.max_bytes * 0.9)
+        freed = 0
+        doomed = []
+        for key, size in conn.execute(
+            "SELECT key, size FROM responses ORDER BY created_at"
+        ):
+            if freed >= excess:
+                break
+            doomed.append((key,))
+            freed += size
+        conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        with self._lock:
+            self.evictions += len(doomed)
+
+    def _connection(self):
+        # sqlite3 connections can't be shared between threads, so each thread opens its own
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+
+class _InFlight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class MemoryResponseCache:
+    """
+    In-process response cache with per-endpoint TTLs and LRU eviction, bounded by entry count and by the total
+    size of the cached response bodies.
+
+    :meth:`get_or_fetch` is single-flight: while a response is being fetched, other threads asking for the same
+    query wait for that fetch instead of issuing their own (counted in ``coalesced`` rather than ``misses``).
+    An optional ``backend`` (e.g. a
+    :class:`SQLiteResponseCache`) is consulted on misses and written through on stores.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 32 * 1024 * 1024,
+        ttls: Optional[Dict[str, float]] = None,
+        default_ttl: float = 60 * 60,
+        backend: Optional[SQLiteResponseCache] = None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.default_ttl = default_ttl
+        self.backend = backend
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+
+        # key -> (expires_at, size, value), least recently used first
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._in_flight: Dict[str, _InFlight] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def ttl_for(self, url: str) -> float:
+        return self.ttls.get(endpoint_name(url), self.default_ttl)
+
+    def get(self, url: str, params: Optional[dict] = None) -> Optional[bytes]:
+        key = cache_key(url, params)
+        with self._lock:
+            value = self._lookup(key)
+        if value is None and self.backend is not None:
+            value = self._read_through(key, url, params)
+        return value
+
+    def set(self, url: str, params: Optional[dict], value: bytes):
+        self._store(cache_key(url, params), url, value)
+        if self.backend is not None:
+            self.backend.set(url, params, value)
+
+    def get_or_fetch(
+        self, url: str, params: Optional[dict], fetch: Callable[[], bytes]
+    ) -> bytes:
+        key = cache_key(url, params)
+        with self._lock:
+            value = self._lookup(key, count_miss=False)
+            if value is not None:
+                return value
+            in_flight = self._in_flight.get(key)
+            leader = in_flight is None
+            if leader:
+                self.misses += 1
+                in_flight = self._in_flight[key] = _InFlight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            in_flight.done.wait()
+            if in_flight.error is not None:
+                raise in_flight.error
+            return in_flight.value
+
+        try:
+            value = self._read_through(key, url, params) if self.backend else None
+            if value is None:
+                value = fetch()
+                if self.backend is not None:
+                    self.backend.set(url, params, value)
+                self._store(key, url, value)
+            in_flight.value = value
+            return value
+        except BaseException as e:
+            in_flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            in_flight.done.set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _lookup(self, key, count_miss=True):
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self._remove(key)
+        if count_miss:
+            self.misses += 1
+        return None
+
+    def _read_through(self, key, url, params) -> Optional[bytes]:
+        entry = self.backend.get_entry(url, params)
+        if entry is None:
+            return None
+        value, created_at = entry
+        # Not kept any longer than the backend would have served it, however long it was there already
+        self._store(key, url, value, created_at + self.backend.max_age_for(url))
+        return value
+
+    def _store(self, key, url, value, expires_at: Optional[float] = None):
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        expires_at = min(
+            time.time() + self.ttl_for(url),
+            expires_at if expires_at is not None else math.inf,
+        )
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, size, value)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
+ResponseCache = Union[SQLiteResponseCache, MemoryResponseCache]
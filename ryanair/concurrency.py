@@ -0,0 +1,141 @@
+"""
+Adaptive limit on the number of requests in flight, so a sweep runs as fast as the upstream allows without tripping
+its throttling: the limit grows additively while requests succeed at normal latency and is cut multiplicatively on
+congestion (throttling, timeouts) or latency spikes.
+"""
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Callable, Optional
+
+
+class AIMDController:
+    """
+    Additive-increase/multiplicative-decrease concurrency limit, shared by the requests of one client.
+
+    A request completing at normal latency while the limit is in use raises the limit by ``1 / limit`` (about one
+    per round of requests); throttling, timeouts or a latency above ``latency_spike_ratio`` times the smoothed
+    latency multiply it by ``backoff_ratio``, at most once per round of requests. Other failures (e.g. a 404) only
+    free their slot. ``limit`` is the current value; ``increases`` counts the times it rose.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        backoff_ratio: float = 0.5,
+        latency_spike_ratio: float = 2.0,
+        smoothing: float = 0.1,
+    ):
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("Expected 1 <= min_limit <= initial_limit <= max_limit")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_spike_ratio = latency_spike_ratio
+        self.smoothing = smoothing
+
+        self.increases = 0
+        self.decreases = 0
+
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._latency = None
+        # Completions still to come from requests started before the last decrease; they don't cut the limit again
+        self._recovering = 0
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._async_condition = None
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def latency(self) -> Optional[float]:
+        """Smoothed latency of successful requests, in seconds."""
+        return self._latency
+
+    @contextmanager
+    def slot(self, is_congestion: Optional[Callable[[Exception], bool]] = None):
+        """Hold one of the ``limit`` slots (blocking until one is free) for the duration of a request."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+        start = time.monotonic()
+        succeeded = congested = False
+        try:
+            yield
+            succeeded = True
+        except Exception as e:
+            congested = bool(is_congestion and is_congestion(e))
+            raise
+        finally:
+            with self._condition:
+                self._on_done(time.monotonic() - start, succeeded, congested)
+                self._condition.notify_all()
+
+    @asynccontextmanager
+    async def async_slot(
+        self, is_congestion: Optional[Callable[[Exception], bool]] = None
+    ):
+        """:meth:`slot` for coroutines; the controller must then only be used from one event loop."""
+        if self._async_condition is None:
+            self._async_condition = asyncio.Condition()
+        async with self._async_condition:
+            await self._async_condition.wait_for(lambda: self._in_flight < self.limit)
+            with self._lock:
+                self._in_flight += 1
+        start = time.monotonic()
+        succeeded = congested = False
+        try:
+            yield
+            succeeded = True
+        except Exception as e:
+            congested = bool(is_congestion and is_congestion(e))
+            raise
+        finally:
+            with self._lock:
+                self._on_done(time.monotonic() - start, succeeded, congested)
+            async with self._async_condition:
+                self._async_condition.notify_all()
+
+    def _on_done(self, latency, succeeded, congested):
+        utilised = self._in_flight >= self._limit / 2
+        recovering = self._recovering > 0
+        self._in_flight -= 1
+        if recovering:
+            self._recovering -= 1
+
+        if not succeeded and not congested:
+            # Failed for a reason of its own: says nothing about the upstream's capacity or latency
+            return
+
+        if succeeded:
+            spike = (
+                self._latency is not None
+                and latency > self.latency_spike_ratio * self._latency
+            )
+            self._latency = (
+                latency
+                if self._latency is None
+                else self._latency + self.smoothing * (latency - self._latency)
+            )
+            if not spike:
+                if utilised and self._limit < self.max_limit:
+                    before = self.limit
+                    self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+                    if self.limit > before:
+                        self.increases += 1
+                return
+
+        if not recovering:
+            self._limit = max(self.min_limit, self._limit * self.backoff_ratio)
+            self._recovering = self._in_flight
+            self.decreases += 1
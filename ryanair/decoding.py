@@ -0,0 +1,67 @@
+"""
+Decoding of fare responses. With ``msgspec`` installed, the ``fares`` array is decoded in a single pass straight into
+typed records holding only the fields :class:`~ryanair.types.Flight` needs, skipping everything else in the payload.
+Otherwise responses are decoded into plain dicts, with ``orjson`` when it is installed and :mod:`json` when it isn't
+(``pip install ryanair-py[fast]``).
+"""
+import json
+from datetime import datetime
+from typing import List, Optional
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(body: bytes):
+    """``body`` decoded into plain Python objects."""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+if msgspec is not None:
+
+    class Airport(msgspec.Struct):
+        iataCode: str
+        name: str
+        countryName: str
+
+    class Price(msgspec.Struct):
+        value: float
+        currencyCode: str
+
+    class Leg(msgspec.Struct):
+        departureAirport: Airport
+        arrivalAirport: Airport
+        departureDate: datetime
+        flightNumber: str
+        price: Price
+
+    class Fare(msgspec.Struct):
+        outbound: Leg
+        inbound: Optional[Leg] = None
+
+    class _FaresResponse(msgspec.Struct):
+        fares: Optional[List[Fare]]
+
+    _fares_decoder = msgspec.json.Decoder(_FaresResponse)
+
+
+def decode_fares(body: bytes) -> Optional[list]:
+    """
+    The ``fares`` of a response body as typed ``Fare`` records, or None if msgspec isn't installed or the body
+    doesn't match the schema, in which case the caller should decode it with :func:`loads` instead.
+    """
+    if msgspec is None:
+        return None
+    try:
+        return _fares_decoder.decode(body).fares or []
+    except msgspec.DecodeError:
+        return None
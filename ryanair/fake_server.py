@@ -0,0 +1,384 @@
+"""
+A local stand-in for the Ryanair fares API, serving recorded (see :mod:`ryanair.replay`) or synthetic
+``oneWayFares``/``roundTripFares`` responses over real HTTP with configurable latency, jitter and injected errors,
+so the whole client stack (connection pooling, concurrency, retries, parsing) can be measured offline.
+
+    with FakeFareServer(latency=0.05, jitter=0.02, error_rate=0.01) as server:
+        api = Ryanair(transport=server.transport())
+"""
+import json
+import random
+import threading
+import time
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from requests.adapters import HTTPAdapter
+
+from ryanair.SessionManager import RequestsTransport
+from ryanair.cache import cache_key, endpoint_name
+from ryanair.replay import ExchangeStore, split_url
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# Hosts of the Ryanair APIs; requests to them are sent to the fake server instead
+UPSTREAMS = ("https://services-api.ryanair.com", "https://www.ryanair.com")
+
+_FILTER_PARAMS = ("arrivalAirportIataCode", "arrivalCountryCode", "priceValueTo")
+
+_COUNTRIES = (
+    ("ie", "Ireland"),
+    ("gb", "United Kingdom"),
+    ("es", "Spain"),
+    ("it", "Italy"),
+    ("de", "Germany"),
+    ("fr", "France"),
+    ("pt", "Portugal"),
+    ("pl", "Poland"),
+)
+
+
+def _airport(code: str) -> dict:
+    country_code, country_name = _COUNTRIES[sum(map(ord, code)) % len(_COUNTRIES)]
+    return {
+        "countryName": country_name,
+        "iataCode": code,
+        "name": f"Airport {code}",
+        "seoName": code.lower(),
+        "city": {"name": f"City {code}", "code": code, "countryCode": country_code},
+    }
+
+
+def _synthetic_code(i: int) -> str:
+    return "".join(chr(ord("A") + i // 26**k % 26) for k in (2, 1, 0))
+
+
+def _price(value: float, currency: str) -> dict:
+    main, fraction = f"{value:.2f}".split(".")
+    return {
+        "value": value,
+        "valueMainUnit": main,
+        "valueFractionalUnit": fraction,
+        "currencyCode": currency,
+        "currencySymbol": "€" if currency == "EUR" else currency,
+    }
+
+
+def _leg(
+    rng, origin, destination, date_from, date_to, time_from, time_to, currency
+) -> dict:
+    days = (date.fromisoformat(date_to) - date.fromisoformat(date_from)).days
+    day = datetime.fromisoformat(date_from) + timedelta(
+        days=rng.randint(0, max(days, 0))
+    )
+    start, end = (int(t[:2]) * 60 + int(t[3:5]) for t in (time_from, time_to))
+    departure = day + timedelta(minutes=rng.randint(start, max(start, end)))
+    arrival = departure + timedelta(minutes=rng.randrange(60, 240, 5))
+    flight_number = f"FR{rng.randrange(100, 9999)}"
+    price = round(rng.uniform(10, 300), 2)
+    return {
+        "departureAirport": _airport(origin),
+        "arrivalAirport": _airport(destination),
+        "departureDate": departure.isoformat(),
+        "arrivalDate": arrival.isoformat(),
+        "price": _price(price, currency),
+        "flightKey": f"FR~{flight_number[2:]}~ ~~{origin}~{departure:%m/%d/%Y %H:%M}~{destination}~~",
+        "flightNumber": flight_number,
+        "previousPrice": None,
+        "priceUpdated": 1692686097000,
+    }
+
+
+def synthetic_fares_response(
+    url: str, params: dict, destinations: int = 50, seed: int = 0
+) -> dict:
+    """
+    A deterministic response to a ``oneWayFares`` or ``roundTripFares`` query: the cheapest fare to each of up to
+    ``destinations`` synthetic airports, honouring the query's dates, departure times, destination filters and
+    ``priceValueTo``, ordered by price like the real API.
+    """
+    round_trip = endpoint_name(url) == "roundTripFares"
+    # Seeded without the filters, so filtering a query leaves the fares that pass unchanged
+    unfiltered = {k: v for k, v in params.items() if k not in _FILTER_PARAMS}
+    rng = random.Random(f"{seed}|{cache_key(url, unfiltered)}")
+    origin = params["departureAirportIataCode"]
+    currency = params.get("currency", "EUR")
+    max_price = float(params["priceValueTo"]) if params.get("priceValueTo") else None
+
+    fares = []
+    for i in range(destinations):
+        destination = _synthetic_code(i)
+        outbound = _leg(
+            rng,
+            origin,
+            destination,
+            params["outboundDepartureDateFrom"],
+            params["outboundDepartureDateTo"],
+            params.get("outboundDepartureTimeFrom", "00:00"),
+            params.get("outboundDepartureTimeTo", "23:59"),
+            currency,
+        )
+        fare = {"outbound": outbound}
+        total = outbound["price"]["value"]
+        if round_trip:
+            fare["inbound"] = _leg(
+                rng,
+                destination,
+                origin,
+                params["inboundDepartureDateFrom"],
+                params["inboundDepartureDateTo"],
+                params.get("inboundDepartureTimeFrom", "00:00"),
+                params.get("inboundDepartureTimeTo", "23:59"),
+                currency,
+            )
+            total = round(total + fare["inbound"]["price"]["value"], 2)
+        fare["summary"] = {
+            "price": _price(total, currency),
+            "previousPrice": None,
+            "newRoute": False,
+        }
+
+        if destination == origin:
+            continue
+        if params.get("arrivalAirportIataCode") not in (None, destination):
+            continue
+        country_code = outbound["arrivalAirport"]["city"]["countryCode"]
+        if params.get("arrivalCountryCode", country_code).lower() != country_code:
+            continue
+        if max_price is not None and total > max_price:
+            continue
+        fares.append(fare)
+
+    fares.sort(key=lambda fare: fare["summary"]["price"]["value"])
+    return {"arrivalAirportCategories": None, "fares": fares, "size": len(fares)}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_Server"
+
+    def do_GET(self):
+        fake = self.server.fake
+        delay, fail = fake._draw()
+        if delay:
+            time.sleep(delay)
+        if fail:
+            headers = {"Content-Type": "application/json"}
+            if fake.retry_after is not None:
+                headers["Retry-After"] = str(fake.retry_after)
+            return self._send(
+                fake.error_status, headers, b'{"message": "injected error"}'
+            )
+
+        status, headers, body = fake._respond(self.path)
+        self._send(status, headers, body)
+
+    def _send(self, status, headers, body):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, fake: "FakeFareServer"):
+        super().__init__(address, _Handler)
+        self.fake = fake
+
+
+class FakeFareServer:
+    """
+    Local HTTP server answering fare queries from ``recordings`` (a :class:`RecordingTransport` directory) when it
+    has the query, and with :func:`synthetic_fares_response` otherwise. Every response is delayed by ``latency``
+    plus up to ``jitter`` seconds either way, and answered with ``error_status`` (with a ``Retry-After`` of
+    ``retry_after`` seconds, if given) with probability ``error_rate``. Delays and errors are drawn from a generator
+    seeded with ``seed``. ``requests`` and ``errors`` count what was served.
+    """
+
+    def __init__(
+        self,
+        recordings: Optional[str] = None,
+        destinations: int = 50,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        retry_after: Optional[float] = None,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.store = ExchangeStore(recordings) if recordings else None
+        self.destinations = destinations
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.seed = seed
+        self.requests = 0
+        self.errors = 0
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), self)
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeFareServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def transport(self, **kwargs) -> RequestsTransport:
+        """A transport sending the client's requests to this server instead of the Ryanair APIs."""
+        return _FakeServerTransport(self.url, **kwargs)
+
+    def _draw(self):
+        with self._lock:
+            self.requests += 1
+            delay = max(
+                0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter)
+            )
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        return delay, fail
+
+    def _respond(self, path):
+        headers = {"Content-Type": "application/json"}
+        for upstream in UPSTREAMS:
+            url, params = split_url(upstream + path)
+            exchange = self.store.load(url, params) if self.store is not None else None
+            if exchange is not None:
+                return (
+                    exchange["status"],
+                    {**exchange["headers"], **headers},
+                    exchange["body"],
+                )
+
+        url, params = split_url(UPSTREAMS[0] + path)
+        if endpoint_name(url) in ("oneWayFares", "roundTripFares"):
+            try:
+                response = synthetic_fares_response(
+                    url, params, self.destinations, self.seed
+                )
+            except (KeyError, ValueError) as e:
+                body = json.dumps({"message": f"invalid query: {e}"}).encode("utf8")
+                return 400, headers, body
+            return 200, headers, json.dumps(response).encode("utf8")
+        return 404, headers, b'{"message": "not found"}'
+
+
+def _redirected(url: str, base_url: str) -> str:
+    for upstream in UPSTREAMS:
+        if url.startswith(upstream + "/"):
+            return base_url + url[len(upstream) :]
+    return url
+
+
+class _RedirectAdapter(HTTPAdapter):
+    def __init__(self, base_url: str, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url
+
+    def send(self, request, **kwargs):
+        request.url = _redirected(request.url, self.base_url)
+        return super().send(request, **kwargs)
+
+
+class _AsyncRedirectTransport(httpx.AsyncHTTPTransport if httpx else object):
+    """:class:`_RedirectAdapter` for ``AsyncRyanair``."""
+
+    def __init__(self, base_url: str, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url
+
+    async def handle_async_request(self, request):
+        request.url = httpx.URL(_redirected(str(request.url), self.base_url))
+        request.headers["Host"] = request.url.netloc.decode("ascii")
+        return await super().handle_async_request(request)
+
+
+class _FakeServerTransport(RequestsTransport):
+    # The fake server doesn't check cookies, and its own mustn't be saved as Ryanair's
+    needs_session_cookies = False
+
+    def __init__(self, base_url: str, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url
+
+    def _new_adapter(self) -> HTTPAdapter:
+        return _RedirectAdapter(
+            self.base_url,
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block,
+        )
+
+    def async_transport(self, limits):
+        return _AsyncRedirectTransport(self.base_url, limits=limits)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve fake Ryanair fares locally.")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--recordings", default=None, metavar="DIR")
+    parser.add_argument("--destinations", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.0, metavar="SECONDS")
+    parser.add_argument("--jitter", type=float, default=0.0, metavar="SECONDS")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = FakeFareServer(
+        recordings=args.recordings,
+        destinations=args.destinations,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed,
+        port=args.port,
+    )
+    print(
+        f"Serving fake fares on {server.url}, e.g. {server.url}/farfnd/v4/oneWayFares"
+    )
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+Columnar storage for large sets of fares, so filtering, ranking and grouping a sweep of hundreds of thousands of
+fares runs as a handful of NumPy operations instead of a Python loop over ``Flight``/``Trip`` objects.
+Requires ``numpy`` (``pip install ryanair-py[frame]``).
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Union
+
+from ryanair.ryanair import RyanairException
+from ryanair.types import Flight, Trip
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SECONDS_PER_DAY = 24 * 60 * 60
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+# 1970-01-01 was a Thursday
+_EPOCH_WEEKDAY = 3
+
+_LEG_PREFIXES = {"outbound": "", "inbound": "return_"}
+
+
+def _minute_of_day(t: Union[time, str]) -> int:
+    if isinstance(t, str):
+        t = time.fromisoformat(t)
+    return t.hour * 60 + t.minute
+
+
+def _epoch_seconds(departure_times, count: int) -> "np.ndarray":
+    # Departure times are local to the airport and naive, so they are stored as if they were UTC. Plain integer
+    # arithmetic is several times faster than having NumPy convert the datetime objects.
+    return np.fromiter(
+        (
+            (d.toordinal() - _EPOCH_ORDINAL) * SECONDS_PER_DAY
+            + d.hour * 3600
+            + d.minute * 60
+            + d.second
+            for d in departure_times
+        ),
+        dtype=np.int64,
+        count=count,
+    )
+
+
+class FareFrame:
+    """
+    Fares as NumPy columns, one row per ``Flight`` (or ``Trip``, for round trips):
+
+    - ``price``: the fare, or the total of both legs for trips
+    - ``departure``: outbound departure as seconds since the epoch (local time, naive)
+    - ``weekday`` (Monday is 0), ``hour`` and ``minute`` (minute of the day) of the outbound departure
+    - ``origin``, ``destination``: IATA codes of the outbound leg
+
+    Round trips also have ``outbound_price``, ``inbound_price`` and ``return_departure``, ``return_weekday``,
+    ``return_hour``, ``return_minute`` for the inbound leg. The fares the frame was built from are kept alongside,
+    so selections convert back to lists of the original objects without copying them.
+
+    Frames built from columns alone (e.g. by :class:`~ryanair.parallel.FareParserPool`) have no fares, but if they
+    also have the remaining fields of each leg (``flight_number``, ``currency``, ``origin_name``,
+    ``destination_name``, and ``return_origin``, ``return_destination`` and the ``return_`` fields for the inbound
+    leg, plus optionally ``search_origin`` and ``search_origin_name``), :meth:`to_list` builds them for the
+    selected rows.
+    """
+
+    def __init__(self, columns: Dict[str, "np.ndarray"], fares=None):
+        if np is None:
+            raise RyanairException(
+                "FareFrame requires numpy, install it with `pip install numpy`"
+            )
+        self.columns = columns
+        if fares is not None and not isinstance(fares, np.ndarray):
+            # An object array, so selections pick fares with the same fancy indexing as the columns
+            objects = np.empty(len(fares), dtype=object)
+            objects[:] = fares
+            fares = objects
+        self._fares = fares
+
+    @classmethod
+    def from_fares(cls, fares: Iterable[Union[Flight, Trip]]) -> "FareFrame":
+        fares = list(fares)
+        is_return = bool(fares) and hasattr(fares[0], "outbound")
+        outbound = [fare.outbound for fare in fares] if is_return else fares
+
+        columns = {
+            "price": np.fromiter(
+                (fare.totalPrice if is_return else fare.price for fare in fares),
+                dtype=np.float64,
+                count=len(fares),
+            ),
+            "origin": np.array([f.origin for f in outbound], dtype="U3"),
+            "destination": np.array([f.destination for f in outbound], dtype="U3"),
+        }
+        cls._add_departure_columns(
+            columns, "", (f.departureTime for f in outbound), len(fares)
+        )
+        if is_return:
+            inbound = [fare.inbound for fare in fares]
+            columns["outbound_price"] = np.fromiter(
+                (f.price for f in outbound), dtype=np.float64, count=len(fares)
+            )
+            columns["inbound_price"] = np.fromiter(
+                (f.price for f in inbound), dtype=np.float64, count=len(fares)
+            )
+            cls._add_departure_columns(
+                columns, "return_", (f.departureTime for f in inbound), len(fares)
+            )
+        return cls(columns, fares)
+
+    @staticmethod
+    def _add_departure_columns(columns, prefix, departure_times, count):
+        FareFrame._add_calendar_columns(
+            columns, prefix, _epoch_seconds(departure_times, count)
+        )
+
+    @staticmethod
+    def _add_calendar_columns(columns, prefix, departure):
+        """``departure`` (seconds since the epoch) and the weekday, minute and hour columns derived from it."""
+        days, seconds = np.divmod(departure, SECONDS_PER_DAY)
+        columns[f"{prefix}departure"] = departure
+        columns[f"{prefix}weekday"] = ((days + _EPOCH_WEEKDAY) % 7).astype(np.int8)
+        columns[f"{prefix}minute"] = (seconds // 60).astype(np.int16)
+        columns[f"{prefix}hour"] = (seconds // 3600).astype(np.int8)
+
+    def __len__(self):
+        return len(self.columns["price"])
+
+    def __getattr__(self, name):
+        try:
+            return self.__dict__["columns"][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __getitem__(self, index) -> "FareFrame":
+        """Select rows by boolean mask, integer indices or slice."""
+        rows = np.atleast_1d(np.arange(len(self))[index])
+        return FareFrame(
+            {name: column[rows] for name, column in self.columns.items()},
+            self._fares[rows] if self._fares is not None else None,
+        )
+
+    @property
+    def is_return(self) -> bool:
+        return "return_departure" in self.columns
+
+    def to_list(self) -> List[Union[Flight, Trip]]:
+        if self._fares is None:
+            if "flight_number" not in self.columns:
+                raise ValueError(
+                    "FareFrame was built from columns only and has no fares"
+                )
+            return self._fares_from_columns()
+        return self._fares.tolist()
+
+    def _fares_from_columns(self):
+        search_origins = [
+            self.columns[name].tolist() if name in self.columns else [None] * len(self)
+            for name in ("search_origin", "search_origin_name")
+        ]
+        if not self.is_return:
+            return [
+                Flight(*fields, searchOrigin=code, searchOriginName=name)
+                for *fields, code, name in zip(
+                    *self._leg_fields("", "price"), *search_origins
+                )
+            ]
+        outbound = zip(*self._leg_fields("", "outbound_price"))
+        inbound = zip(*self._leg_fields("return_", "inbound_price"))
+        return [
+            Trip(
+                totalPrice=total,
+                outbound=Flight(*out, searchOrigin=code, searchOriginName=name),
+                inbound=Flight(*back, searchOrigin=code, searchOriginName=name),
+                searchOrigin=code,
+                searchOriginName=name,
+            )
+            for total, out, back, code, name in zip(
+                self.price.tolist(), outbound, inbound, *search_origins
+            )
+        ]
+
+    def _leg_fields(self, prefix, price):
+        """The columns of one leg as lists, in the order of the ``Flight`` fields."""
+        columns = self.columns
+        return (
+            [
+                _EPOCH + timedelta(seconds=seconds)
+                for seconds in columns[f"{prefix}departure"].tolist()
+            ],
+            columns[f"{prefix}flight_number"].tolist(),
+            columns[price].tolist(),
+            columns[f"{prefix}currency"].tolist(),
+            columns[f"{prefix}origin"].tolist(),
+            columns[f"{prefix}origin_name"].tolist(),
+            columns[f"{prefix}destination"].tolist(),
+            columns[f"{prefix}destination_name"].tolist(),
+        )
+
+    def weekday_mask(self, *weekdays: int, leg: str = "outbound") -> "np.ndarray":
+        """Rows departing (on ``leg``) on any of ``weekdays``, Monday being 0."""
+        return np.isin(self._leg_column("weekday", leg), weekdays)
+
+    def time_mask(
+        self,
+        time_from: Union[time, str] = "00:00",
+        time_to: Union[time, str] = "23:59",
+        leg: str = "outbound",
+    ) -> "np.ndarray":
+        """Rows departing (on ``leg``) between ``time_from`` and ``time_to``, both inclusive."""
+        minute = self._leg_column("minute", leg)
+        return (minute >= _minute_of_day(time_from)) & (
+            minute <= _minute_of_day(time_to)
+        )
+
+    def sort_by_price(self) -> "FareFrame":
+        """
+        Rows ordered by price, then departure date, then destination, like ``sorted`` with that key: rows tied on
+        all three keep their order.
+        """
+        return self[self._price_order(np.arange(len(self)))]
+
+    def top_k(self, k: int) -> "FareFrame":
+        """The ``k`` cheapest rows, ordered like :meth:`sort_by_price`."""
+        if k >= len(self):
+            return self.sort_by_price()
+        if k <= 0:
+            return self[np.arange(0)]
+        # Every row as cheap as the k-th is a candidate, so ties with it are broken by the sort keys and the
+        # result is the first k rows of sort_by_price, not whichever tied rows a partition happened to pick
+        kth_price = np.partition(self.price, k - 1)[k - 1]
+        candidates = np.flatnonzero(self.price <= kth_price)
+        return self[self._price_order(candidates)[:k]]
+
+    def cheapest_per_destination(self) -> "FareFrame":
+        """The cheapest row for each destination, ordered by destination."""
+        if not len(self):
+            return self
+        order = np.lexsort((self.departure, self.price, self.destination))
+        destinations = self.destination[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = destinations[1:] != destinations[:-1]
+        return self[order[first]]
+
+    def min_price_by_destination(self) -> Dict[str, float]:
+        cheapest = self.cheapest_per_destination()
+        return dict(zip(cheapest.destination.tolist(), cheapest.price.tolist()))
+
+    def _price_order(self, indices):
+        # lexsort is stable, so rows tied on every key stay in the order of ``indices``
+        return indices[
+            np.lexsort(
+                (
+                    self.destination[indices],
+                    self.departure[indices] // SECONDS_PER_DAY,
+                    self.price[indices],
+                )
+            )
+        ]
+
+    def _leg_column(self, name, leg):
+        if leg not in _LEG_PREFIXES or (leg == "inbound" and not self.is_return):
+            raise ValueError(f"No {leg} leg in this FareFrame")
+        return self.columns[_LEG_PREFIXES[leg] + name]
@@ -0,0 +1,230 @@
+"""
+Offline currency conversion of fares: fetch every fare once, in one base currency, and convert it locally to any
+other currency with a table of exchange rates. The table is downloaded at most once per ``max_age`` and cached on
+disk along with the time its rates were published, so one sweep serves reports in any number of currencies.
+
+    rates = load_rates(base="EUR")
+    print(f"Rates as of {rates.as_of:%Y-%m-%d %H:%M %Z}")
+    trips_in_pln = rates.convert_fares(api.get_cheapest_return_flights(...), "PLN")
+"""
+import json
+import logging
+import os
+import tempfile
+import time
+import xml.etree.ElementTree as ElementTree
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Optional
+from zoneinfo import ZoneInfo
+
+import requests
+
+from ryanair.ryanair import RyanairException
+from ryanair.types import Flight, LazyFlight, LazyTrip, Trip
+
+logger = logging.getLogger("ryanair")
+
+DEFAULT_FX_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "ryanair-py", "fx_rates.json"
+)
+
+# Euro foreign exchange reference rates, published by the ECB on working days
+ECB_DAILY_URL = "https://www.ecb.europa.eu/stats/eurofxref/eurofxref-daily.xml"
+# The reference rates are set at 14:10 Frankfurt time, CET or CEST depending on the date
+_ECB_TIMEZONE = ZoneInfo("Europe/Berlin")
+_ECB_FIXING_HOUR, _ECB_FIXING_MINUTE = 14, 10
+
+DEFAULT_MAX_AGE = 12 * 60 * 60
+
+
+class FxError(RyanairException):
+    """No exchange rates are available for a conversion."""
+
+
+@dataclass(frozen=True)
+class FxRates:
+    """
+    Exchange rates from ``base``: ``rates[currency]`` is the amount of ``currency`` one unit of ``base`` buys.
+    ``as_of`` is when the rates were published, ``fetched_at`` (a Unix timestamp) when they were downloaded.
+    """
+
+    base: str
+    rates: Dict[str, float]
+    as_of: datetime
+    fetched_at: float = 0.0
+    source: Optional[str] = None
+
+    def rate(self, from_currency: str, to_currency: str) -> float:
+        """How much of ``to_currency`` one unit of ``from_currency`` buys."""
+        if from_currency == to_currency:
+            return 1.0
+        try:
+            return self.rates[to_currency] / self.rates[from_currency]
+        except KeyError as e:
+            raise FxError(
+                f"No {self.base} exchange rate for {e.args[0]} (rates as of {self.as_of})"
+            ) from None
+
+    def rebased(self, base: str) -> "FxRates":
+        """The same rates, expressed from ``base``."""
+        if base == self.base:
+            return self
+        factor = self.rate(base, self.base)
+        return replace(
+            self,
+            base=base,
+            rates={currency: rate * factor for currency, rate in self.rates.items()},
+        )
+
+    def convert(self, amount: float, from_currency: str, to_currency: str) -> float:
+        return round(amount * self.rate(from_currency, to_currency), 2)
+
+    def convert_flight(self, flight, currency: str) -> Flight:
+        return self._convert_flight_with({}, flight, currency)
+
+    def convert_trip(self, trip, currency: str) -> Trip:
+        """A copy of ``trip`` in ``currency``; its total is the sum of its converted legs."""
+        return self._convert_trip_with({}, trip, currency)
+
+    def convert_fares(self, fares: Iterable, currency: str) -> List:
+        """Flights and/or trips converted to ``currency``, each looking up its rate only once per source currency."""
+        rates = {}
+        converted = []
+        for fare in fares:
+            if isinstance(fare, (Trip, LazyTrip)):
+                converted.append(self._convert_trip_with(rates, fare, currency))
+            else:
+                converted.append(self._convert_flight_with(rates, fare, currency))
+        return converted
+
+    def _convert_flight_with(self, rates, flight, currency):
+        if isinstance(flight, LazyFlight):
+            flight = flight.to_flight()
+        if flight.currency == currency:
+            return flight
+        rate = rates.get(flight.currency)
+        if rate is None:
+            rate = rates[flight.currency] = self.rate(flight.currency, currency)
+        return replace(flight, price=round(flight.price * rate, 2), currency=currency)
+
+    def _convert_trip_with(self, rates, trip, currency):
+        if isinstance(trip, LazyTrip):
+            trip = trip.to_trip()
+        outbound = self._convert_flight_with(rates, trip.outbound, currency)
+        inbound = self._convert_flight_with(rates, trip.inbound, currency)
+        return replace(
+            trip,
+            outbound=outbound,
+            inbound=inbound,
+            totalPrice=round(outbound.price + inbound.price, 2),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "base": self.base,
+            "as_of": self.as_of.isoformat(),
+            "fetched_at": self.fetched_at,
+            "source": self.source,
+            "rates": self.rates,
+        }
+
+    @classmethod
+    def from_dict(cls, stored: dict) -> "FxRates":
+        return cls(
+            base=stored["base"],
+            rates={currency: float(rate) for currency, rate in stored["rates"].items()},
+            as_of=datetime.fromisoformat(stored["as_of"]),
+            fetched_at=stored.get("fetched_at", 0.0),
+            source=stored.get("source"),
+        )
+
+
+def fetch_ecb_rates(
+    session: Optional[requests.Session] = None, timeout: float = 10.0
+) -> FxRates:
+    """The latest ECB euro reference rates (base ``EUR``)."""
+    response = (session or requests).get(ECB_DAILY_URL, timeout=timeout)
+    response.raise_for_status()
+
+    day, rates = None, {"EUR": 1.0}
+    for element in ElementTree.fromstring(response.content).iter():
+        if not element.tag.endswith("Cube"):
+            continue
+        if "time" in element.attrib:
+            day = element.attrib["time"]
+        elif "currency" in element.attrib:
+            rates[element.attrib["currency"]] = float(element.attrib["rate"])
+    if day is None or len(rates) == 1:
+        raise FxError(f"No exchange rates in the response from {ECB_DAILY_URL}")
+
+    return FxRates(
+        base="EUR",
+        rates=rates,
+        as_of=_fixing_time(day),
+        fetched_at=time.time(),
+        source=ECB_DAILY_URL,
+    )
+
+
+def _fixing_time(day: str) -> datetime:
+    """When the reference rates for ``day`` (``YYYY-MM-DD``) were set, in UTC."""
+    fixing = datetime.fromisoformat(day).replace(
+        hour=_ECB_FIXING_HOUR, minute=_ECB_FIXING_MINUTE, tzinfo=_ECB_TIMEZONE
+    )
+    return fixing.astimezone(timezone.utc)
+
+
+def _read_rates(path: str) -> Optional[FxRates]:
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf8") as f:
+            return FxRates.from_dict(json.load(f))
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable exchange rates {path}: {e}")
+        return None
+
+
+def _write_rates(path: str, rates: FxRates):
+    if not path:
+        return
+    try:
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf8") as f:
+            json.dump(rates.to_dict(), f, indent=1)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning(f"Could not persist exchange rates to {path}: {e}")
+
+
+def load_rates(
+    base: str = "EUR",
+    path: Optional[str] = DEFAULT_FX_PATH,
+    max_age: float = DEFAULT_MAX_AGE,
+    fetch: Callable[[], FxRates] = fetch_ecb_rates,
+) -> FxRates:
+    """
+    Exchange rates from ``base``, read from the table cached at ``path`` if it was downloaded less than ``max_age``
+    seconds ago, and otherwise downloaded once with ``fetch`` and cached. If the download fails, an older cached
+    table is used (check its ``as_of``) rather than failing; with no table at all, :class:`FxError` is raised.
+    """
+    cached = _read_rates(path)
+    if cached is not None and time.time() - cached.fetched_at < max_age:
+        return cached.rebased(base)
+
+    try:
+        rates = fetch()
+    except Exception as e:
+        if cached is None:
+            raise FxError(f"Could not fetch exchange rates: {e}") from e
+        age = datetime.now(timezone.utc) - cached.as_of
+        logger.warning(
+            f"Could not fetch exchange rates, using rates as of {cached.as_of} "
+            f"({age // timedelta(hours=1)} hours old): {e}"
+        )
+        return cached.rebased(base)
+    _write_rates(path, rates)
+    return rates.rebased(base)
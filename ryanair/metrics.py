@@ -0,0 +1,284 @@
+"""
+Request, cache and parsing metrics for the Ryanair clients, per API endpoint, exportable as a dict or in the
+Prometheus text exposition format. Clients only collect them when given a :class:`Metrics`; without one, the
+cost is a ``None`` check per request.
+"""
+import bisect
+import functools
+import math
+import threading
+from typing import Dict, List, Optional
+
+from ryanair.cache import endpoint_name
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+@functools.lru_cache(maxsize=1024)
+def _endpoint(url: str) -> str:
+    return endpoint_name(url)
+
+
+class Histogram:
+    """
+    Distribution of observed values in log-spaced buckets (each ``growth`` times wider than the previous), so
+    quantiles are estimated to within that factor in constant memory, however many values are observed.
+    """
+
+    def __init__(
+        self, smallest: float = 0.001, largest: float = 120.0, growth: float = 2**0.25
+    ):
+        count = math.ceil(math.log(largest / smallest, growth)) + 1
+        self.bounds = [smallest * growth**i for i in range(count)]
+        # One more bucket for values above the largest bound
+        self.counts = [0] * (count + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the ``q`` quantile (never above the largest value observed)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return (
+                    min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+                )
+        return self.max
+
+    def to_dict(self) -> dict:
+        summary = {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "max": self.max if self.count else None,
+        }
+        for q in QUANTILES:
+            summary[f"p{round(q * 100)}"] = self.quantile(q)
+        return summary
+
+
+class EndpointMetrics:
+    """Counters for one API endpoint; ``latency`` and ``parse_time`` are in seconds."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors: Dict[str, int] = {}
+        self.retries: Dict[str, int] = {}
+        self.cache_hits = 0
+        self.response_bytes = 0
+        self.responses_parsed = 0
+        self.fares = 0
+        self.latency = Histogram()
+        self.parse_time = Histogram()
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "errors": dict(self.errors),
+            "retries": dict(self.retries),
+            "cache_hits": self.cache_hits,
+            "response_bytes": self.response_bytes,
+            "responses_parsed": self.responses_parsed,
+            "fares": self.fares,
+            "fares_per_response": self.fares / self.responses_parsed
+            if self.responses_parsed
+            else None,
+            "latency": self.latency.to_dict(),
+            "parse_time": self.parse_time.to_dict(),
+        }
+
+
+class Metrics:
+    """
+    Metrics of one or more clients (``Ryanair(metrics=metrics)``), keyed by endpoint name (``oneWayFares``,
+    ``roundTripFares``, ``cheapestPerDay``, ``routes``). Every request sent counts, retries included; responses
+    served from the cache count as ``cache_hits`` instead. Safe to share between threads.
+    """
+
+    def __init__(self):
+        self.endpoints: Dict[str, EndpointMetrics] = {}
+        self._concurrency = None
+        self._lock = threading.Lock()
+
+    def track_concurrency(self, controller):
+        """Export the current limit of an :class:`~ryanair.concurrency.AIMDController` as ``concurrency_limit``."""
+        with self._lock:
+            self._concurrency = controller
+
+    @property
+    def concurrency_limit(self) -> Optional[int]:
+        """The limit of the tracked concurrency controller, read when asked for; ``None`` without one."""
+        controller = self._concurrency
+        return controller.limit if controller is not None else None
+
+    def _get(self, url: str) -> EndpointMetrics:
+        name = _endpoint(url)
+        endpoint = self.endpoints.get(name)
+        if endpoint is None:
+            endpoint = self.endpoints[name] = EndpointMetrics()
+        return endpoint
+
+    def record_request(
+        self,
+        url: str,
+        latency: float,
+        response_bytes: int = 0,
+        error: Optional[str] = None,
+    ):
+        with self._lock:
+            endpoint = self._get(url)
+            endpoint.requests += 1
+            endpoint.latency.observe(latency)
+            endpoint.response_bytes += response_bytes
+            if error is not None:
+                endpoint.errors[error] = endpoint.errors.get(error, 0) + 1
+
+    def record_bytes(self, url: str, response_bytes: int):
+        with self._lock:
+            self._get(url).response_bytes += response_bytes
+
+    def record_retry(self, url: str, kind: str):
+        with self._lock:
+            endpoint = self._get(url)
+            endpoint.retries[kind] = endpoint.retries.get(kind, 0) + 1
+
+    def record_cache_hit(self, url: str):
+        with self._lock:
+            self._get(url).cache_hits += 1
+
+    def record_parse(self, url: str, fares: int, parse_time: Optional[float] = None):
+        with self._lock:
+            endpoint = self._get(url)
+            endpoint.responses_parsed += 1
+            endpoint.fares += fares
+            if parse_time is not None:
+                endpoint.parse_time.observe(parse_time)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                name: endpoint.to_dict()
+                for name, endpoint in sorted(self.endpoints.items())
+            }
+
+    def to_prometheus(self, prefix: str = "ryanair") -> str:
+        """The metrics in the Prometheus text exposition format, e.g. for a textfile collector or Pushgateway."""
+        with self._lock:
+            endpoints = sorted(self.endpoints.items())
+            lines: List[str] = []
+
+            def counter(name, help_text, values):
+                lines.append(f"# HELP {prefix}_{name} {help_text}")
+                lines.append(f"# TYPE {prefix}_{name} counter")
+                for labels, value in values:
+                    lines.append(f"{prefix}_{name}{_labels(labels)} {_number(value)}")
+
+            def gauge(name, help_text, value):
+                lines.append(f"# HELP {prefix}_{name} {help_text}")
+                lines.append(f"# TYPE {prefix}_{name} gauge")
+                lines.append(f"{prefix}_{name} {_number(value)}")
+
+            def summary(name, help_text, attribute):
+                lines.append(f"# HELP {prefix}_{name} {help_text}")
+                lines.append(f"# TYPE {prefix}_{name} summary")
+                for endpoint_name_, endpoint in endpoints:
+                    histogram = getattr(endpoint, attribute)
+                    if not histogram.count:
+                        continue
+                    for q in QUANTILES:
+                        labels = {"endpoint": endpoint_name_, "quantile": str(q)}
+                        lines.append(
+                            f"{prefix}_{name}{_labels(labels)} {_number(histogram.quantile(q))}"
+                        )
+                    labels = _labels({"endpoint": endpoint_name_})
+                    lines.append(
+                        f"{prefix}_{name}_sum{labels} {_number(histogram.sum)}"
+                    )
+                    lines.append(f"{prefix}_{name}_count{labels} {histogram.count}")
+
+            def per_endpoint(attribute):
+                return [
+                    ({"endpoint": name}, getattr(endpoint, attribute))
+                    for name, endpoint in endpoints
+                ]
+
+            def per_kind(attribute):
+                return [
+                    ({"endpoint": name, "kind": kind}, value)
+                    for name, endpoint in endpoints
+                    for kind, value in sorted(getattr(endpoint, attribute).items())
+                ]
+
+            counter(
+                "requests_total",
+                "Requests sent, retries included.",
+                per_endpoint("requests"),
+            )
+            counter(
+                "request_errors_total",
+                "Failed requests, per failure class.",
+                per_kind("errors"),
+            )
+            counter(
+                "retries_total",
+                "Requests retried, per failure class.",
+                per_kind("retries"),
+            )
+            counter(
+                "cache_hits_total",
+                "Responses served from the cache.",
+                per_endpoint("cache_hits"),
+            )
+            counter(
+                "response_bytes_total",
+                "Response body bytes received.",
+                per_endpoint("response_bytes"),
+            )
+            counter(
+                "responses_parsed_total",
+                "Responses parsed into fares.",
+                per_endpoint("responses_parsed"),
+            )
+            counter(
+                "fares_total", "Fares parsed from responses.", per_endpoint("fares")
+            )
+            summary("request_duration_seconds", "Request latency.", "latency")
+            summary(
+                "parse_duration_seconds",
+                "Time spent parsing a response into fares.",
+                "parse_time",
+            )
+            if self._concurrency is not None:
+                gauge(
+                    "concurrency_limit",
+                    "Requests the adaptive concurrency controller allows in flight.",
+                    self._concurrency.limit,
+                )
+            return "\n".join(lines) + "\n"
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    escaped = (
+        key
+        + '="'
+        + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        + '"'
+        for key, value in labels.items()
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
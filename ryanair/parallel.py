@@ -0,0 +1,291 @@
+"""
+Parsing of fare response bodies in a pool of worker processes, for sweeps large enough that decoding and parsing
+them on one core is the bottleneck. Each worker decodes a body and writes its fares as columns into a shared memory
+segment; the parent copies the columns of all segments straight into one :class:`~ryanair.frame.FareFrame`, so no
+``Flight`` or ``Trip`` objects are pickled between processes. They are only built, by ``FareFrame.to_list``, for the
+rows that are selected.
+
+    with FareParserPool(processes=8) as pool:
+        frame = pool.parse((api.get_fares_body(query) for query in queries), is_return=True)
+    cheapest = frame.top_k(10).to_list()
+
+Workers are started with the ``forkserver`` (or ``spawn``) method rather than forked from the caller, so, as with
+any such pool, a script using it must guard its entry point with ``if __name__ == "__main__":``.
+
+Requires ``numpy`` (``pip install ryanair-py[frame]``).
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ryanair.decoding import decode_fares, loads
+from ryanair.frame import FareFrame, _epoch_seconds
+from ryanair.ryanair import RyanairException
+from ryanair.types import _airport_label, _flight_number
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Columns start at multiples of this many bytes within a segment
+_ALIGNMENT = 8
+
+# The name of a shared memory segment and the (column, dtype, length, offset) of each column in it
+Segment = Tuple[str, List[Tuple[str, str, int, int]]]
+
+
+def _typed_leg(leg) -> tuple:
+    departure, arrival, price = leg.departureAirport, leg.arrivalAirport, leg.price
+    return (
+        departure.iataCode,
+        _airport_label(departure.name, departure.countryName),
+        arrival.iataCode,
+        _airport_label(arrival.name, arrival.countryName),
+        leg.departureDate,
+        _flight_number(leg.flightNumber),
+        price.value,
+        price.currencyCode,
+    )
+
+
+def _dict_leg(leg: dict) -> tuple:
+    departure, arrival, price = (
+        leg["departureAirport"],
+        leg["arrivalAirport"],
+        leg["price"],
+    )
+    return (
+        departure["iataCode"],
+        _airport_label(departure["name"], departure["countryName"]),
+        arrival["iataCode"],
+        _airport_label(arrival["name"], arrival["countryName"]),
+        datetime.fromisoformat(leg["departureDate"]),
+        _flight_number(leg["flightNumber"]),
+        price["value"],
+        price["currencyCode"],
+    )
+
+
+def _leg_columns(legs: List[tuple], prefix: str, price: str) -> Dict[str, "np.ndarray"]:
+    (
+        origin,
+        origin_name,
+        destination,
+        destination_name,
+        departures,
+        flight_number,
+        prices,
+        currency,
+    ) = (
+        zip(*legs) if legs else [()] * 8
+    )
+    return {
+        f"{prefix}origin": np.array(origin, dtype="U3"),
+        f"{prefix}origin_name": np.array(origin_name, dtype=str),
+        f"{prefix}destination": np.array(destination, dtype="U3"),
+        f"{prefix}destination_name": np.array(destination_name, dtype=str),
+        f"{prefix}departure": _epoch_seconds(departures, len(legs)),
+        f"{prefix}flight_number": np.array(flight_number, dtype=str),
+        price: np.array(prices, dtype=np.float64),
+        f"{prefix}currency": np.array(currency, dtype="U3"),
+    }
+
+
+def fare_columns(body: bytes, is_return: bool = False) -> Dict[str, "np.ndarray"]:
+    """
+    The fares of a ``oneWayFares`` (or, with ``is_return``, ``roundTripFares``) response body as the columns a
+    ``FareFrame`` builds them back from, without the weekday, hour and minute columns derived from departures.
+    """
+    fares = decode_fares(body)
+    if fares is not None:
+        outbound = [_typed_leg(fare.outbound) for fare in fares]
+        inbound = [_typed_leg(fare.inbound) for fare in fares] if is_return else None
+    else:
+        fares = loads(body)["fares"] or []
+        outbound = [_dict_leg(fare["outbound"]) for fare in fares]
+        inbound = [_dict_leg(fare["inbound"]) for fare in fares] if is_return else None
+
+    if inbound is None:
+        return _leg_columns(outbound, "", "price")
+    columns = {
+        **_leg_columns(outbound, "", "outbound_price"),
+        **_leg_columns(inbound, "return_", "inbound_price"),
+    }
+    # In the same order as Trip.totalPrice, so the sums are identical
+    columns["price"] = columns["inbound_price"] + columns["outbound_price"]
+    return columns
+
+
+def _parse_into_shared_memory(body: bytes, is_return: bool) -> Segment:
+    """Runs in a worker: parse ``body`` and copy its columns into a new shared memory segment."""
+    columns = fare_columns(body, is_return)
+    layout, size = [], 0
+    for name, column in columns.items():
+        size += -size % _ALIGNMENT
+        layout.append((name, column.dtype.str, len(column), size))
+        size += column.nbytes
+
+    segment = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    try:
+        for name, dtype, length, offset in layout:
+            np.ndarray((length,), dtype=dtype, buffer=segment.buf, offset=offset)[
+                :
+            ] = columns[name]
+    except BaseException:
+        segment.close()
+        segment.unlink()
+        raise
+    segment.close()
+    # The parent unlinks the segment once it has copied the columns out
+    return segment.name, layout
+
+
+def _release(names: Iterable[str]):
+    for name in names:
+        try:
+            segment = shared_memory.SharedMemory(name=name)
+        except FileNotFoundError:
+            continue
+        segment.close()
+        segment.unlink()
+
+
+def _worker_context():
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context(
+        "forkserver" if "forkserver" in methods else "spawn"
+    )
+
+
+class FareParserPool:
+    """
+    A pool of ``processes`` worker processes parsing fare response bodies into a :class:`FareFrame`; with
+    ``processes=0`` bodies are parsed in the calling process instead, with the same results. Use it as a context
+    manager, or call :meth:`close` when done.
+    """
+
+    def __init__(self, processes: Optional[int] = None):
+        if np is None:
+            raise RyanairException(
+                "FareParserPool requires numpy, install it with `pip install numpy`"
+            )
+        self.processes = processes
+        self._executor = None
+        if processes != 0:
+            # Started before the workers, so they register their segments with the same tracker the parent
+            # unregisters them from when it unlinks them
+            resource_tracker.ensure_running()
+            # Workers start on demand, possibly while threads of the caller are fetching bodies; a forked copy of
+            # a process with running threads can deadlock on a lock one of them held, so workers are never forked
+            # from it
+            self._executor = ProcessPoolExecutor(
+                max_workers=processes, mp_context=_worker_context()
+            )
+
+    def parse(
+        self,
+        bodies: Iterable[bytes],
+        is_return: bool = False,
+        search_origins: Optional[Sequence[Tuple[str, Optional[str]]]] = None,
+    ) -> FareFrame:
+        """
+        The fares of all ``bodies`` (``oneWayFares`` responses, or ``roundTripFares`` ones with ``is_return``) as
+        one frame, in the order of the bodies. Each body is handed to a worker as soon as it is read from
+        ``bodies``, so parsing overlaps with fetching when ``bodies`` is a generator.
+
+        :param search_origins: the ``(code, name)`` of the airport each body was searched from, for the
+            ``search_origin`` and ``search_origin_name`` columns (``searchOrigin``/``searchOriginName`` of fares).
+        """
+        if self._executor is None:
+            parts = [fare_columns(body, is_return) for body in bodies]
+        else:
+            parts = self._gather(self._submit(bodies, is_return))
+        counts = [len(part["price"]) for part in parts]
+        if not parts:
+            parts = [fare_columns(b'{"fares": []}', is_return)]
+
+        columns = {
+            name: np.concatenate([part[name] for part in parts]) for name in parts[0]
+        }
+        if search_origins is not None:
+            codes, names = zip(*search_origins) if search_origins else ((), ())
+            columns["search_origin"] = np.repeat(np.array(codes, dtype=str), counts)
+            columns["search_origin_name"] = np.repeat(
+                np.array(names, dtype=object), counts
+            )
+        for prefix in ("", "return_") if is_return else ("",):
+            FareFrame._add_calendar_columns(
+                columns, prefix, columns[f"{prefix}departure"]
+            )
+        return FareFrame(columns)
+
+    def _submit(self, bodies, is_return):
+        futures = []
+        try:
+            for body in bodies:
+                futures.append(
+                    self._executor.submit(_parse_into_shared_memory, body, is_return)
+                )
+        except BaseException:
+            # Reading ``bodies`` failed (e.g. a fetch raised): release what was parsed so far
+            self._discard(futures)
+            raise
+        return futures
+
+    @staticmethod
+    def _discard(futures):
+        """Wait for ``futures`` and release the segments of those that succeeded."""
+        for future in futures:
+            try:
+                name, _ = future.result()
+            except Exception:
+                continue
+            _release([name])
+
+    def _gather(self, futures) -> List[Dict[str, "np.ndarray"]]:
+        segments, error = [], None
+        for future in futures:
+            try:
+                segments.append(future.result())
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            _release(name for name, _ in segments)
+            raise error
+
+        parts = []
+        try:
+            for name, layout in segments:
+                segment = shared_memory.SharedMemory(name=name)
+                try:
+                    # Copies, so no array refers to the segment once it is closed
+                    parts.append(
+                        {
+                            column: np.ndarray(
+                                (length,),
+                                dtype=dtype,
+                                buffer=segment.buf,
+                                offset=offset,
+                            ).copy()
+                            for column, dtype, length, offset in layout
+                        }
+                    )
+                finally:
+                    segment.close()
+                    segment.unlink()
+        finally:
+            _release(name for name, _ in segments[len(parts) :])
+        return parts
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
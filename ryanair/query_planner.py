@@ -0,0 +1,243 @@
+"""
+Plans batches of fare queries so that overlapping or adjacent date windows are fetched with as few upstream
+requests as possible, then splits the fares back out per logical query on the client side.
+
+Bear in mind that the fare endpoints only return the cheapest fare per destination within the requested window.
+A merged request therefore can't see a destination's fare on one day if it is cheaper on another day of the
+merged window; use ``max_span_days`` to bound how wide merged windows may grow when per-day coverage matters.
+Only outbound dates are ever merged: queries with different time windows or return windows are fetched separately,
+as a wider time or return window could surface a fare that matches none of the merged queries and hide the ones
+that do.
+"""
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, List, Optional, Union
+
+from ryanair.types import Flight, Query, Trip
+
+DateLike = Union[datetime, date, str]
+TimeLike = Union[time, str]
+
+
+def _to_date(d: Optional[DateLike]) -> Optional[date]:
+    if d is None:
+        return None
+    if isinstance(d, datetime):
+        return d.date()
+    if isinstance(d, date):
+        return d
+    return date.fromisoformat(d)
+
+
+def _to_time(t: TimeLike) -> time:
+    if isinstance(t, time):
+        return t
+    return time.fromisoformat(t)
+
+
+@dataclass(frozen=True)
+class LogicalQuery:
+    """
+    One query as the caller thinks of it. Queries with ``return_date_from``/``return_date_to`` set are round trips,
+    the rest are one-way.
+    """
+
+    origin: str
+    date_from: DateLike
+    date_to: DateLike
+    time_from: TimeLike = "00:00"
+    time_to: TimeLike = "23:59"
+    return_date_from: Optional[DateLike] = None
+    return_date_to: Optional[DateLike] = None
+    return_time_from: TimeLike = "00:00"
+    return_time_to: TimeLike = "23:59"
+    destination_country: Optional[str] = None
+    destination_airport: Optional[str] = None
+    max_price: Optional[int] = None
+
+    def __post_init__(self):
+        for name in ("date_from", "date_to", "return_date_from", "return_date_to"):
+            object.__setattr__(self, name, _to_date(getattr(self, name)))
+        for name in ("time_from", "time_to", "return_time_from", "return_time_to"):
+            object.__setattr__(self, name, _to_time(getattr(self, name)))
+        if (self.return_date_from is None) != (self.return_date_to is None):
+            raise ValueError(
+                "return_date_from and return_date_to must be given together"
+            )
+
+    @property
+    def is_return(self) -> bool:
+        return self.return_date_from is not None
+
+    def to_query(self) -> Query:
+        if self.is_return:
+            return Query.round_trip(
+                self.origin,
+                self.date_from,
+                self.date_to,
+                self.return_date_from,
+                self.return_date_to,
+                destination_country=self.destination_country,
+                outbound_departure_time_from=self.time_from,
+                outbound_departure_time_to=self.time_to,
+                inbound_departure_time_from=self.return_time_from,
+                inbound_departure_time_to=self.return_time_to,
+                max_price=self.max_price,
+                destination_airport=self.destination_airport,
+            )
+        return Query.one_way(
+            self.origin,
+            self.date_from,
+            self.date_to,
+            destination_country=self.destination_country,
+            departure_time_from=self.time_from,
+            departure_time_to=self.time_to,
+            max_price=self.max_price,
+            destination_airport=self.destination_airport,
+        )
+
+    def matches(self, fare: Union[Flight, Trip]) -> bool:
+        if self.is_return:
+            return self._in_window(
+                fare.outbound,
+                self.date_from,
+                self.date_to,
+                self.time_from,
+                self.time_to,
+            ) and self._in_window(
+                fare.inbound,
+                self.return_date_from,
+                self.return_date_to,
+                self.return_time_from,
+                self.return_time_to,
+            )
+        return self._in_window(
+            fare, self.date_from, self.date_to, self.time_from, self.time_to
+        )
+
+    @staticmethod
+    def _in_window(flight: Flight, date_from, date_to, time_from, time_to) -> bool:
+        departure = flight.departureTime
+        return (
+            date_from <= departure.date() <= date_to
+            and time_from <= departure.time() <= time_to
+        )
+
+    def _group_key(self):
+        # Everything but the outbound dates must be identical for queries to be merged
+        return (
+            self.is_return,
+            self.origin,
+            self.destination_country,
+            self.destination_airport,
+            self.max_price,
+            self.time_from,
+            self.time_to,
+            self.return_date_from,
+            self.return_date_to,
+            self.return_time_from,
+            self.return_time_to,
+        )
+
+
+@dataclass
+class QueryPlan:
+    """
+    The upstream queries needed to answer ``queries``; ``members[i]`` holds the indices of the logical queries
+    answered by ``upstream[i]``.
+    """
+
+    queries: List[LogicalQuery]
+    upstream: List[Query] = field(default_factory=list)
+    members: List[List[int]] = field(default_factory=list)
+
+    @property
+    def calls_saved(self) -> int:
+        return len(self.queries) - len(self.upstream)
+
+    def split(self, results: List) -> List:
+        """
+        Turn one result per upstream query (a list of fares, or the exception it raised) into one result per
+        logical query, in the order the logical queries were given.
+        """
+        split_results = [None] * len(self.queries)
+        for indices, result in zip(self.members, results):
+            for index in indices:
+                if isinstance(result, Exception):
+                    split_results[index] = result
+                else:
+                    query = self.queries[index]
+                    split_results[index] = [
+                        fare for fare in result if query.matches(fare)
+                    ]
+        return split_results
+
+    def execute(self, api, max_workers: int = 1) -> List:
+        return self.split(api.get_many(self.upstream, max_workers=max_workers))
+
+    async def execute_async(self, api) -> List:
+        return self.split(await api.gather_many(self.upstream, return_exceptions=True))
+
+
+class _Window:
+    def __init__(self, index: int, query: LogicalQuery):
+        self.members = [index]
+        self.date_from, self.date_to = query.date_from, query.date_to
+        self.template = query
+
+    def try_absorb(self, index: int, query: LogicalQuery, max_span_days) -> bool:
+        if query.date_from > self.date_to + timedelta(days=1):
+            return False
+        date_to = max(self.date_to, query.date_to)
+        if (
+            max_span_days is not None
+            and (date_to - self.date_from).days + 1 > max_span_days
+        ):
+            return False
+        self.date_to = date_to
+        self.members.append(index)
+        return True
+
+    def to_query(self) -> Query:
+        return replace(
+            self.template, date_from=self.date_from, date_to=self.date_to
+        ).to_query()
+
+
+def plan_queries(
+    queries: Iterable[LogicalQuery], max_span_days: Optional[int] = None
+) -> QueryPlan:
+    """
+    Merge the overlapping and adjacent outbound date windows of compatible queries (same kind, origin,
+    destination/price filters, time windows and return window) into as few upstream queries as possible. Fares
+    outside a member's own dates are filtered out again by :meth:`QueryPlan.split`.
+
+    :param max_span_days: the widest outbound date window a merged query may cover, ``None`` for no limit.
+    """
+    queries = list(queries)
+    if max_span_days is not None and max_span_days < 1:
+        raise ValueError("max_span_days must be at least 1")
+
+    groups = {}
+    for index, query in enumerate(queries):
+        groups.setdefault(query._group_key(), []).append(index)
+
+    windows = []
+    for indices in groups.values():
+        indices.sort(key=lambda i: (queries[i].date_from, queries[i].date_to))
+        open_windows = []
+        for index in indices:
+            query = queries[index]
+            if not any(
+                window.try_absorb(index, query, max_span_days)
+                for window in open_windows
+            ):
+                open_windows.append(_Window(index, query))
+        windows.extend(open_windows)
+
+    windows.sort(key=lambda window: window.members[0])
+    return QueryPlan(
+        queries=queries,
+        upstream=[window.to_query() for window in windows],
+        members=[sorted(window.members) for window in windows],
+    )
@@ -0,0 +1,233 @@
+"""
+Recording and replaying of exchanges with the Ryanair APIs, so experiments and tests run offline against the same
+data every time: a client using :class:`RecordingTransport` saves every successful response it receives, and one
+using :class:`ReplayTransport` is served those responses back without touching the network.
+"""
+import base64
+import hashlib
+import json
+import os
+import tempfile
+from typing import Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from ryanair.SessionManager import RequestsTransport, SessionManager
+from ryanair.cache import cache_key, endpoint_name
+from ryanair.ryanair import RyanairException
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# The body is stored decoded, and cookies belong to the session that recorded it
+_DROPPED_HEADERS = {
+    "content-encoding",
+    "content-length",
+    "transfer-encoding",
+    "set-cookie",
+    "connection",
+}
+
+
+class ReplayMissError(RyanairException):
+    """A replaying client made a request that wasn't recorded."""
+
+
+def split_url(url: str) -> Tuple[str, dict]:
+    """A URL without its query string, and the query parameters."""
+    parts = urlsplit(url)
+    return (
+        f"{parts.scheme}://{parts.netloc}{parts.path}",
+        dict(parse_qsl(parts.query, keep_blank_values=True)),
+    )
+
+
+class ExchangeStore:
+    """Recorded responses in ``directory``, one JSON file per distinct request (URL and query parameters)."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path(self, url: str, params: Optional[dict]) -> str:
+        digest = hashlib.sha1(cache_key(url, params).encode("utf8")).hexdigest()[:16]
+        return os.path.join(self.directory, f"{endpoint_name(url)}-{digest}.json")
+
+    def save(
+        self, url: str, params: Optional[dict], status: int, headers: dict, body: bytes
+    ):
+        exchange = {
+            "url": url,
+            "params": params or {},
+            "status": status,
+            "headers": {
+                name: value
+                for name, value in headers.items()
+                if name.lower() not in _DROPPED_HEADERS
+            },
+        }
+        try:
+            exchange["body"] = body.decode("utf8")
+        except UnicodeDecodeError:
+            exchange["body_base64"] = base64.b64encode(body).decode("ascii")
+
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf8") as f:
+            json.dump(exchange, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path(url, params))
+
+    def load(self, url: str, params: Optional[dict]) -> Optional[dict]:
+        try:
+            with open(self.path(url, params), encoding="utf8") as f:
+                exchange = json.load(f)
+        except FileNotFoundError:
+            return None
+        if "body_base64" in exchange:
+            exchange["body"] = base64.b64decode(exchange.pop("body_base64"))
+        else:
+            exchange["body"] = exchange["body"].encode("utf8")
+        return exchange
+
+
+def build_response(
+    request, status: int, headers: dict, body: bytes
+) -> requests.Response:
+    """A complete ``requests.Response`` to ``request`` that never touches the network."""
+    response = requests.Response()
+    response.status_code = status
+    response.reason = "OK" if status < 400 else "Error"
+    response.headers = CaseInsensitiveDict(headers)
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.url = request.url
+    response.request = request
+    response._content = body
+    response._content_consumed = True
+    return response
+
+
+class _RecordingAdapter(BaseAdapter):
+    def __init__(self, store: ExchangeStore, adapter: BaseAdapter):
+        super().__init__()
+        self.store = store
+        self.adapter = adapter
+
+    def send(self, request, stream=False, **kwargs):
+        # Split before sending, as the wrapped adapter may point the request elsewhere
+        url, params = split_url(request.url)
+        # Read in full, so the body can be saved; a streaming caller then iterates over it in memory
+        response = self.adapter.send(request, stream=False, **kwargs)
+        if response.ok and url != SessionManager.BASE_SITE_FOR_SESSION_URL:
+            self.store.save(
+                url, params, response.status_code, response.headers, response.content
+            )
+        return response
+
+    def close(self):
+        self.adapter.close()
+
+
+def _replayed(store: ExchangeStore, url: str) -> dict:
+    exchange = store.load(*split_url(url))
+    if exchange is None:
+        raise ReplayMissError(f"no recorded response for {url}")
+    return exchange
+
+
+class _ReplayAdapter(BaseAdapter):
+    def __init__(self, store: ExchangeStore):
+        super().__init__()
+        self.store = store
+
+    def send(self, request, **kwargs):
+        exchange = _replayed(self.store, request.url)
+        return build_response(
+            request, exchange["status"], exchange["headers"], exchange["body"]
+        )
+
+    def close(self):
+        pass
+
+
+class _AsyncRecordingTransport(httpx.AsyncBaseTransport if httpx else object):
+    """:class:`_RecordingAdapter` for ``AsyncRyanair``."""
+
+    def __init__(self, store: ExchangeStore, transport: "httpx.AsyncBaseTransport"):
+        self.store = store
+        self.transport = transport
+
+    async def handle_async_request(self, request):
+        url, params = split_url(str(request.url))
+        response = await self.transport.handle_async_request(request)
+        if response.is_success and url != SessionManager.BASE_SITE_FOR_SESSION_URL:
+            # Read in full, so the body can be saved; the client is then served it from memory
+            body = await response.aread()
+            self.store.save(url, params, response.status_code, response.headers, body)
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class _AsyncReplayTransport(httpx.AsyncBaseTransport if httpx else object):
+    """:class:`_ReplayAdapter` for ``AsyncRyanair``."""
+
+    def __init__(self, store: ExchangeStore):
+        self.store = store
+
+    async def handle_async_request(self, request):
+        exchange = _replayed(self.store, str(request.url))
+        return httpx.Response(
+            exchange["status"], headers=exchange["headers"], content=exchange["body"]
+        )
+
+
+class RecordingTransport(RequestsTransport):
+    """
+    Sends requests through ``transport`` (by default a plain :class:`RequestsTransport`) and saves every
+    successful response to ``directory``.
+    """
+
+    def __init__(self, directory: str, transport: Optional[RequestsTransport] = None):
+        self.transport = transport if transport is not None else RequestsTransport()
+        super().__init__(
+            self.transport.pool_connections,
+            self.transport.pool_maxsize,
+            self.transport.pool_block,
+            self.transport.connect_timeout,
+            self.transport.read_timeout,
+        )
+        self.needs_session_cookies = self.transport.needs_session_cookies
+        self.store = ExchangeStore(directory)
+
+    def _new_adapter(self):
+        return _RecordingAdapter(self.store, self.transport._new_adapter())
+
+    def async_transport(self, limits):
+        return _AsyncRecordingTransport(
+            self.store, self.transport.async_transport(limits)
+        )
+
+
+class ReplayTransport(RequestsTransport):
+    """
+    Serves the responses saved by a :class:`RecordingTransport` in ``directory``, matching requests by URL and
+    query parameters. A request that wasn't recorded raises :class:`ReplayMissError` (and isn't retried).
+    """
+
+    needs_session_cookies = False
+
+    def __init__(self, directory: str):
+        super().__init__()
+        self.store = ExchangeStore(directory)
+
+    def _new_adapter(self):
+        return _ReplayAdapter(self.store)
+
+    def async_transport(self, limits):
+        return _AsyncReplayTransport(self.store)
@@ -0,0 +1,154 @@
+"""
+Cache of the destinations served directly from each origin airport, persisted to disk, so fare queries for routes
+that don't exist can be answered locally without a round-trip to the fares API.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from ryanair.cache import _InFlight
+
+logger = logging.getLogger("ryanair")
+
+DEFAULT_ROUTES_CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "ryanair-py", "routes.json"
+)
+
+
+class RouteMap:
+    ROUTES_API_URL = (
+        "https://www.ryanair.com/api/views/locate/searchWidget/routes/en/airport/"
+    )
+
+    def __init__(
+        self,
+        path: Optional[str] = DEFAULT_ROUTES_CACHE_PATH,
+        ttl: float = 7 * 24 * 60 * 60,
+    ):
+        """
+        :param path: JSON file the route map is persisted to, or ``None`` to only keep it in memory.
+        :param ttl: seconds after which an origin's destinations are fetched again.
+        """
+        self.path = path
+        self.ttl = ttl
+
+        # origin -> {"fetched_at": epoch seconds, "destinations": {IATA code: country code}}
+        self._routes = {}
+        self._lock = threading.Lock()
+        # origin -> the lookup of its routes under way in another thread
+        self._in_flight: Dict[str, _InFlight] = {}
+        self._load()
+
+    def routes_url(self, origin: str) -> str:
+        return "".join((self.ROUTES_API_URL, origin))
+
+    def get(self, origin: str) -> Optional[Dict[str, str]]:
+        """Destinations served from ``origin`` mapped to their country codes, or ``None`` if unknown or stale."""
+        with self._lock:
+            entry = self._routes.get(origin)
+        if entry is None or time.time() - entry["fetched_at"] > self.ttl:
+            return None
+        return entry["destinations"]
+
+    def get_or_fetch(self, origin: str, fetch: Callable[[], list]) -> Dict[str, str]:
+        """
+        Destinations served from ``origin``, calling ``fetch`` for a routes API response if they are unknown or
+        stale. Single-flight: threads asking for an origin that is already being fetched wait for that fetch.
+        """
+        destinations = self.get(origin)
+        if destinations is not None:
+            return destinations
+        with self._lock:
+            in_flight = self._in_flight.get(origin)
+            leader = in_flight is None
+            if leader:
+                in_flight = self._in_flight[origin] = _InFlight()
+
+        if not leader:
+            in_flight.done.wait()
+            if in_flight.error is not None:
+                raise in_flight.error
+            return in_flight.value
+
+        try:
+            in_flight.value = self.update(origin, fetch())
+            return in_flight.value
+        except BaseException as e:
+            in_flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[origin]
+            in_flight.done.set()
+
+    def update(self, origin: str, routes: list) -> Dict[str, str]:
+        """Store the destinations from a routes API response for ``origin``."""
+        destinations = {}
+        for route in routes:
+            # Fares are only quoted for direct routes
+            if route.get("connectingAirport"):
+                continue
+            arrival = route["arrivalAirport"]
+            destinations[arrival["code"]] = arrival["country"]["code"].upper()
+
+        with self._lock:
+            self._routes[origin] = {
+                "fetched_at": time.time(),
+                "destinations": destinations,
+            }
+            self._save()
+        return destinations
+
+    @staticmethod
+    def allows(
+        destinations: Optional[Dict[str, str]],
+        destination_airport: Optional[str] = None,
+        destination_country: Optional[str] = None,
+    ) -> bool:
+        """False only if ``destinations`` is known and rules out the requested destination filters."""
+        if destinations is None:
+            return True
+        if destination_airport and destination_airport not in destinations:
+            return False
+        if destination_country and destination_country.upper() not in set(
+            destinations.values()
+        ):
+            return False
+        return True
+
+    def _load(self):
+        self._routes = self._read() or {}
+
+    def _read(self) -> Optional[dict]:
+        if not self.path or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, encoding="utf8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable route cache {self.path}: {e}")
+            return None
+
+    def _save(self):
+        if not self.path:
+            return
+        # Other processes may have saved origins this one hasn't seen, or fetched more recently: keep the newest
+        # entry for each origin rather than overwriting the file with this process's view only
+        for origin, entry in (self._read() or {}).items():
+            ours = self._routes.get(origin)
+            if ours is None or entry["fetched_at"] > ours["fetched_at"]:
+                self._routes[origin] = entry
+        try:
+            directory = os.path.dirname(self.path) or "."
+            os.makedirs(directory, exist_ok=True)
+            # Write to a temporary file first so concurrent readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf8") as f:
+                json.dump(self._routes, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"Could not persist route cache to {self.path}: {e}")
@@ -2,15 +2,50 @@
 This module allows you to retrieve the cheapest flights, with or without return flights, within a fixed set of dates.
 This is done directly through Ryanair's API, and does not require an API key.
 """
+import asyncio
+import email.utils
+import functools
+import hashlib
 import logging
 import sys
-from datetime import datetime, date, time
-from typing import Union, Optional
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date, time, timezone
+from time import perf_counter
+from typing import Union, Optional, Iterable, Iterator, List, Tuple
 
 import backoff
+import requests
 
-from ryanair.SessionManager import SessionManager
-from ryanair.types import Flight, Trip
+from ryanair.SessionManager import (
+    SessionManager,
+    Transport,
+    RequestsTransport,
+)
+from ryanair.cache import ResponseCache, cache_key
+from ryanair.concurrency import AIMDController
+from ryanair.decoding import decode_fares, loads
+from ryanair.metrics import Metrics
+from ryanair.routes import RouteMap
+from ryanair.streaming import iter_array_items
+from ryanair.types import (
+    Flight,
+    Trip,
+    Query,
+    FareCalendar,
+    FareList,
+    LazyFlight,
+    LazyTrip,
+    _airport_label,
+    _flight_number,
+)
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
 
 logger = logging.getLogger("ryanair")
 if not logger.handlers:
@@ -30,18 +65,257 @@ class RyanairException(Exception):
         super().__init__(f"Ryanair API: {message}")
 
 
+class RetryBudget:
+    """
+    Token bucket shared by all queries of a client: every successful query adds ``ratio`` of a token and every
+    retry takes a whole one, so when the upstream is degraded retries can't grow traffic by much more than
+    ``ratio`` (after the ``initial`` tokens are spent).
+    """
+
+    def __init__(
+        self, ratio: float = 0.2, initial: float = 10, max_tokens: float = 100
+    ):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = initial
+        self._lock = threading.Lock()
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def withdraw(self):
+        with self._lock:
+            self._tokens = max(0.0, self._tokens - 1)
+
+
+class RetryPolicy:
+    """
+    Decides which failed requests are retried and how long to wait before retrying them.
+
+    Failures are classified as ``timeout``, ``connection``, ``throttled`` (429/503), ``server`` (other 5xx),
+    ``session`` (401/403, retried with refreshed session cookies), ``client`` (other 4xx) or ``other``. All but
+    the last two are retried: up to ``max_tries`` attempts per request, while the shared :class:`RetryBudget`
+    has tokens left. Throttled responses wait for their
+    ``Retry-After`` when they have one (giving up straight away if it is longer than ``max_retry_after``),
+    the rest back off exponentially with full jitter. ``retries`` counts the retries made per class.
+    """
+
+    RETRYABLE = ("timeout", "connection", "throttled", "server", "session")
+
+    def __init__(
+        self,
+        max_tries: int = 5,
+        budget: Optional[RetryBudget] = None,
+        max_retry_after: float = 60,
+        max_backoff: float = 30,
+    ):
+        self.max_tries = max_tries
+        self.budget = budget if budget is not None else RetryBudget()
+        self.max_retry_after = max_retry_after
+        self.max_backoff = max_backoff
+
+        self.retries = {name: 0 for name in self.RETRYABLE}
+        self.budget_exhausted = 0
+        self._lock = threading.Lock()
+
+    def call(self, func, *args, on_retry=None, **kwargs):
+        """
+        Call ``func`` (a plain function or a coroutine function), retrying it according to this policy.
+        ``on_retry`` is called with the failure class of each retried attempt.
+        """
+        on_backoff = [self._on_backoff]
+        if on_retry is not None:
+            on_backoff.append(
+                lambda details: on_retry(self.classify(details["exception"]))
+            )
+        return backoff.on_exception(
+            self._wait_gen,
+            Exception,
+            max_tries=self.max_tries,
+            jitter=None,
+            giveup=self._giveup,
+            on_backoff=on_backoff,
+            on_success=self._on_success,
+            on_giveup=self._on_giveup,
+            raise_on_giveup=True,
+            logger=logger,
+            # _on_giveup logs at a level that depends on why
+            giveup_log_level=logging.DEBUG,
+        )(func)(*args, **kwargs)
+
+    @staticmethod
+    def classify(e: Exception) -> str:
+        if isinstance(e, requests.Timeout) or (
+            httpx is not None and isinstance(e, httpx.TimeoutException)
+        ):
+            return "timeout"
+        if isinstance(e, requests.ConnectionError) or (
+            httpx is not None and isinstance(e, httpx.TransportError)
+        ):
+            return "connection"
+        if isinstance(e, requests.HTTPError) or (
+            httpx is not None and isinstance(e, httpx.HTTPStatusError)
+        ):
+            status = getattr(getattr(e, "response", None), "status_code", None)
+            if not isinstance(status, int):
+                # No response to go by, so assume the worst about it
+                return "server"
+            if status in (429, 503):
+                return "throttled"
+            if status in (401, 403):
+                return "session"
+            if status == 408:
+                return "timeout"
+            return "server" if status >= 500 else "client"
+        return "other"
+
+    @staticmethod
+    def retry_after(e: Exception) -> Optional[float]:
+        """Seconds to wait according to the ``Retry-After`` header of the failed response, if it has one."""
+        headers = getattr(getattr(e, "response", None), "headers", None)
+        try:
+            value = headers.get("Retry-After") if headers is not None else None
+        except Exception:
+            return None
+        if not isinstance(value, str):
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            retry_at = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+    @classmethod
+    def is_congestion(cls, e: Exception) -> bool:
+        """Whether a failure suggests the upstream is overloaded, so fewer requests should be in flight."""
+        return cls.classify(e) in ("throttled", "timeout")
+
+    def _giveup(self, e) -> bool:
+        kind = self.classify(e)
+        if kind not in self.RETRYABLE:
+            return True
+        if kind == "throttled":
+            retry_after = self.retry_after(e)
+            if retry_after is not None and retry_after > self.max_retry_after:
+                logger.warning(
+                    f"Upstream asked to retry after {retry_after:.0f}s, not waiting that long"
+                )
+                return True
+        if self.budget.tokens < 1:
+            with self._lock:
+                self.budget_exhausted += 1
+            logger.warning("Retry budget exhausted, not retrying")
+            return True
+        return False
+
+    def _wait_gen(self):
+        exponential = _RyanairBase._get_backoff_type()
+        next(exponential)
+        e = yield
+        while True:
+            wait = min(next(exponential), self.max_backoff)
+            retry_after = (
+                self.retry_after(e) if self.classify(e) == "throttled" else None
+            )
+            e = (
+                yield retry_after
+                if retry_after is not None
+                else backoff.full_jitter(wait)
+            )
+
+    def _on_backoff(self, details):
+        self.budget.withdraw()
+        kind = self.classify(details["exception"])
+        with self._lock:
+            self.retries[kind] += 1
+
+    def _on_success(self, details):
+        self.budget.deposit()
+
+    def _on_giveup(self, details):
+        e, tries = details["exception"], details["tries"]
+        if tries >= self.max_tries:
+            logger.exception(
+                f"Gave up retrying query after {tries} tries, last exception was {e}"
+            )
+        elif tries > 1:
+            logger.warning(f"Gave up retrying query after {tries} tries: {e}")
+        else:
+            # Not retryable, or _giveup already said why not
+            logger.debug(f"Not retrying query: {e}")
+
+
 # noinspection PyBroadException
-class Ryanair:
+class _RyanairBase:
+    """
+    Query building and response parsing shared by the blocking and the async clients.
+    """
+
     BASE_SERVICES_API_URL = "https://services-api.ryanair.com/farfnd/v4/"
+    PARSED_FARES_MEMO_SIZE = 512
+    STREAM_CHUNK_SIZE = 64 * 1024
 
-    def __init__(self, currency: Optional[str] = None):
+    def __init__(
+        self,
+        currency: Optional[str] = None,
+        route_map: Optional[RouteMap] = None,
+        cache: Optional[ResponseCache] = None,
+        lazy_fares: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+        concurrency: Optional[AIMDController] = None,
+        metrics: Optional[Metrics] = None,
+    ):
         self.currency = currency
+        self.route_map = route_map
+        self.cache = cache
+        self.lazy_fares = lazy_fares
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.concurrency = concurrency
+        self.metrics = metrics
+        if metrics is not None and concurrency is not None:
+            metrics.track_concurrency(concurrency)
 
         self._num_queries = 0
-        self.session_manager = SessionManager()
-        self.session = self.session_manager.get_session()
 
-    def get_cheapest_flights(
+        # Parsed fares keyed by a digest of the response body they came from, least recently used first
+        self._parsed_fares = OrderedDict()
+        # The digest of the last response to each query, least recently used first
+        self._last_digests = OrderedDict()
+        self._memo_lock = threading.Lock()
+
+    def _route_known_impossible(
+        self, origin, destination_airport=None, destination_country=None
+    ):
+        if self.route_map is None or not (destination_airport or destination_country):
+            return None
+        destinations = self.route_map.get(origin)
+        if destinations is None:
+            return None
+        return not RouteMap.allows(
+            destinations, destination_airport, destination_country
+        )
+
+    def _on_routes_error(self, origin, e):
+        logger.warning(
+            f"Could not fetch routes from {origin}, not pruning queries: {e}"
+        )
+
+    def _empty_fare_calendar(self, origin, destination):
+        return FareCalendar(
+            origin=origin, destination=destination, currency=self.currency, prices={}
+        )
+
+    def _build_cheapest_flights_query(
         self,
         airport: str,
         date_from: Union[datetime, date, str],
@@ -53,7 +327,7 @@ class Ryanair:
         max_price: Optional[int] = None,
         destination_airport: Optional[str] = None,
     ):
-        query_url = "".join((Ryanair.BASE_SERVICES_API_URL, "oneWayFares"))
+        query_url = "".join((self.BASE_SERVICES_API_URL, "oneWayFares"))
 
         params = {
             "departureAirportIataCode": airport,
@@ -73,16 +347,9 @@ class Ryanair:
         if custom_params:
             params.update(custom_params)
 
-        response = self._retryable_query(query_url, params)["fares"]
+        return query_url, params
 
-        if response:
-            return [
-                self._parse_cheapest_flight(flight["outbound"]) for flight in response
-            ]
-
-        return []
-
-    def get_cheapest_return_flights(
+    def _build_cheapest_return_flights_query(
         self,
         source_airport: str,
         date_from: Union[datetime, date, str],
@@ -98,7 +365,7 @@ class Ryanair:
         max_price: Optional[int] = None,
         destination_airport: Optional[str] = None,
     ):
-        query_url = "".join((Ryanair.BASE_SERVICES_API_URL, "roundTripFares"))
+        query_url = "".join((self.BASE_SERVICES_API_URL, "roundTripFares"))
 
         params = {
             "departureAirportIataCode": source_airport,
@@ -130,8 +397,128 @@ class Ryanair:
         if custom_params:
             params.update(custom_params)
 
-        response = self._retryable_query(query_url, params)["fares"]
+        return query_url, params
+
+    def _build_fare_calendar_query(
+        self,
+        origin: str,
+        destination: str,
+        month: Union[datetime, date, str],
+    ):
+        query_url = "".join(
+            (
+                self.BASE_SERVICES_API_URL,
+                f"oneWayFares/{origin}/{destination}/cheapestPerDay",
+            )
+        )
+
+        params = {"outboundMonthOfDate": self._format_month_for_api(month)}
+        if self.currency:
+            params["currency"] = self.currency
+
+        return query_url, params
+
+    def _build_return_fare_calendar_query(
+        self,
+        origin: str,
+        destination: str,
+        outbound_month: Union[datetime, date, str],
+        inbound_month: Union[datetime, date, str],
+    ):
+        query_url = "".join(
+            (
+                self.BASE_SERVICES_API_URL,
+                f"roundTripFares/{origin}/{destination}/cheapestPerDay",
+            )
+        )
+
+        params = {
+            "outboundMonthOfDate": self._format_month_for_api(outbound_month),
+            "inboundMonthOfDate": self._format_month_for_api(inbound_month),
+        }
+        if self.currency:
+            params["currency"] = self.currency
+
+        return query_url, params
+
+    def _parse_fare_calendar(self, origin, destination, calendar):
+        currency = None
+        prices = {}
+        for fare in (calendar or {}).get("fares") or []:
+            price = fare.get("price")
+            if fare.get("unavailable") or fare.get("soldOut") or not price:
+                continue
+            currency = price["currencyCode"]
+            prices[date.fromisoformat(fare["day"])] = price["value"]
+
+        if self.currency and currency and self.currency != currency:
+            logger.warning(
+                f"Requested fare calendar in {self.currency} but API responded with fares in {currency}"
+            )
+        return FareCalendar(
+            origin=origin,
+            destination=destination,
+            currency=currency or self.currency,
+            prices=prices,
+        )
+
+    def _parse_fares_body(
+        self, url, params, body: bytes, parse, parse_typed
+    ) -> FareList:
+        """
+        Parse the ``fares`` of a response body with ``parse`` (or ``parse_typed``, see :meth:`_decode_and_parse`),
+        unless a byte-identical body was parsed before, in which case the previously parsed (shared, so treat them
+        as read-only) results are returned as they are.
+        """
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        memo_key = (url, self.currency, digest)
+        query_key = cache_key(url, params)
+
+        with self._memo_lock:
+            fares = self._parsed_fares.get(memo_key)
+            if fares is not None:
+                self._parsed_fares.move_to_end(memo_key)
+            changed = self._last_digests.get(query_key) != digest
+            self._last_digests[query_key] = digest
+            self._last_digests.move_to_end(query_key)
+            while len(self._last_digests) > self.PARSED_FARES_MEMO_SIZE:
+                self._last_digests.popitem(last=False)
+
+        parse_time = None
+        if fares is None:
+            start = perf_counter()
+            fares = tuple(self._decode_and_parse(body, parse, parse_typed))
+            parse_time = perf_counter() - start
+            with self._memo_lock:
+                self._parsed_fares[memo_key] = fares
+                while len(self._parsed_fares) > self.PARSED_FARES_MEMO_SIZE:
+                    self._parsed_fares.popitem(last=False)
 
+        if self.metrics is not None:
+            self.metrics.record_parse(url, len(fares), parse_time)
+        return FareList(fares, digest=digest.hex(), changed=changed)
+
+    def _decode_and_parse(self, body: bytes, parse, parse_typed):
+        """
+        The fares of a response body, decoded straight into typed records and built with ``parse_typed`` when
+        msgspec is installed, or decoded into dicts and built with ``parse`` otherwise (and for lazy fares, which
+        keep the dicts).
+        """
+        if not self.lazy_fares:
+            fares = decode_fares(body)
+            if fares is not None:
+                return parse_typed(fares)
+        return parse(loads(body)["fares"])
+
+    def _parse_cheapest_flights(self, response):
+        if response:
+            return [
+                self._parse_cheapest_flight(flight["outbound"]) for flight in response
+            ]
+
+        return []
+
+    def _parse_cheapest_return_flights(self, response):
         if response:
             return [
                 self._parse_cheapest_return_flights_as_trip(
@@ -142,6 +529,36 @@ class Ryanair:
         else:
             return []
 
+    def _parse_typed_flights(self, fares):
+        return [self._parse_typed_flight(fare.outbound) for fare in fares]
+
+    def _parse_typed_return_flights(self, fares):
+        trips = []
+        for fare in fares:
+            outbound = self._parse_typed_flight(fare.outbound)
+            inbound = self._parse_typed_flight(fare.inbound)
+            trips.append(
+                Trip(
+                    outbound=outbound,
+                    inbound=inbound,
+                    totalPrice=inbound.price + outbound.price,
+                )
+            )
+        return trips
+
+    def _retry_hook(self, url):
+        if self.metrics is None:
+            return None
+        return functools.partial(self.metrics.record_retry, url)
+
+    def _record_request(self, url, start, body: Optional[bytes] = None, error=None):
+        self.metrics.record_request(
+            url,
+            perf_counter() - start,
+            len(body) if body else 0,
+            RetryPolicy.classify(error) if error is not None else None,
+        )
+
     @staticmethod
     def _get_backoff_type():
         if "unittest" in sys.modules.keys():
@@ -149,54 +566,60 @@ class Ryanair:
 
         return backoff.expo()
 
-    @staticmethod
-    def _on_query_error(e):
-        logger.exception(f"Gave up retrying query, last exception was {e}")
-
-    @backoff.on_exception(
-        lambda: Ryanair._get_backoff_type(),
-        Exception,
-        max_tries=5,
-        logger=logger,
-        raise_on_giveup=True,
-        on_giveup=_on_query_error,
-    )
-    def _retryable_query(self, url, params=None):
-        self._num_queries += 1
-        response = self.session.get(url, params=params)
-        response.raise_for_status()
-        return response.json()
-
-    def _parse_cheapest_flight(self, flight):
-        currency = flight["price"]["currencyCode"]
+    def _check_currency(self, currency):
         if self.currency and self.currency != currency:
             logger.warning(
                 f"Requested cheapest flights in {self.currency} but API responded with fares in {currency}"
             )
+
+    def _parse_cheapest_flight(self, flight):
+        currency = flight["price"]["currencyCode"]
+        self._check_currency(currency)
+        if self.lazy_fares:
+            return LazyFlight(flight)
+        departure_airport = flight["departureAirport"]
+        arrival_airport = flight["arrivalAirport"]
         return Flight(
-            origin=flight["departureAirport"]["iataCode"],
-            originFull=", ".join(
-                (
-                    flight["departureAirport"]["name"],
-                    flight["departureAirport"]["countryName"],
-                )
+            origin=sys.intern(departure_airport["iataCode"]),
+            originFull=_airport_label(
+                departure_airport["name"], departure_airport["countryName"]
             ),
-            destination=flight["arrivalAirport"]["iataCode"],
-            destinationFull=", ".join(
-                (
-                    flight["arrivalAirport"]["name"],
-                    flight["arrivalAirport"]["countryName"],
-                )
+            destination=sys.intern(arrival_airport["iataCode"]),
+            destinationFull=_airport_label(
+                arrival_airport["name"], arrival_airport["countryName"]
             ),
             departureTime=datetime.fromisoformat(flight["departureDate"]),
-            flightNumber=f"{flight['flightNumber'][:2]} {flight['flightNumber'][2:]}",
+            flightNumber=_flight_number(flight["flightNumber"]),
             price=flight["price"]["value"],
-            currency=currency,
+            currency=sys.intern(currency),
+        )
+
+    def _parse_typed_flight(self, leg):
+        """A :class:`Flight` from a leg decoded by :func:`ryanair.decoding.decode_fares`."""
+        currency = leg.price.currencyCode
+        self._check_currency(currency)
+        departure_airport = leg.departureAirport
+        arrival_airport = leg.arrivalAirport
+        return Flight(
+            origin=sys.intern(departure_airport.iataCode),
+            originFull=_airport_label(
+                departure_airport.name, departure_airport.countryName
+            ),
+            destination=sys.intern(arrival_airport.iataCode),
+            destinationFull=_airport_label(
+                arrival_airport.name, arrival_airport.countryName
+            ),
+            departureTime=leg.departureDate,
+            flightNumber=_flight_number(leg.flightNumber),
+            price=leg.price.value,
+            currency=sys.intern(currency),
         )
 
     def _parse_cheapest_return_flights_as_trip(self, outbound, inbound):
         outbound = self._parse_cheapest_flight(outbound)
         inbound = self._parse_cheapest_flight(inbound)
+        if self.lazy_fares:
+            return LazyTrip(outbound, inbound)
 
         return Trip(
             outbound=outbound,
@@ -215,6 +638,14 @@ class Ryanair:
         if isinstance(d, date):
             return d.isoformat()
 
+    @staticmethod
+    def _format_month_for_api(m: Union[datetime, date, str]):
+        if isinstance(m, str):
+            # Accept both "2023-09" and "2023-09-14"
+            return f"{m[:7]}-01"
+
+        return m.replace(day=1).strftime("%Y-%m-%d")
+
     @staticmethod
     def _format_time_for_api(t: Union[time, str]):
         if isinstance(t, str):
@@ -224,5 +655,821 @@ class Ryanair:
             return t.strftime("%H:%M")
 
     @property
-    def num_queries(self) -> __init__:
+    def num_queries(self) -> int:
         return self._num_queries
+
+    @property
+    def concurrency_limit(self) -> Optional[int]:
+        """Current limit on requests in flight when an adaptive ``concurrency`` controller is used."""
+        return self.concurrency.limit if self.concurrency is not None else None
+
+    @property
+    def retry_counts(self) -> dict:
+        """Retries made so far, per failure class (see :class:`RetryPolicy`)."""
+        return dict(self.retry_policy.retries)
+
+    @property
+    def cache_hits(self) -> int:
+        return self.cache.hits if self.cache is not None else 0
+
+    @property
+    def cache_misses(self) -> int:
+        return self.cache.misses if self.cache is not None else 0
+
+    @property
+    def cache_evictions(self) -> int:
+        return self.cache.evictions if self.cache is not None else 0
+
+
+class Ryanair(_RyanairBase):
+    def __init__(
+        self,
+        currency: Optional[str] = None,
+        route_map: Optional[RouteMap] = None,
+        cache: Optional[ResponseCache] = None,
+        lazy_fares: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+        concurrency: Optional[AIMDController] = None,
+        transport: Optional[Transport] = None,
+        metrics: Optional[Metrics] = None,
+    ):
+        """
+        :param route_map: when given, queries filtered to a destination airport or country that isn't served
+            from the origin return no fares without querying the fares API.
+        :param cache: when given, responses are served from and stored in this cache; hits skip the network
+            and the retries entirely.
+        :param lazy_fares: return :class:`LazyFlight`/:class:`LazyTrip` views that only parse the fields that
+            are actually read, instead of fully parsed ``Flight``/``Trip`` objects.
+        :param retry_policy: which failures are retried and how; see :class:`RetryPolicy` for the default.
+        :param concurrency: when given, requests from all threads wait for a slot of this adaptive limit.
+        :param transport: how requests are made, e.g. ``HTTP2Transport()`` to multiplex them over one
+            connection; defaults to a :class:`RequestsTransport` with its default pool size and timeouts.
+        :param metrics: when given, requests, retries, cache hits and parsing are recorded in it per endpoint.
+        """
+        super().__init__(
+            currency, route_map, cache, lazy_fares, retry_policy, concurrency, metrics
+        )
+
+        self._lock = threading.Lock()
+        self._thread_local = threading.local()
+
+        self.session_manager = SessionManager(transport=transport)
+        self.session = self.session_manager.get_session()
+        self._session_thread = threading.get_ident()
+
+    def get_cheapest_flights(
+        self,
+        airport: str,
+        date_from: Union[datetime, date, str],
+        date_to: Union[datetime, date, str],
+        destination_country: Optional[str] = None,
+        custom_params: Optional[dict] = None,
+        departure_time_from: Union[str, time] = "00:00",
+        departure_time_to: Union[str, time] = "23:59",
+        max_price: Optional[int] = None,
+        destination_airport: Optional[str] = None,
+    ):
+        if not self._route_possible(airport, destination_airport, destination_country):
+            return []
+
+        query_url, params = self._build_cheapest_flights_query(
+            airport,
+            date_from,
+            date_to,
+            destination_country=destination_country,
+            custom_params=custom_params,
+            departure_time_from=departure_time_from,
+            departure_time_to=departure_time_to,
+            max_price=max_price,
+            destination_airport=destination_airport,
+        )
+
+        body = self._fetch_body(query_url, params)
+
+        return self._parse_fares_body(
+            query_url,
+            params,
+            body,
+            self._parse_cheapest_flights,
+            self._parse_typed_flights,
+        )
+
+    def get_cheapest_return_flights(
+        self,
+        source_airport: str,
+        date_from: Union[datetime, date, str],
+        date_to: Union[datetime, date, str],
+        return_date_from: Union[datetime, date, str],
+        return_date_to: Union[datetime, date, str],
+        destination_country: Optional[str] = None,
+        custom_params: Optional[dict] = None,
+        outbound_departure_time_from: Union[str, time] = "00:00",
+        outbound_departure_time_to: Union[str, time] = "23:59",
+        inbound_departure_time_from: Union[str, time] = "00:00",
+        inbound_departure_time_to: Union[str, time] = "23:59",
+        max_price: Optional[int] = None,
+        destination_airport: Optional[str] = None,
+    ):
+        if not self._route_possible(
+            source_airport, destination_airport, destination_country
+        ):
+            return []
+
+        query_url, params = self._build_cheapest_return_flights_query(
+            source_airport,
+            date_from,
+            date_to,
+            return_date_from,
+            return_date_to,
+            destination_country=destination_country,
+            custom_params=custom_params,
+            outbound_departure_time_from=outbound_departure_time_from,
+            outbound_departure_time_to=outbound_departure_time_to,
+            inbound_departure_time_from=inbound_departure_time_from,
+            inbound_departure_time_to=inbound_departure_time_to,
+            max_price=max_price,
+            destination_airport=destination_airport,
+        )
+
+        body = self._fetch_body(query_url, params)
+
+        return self._parse_fares_body(
+            query_url,
+            params,
+            body,
+            self._parse_cheapest_return_flights,
+            self._parse_typed_return_flights,
+        )
+
+    def iter_cheapest_flights(
+        self,
+        airport: str,
+        date_from: Union[datetime, date, str],
+        date_to: Union[datetime, date, str],
+        destination_country: Optional[str] = None,
+        custom_params: Optional[dict] = None,
+        departure_time_from: Union[str, time] = "00:00",
+        departure_time_to: Union[str, time] = "23:59",
+        max_price: Optional[int] = None,
+        destination_airport: Optional[str] = None,
+    ) -> Iterator[Flight]:
+        """
+        Like :meth:`get_cheapest_flights`, but yields each ``Flight`` as soon as it has been downloaded instead of
+        returning them all at once, so memory use doesn't grow with the size of the response.
+        """
+        if not self._route_possible(airport, destination_airport, destination_country):
+            return
+
+        query_url, params = self._build_cheapest_flights_query(
+            airport,
+            date_from,
+            date_to,
+            destination_country=destination_country,
+            custom_params=custom_params,
+            departure_time_from=departure_time_from,
+            departure_time_to=departure_time_to,
+            max_price=max_price,
+            destination_airport=destination_airport,
+        )
+
+        for fare in self._iter_fares(query_url, params):
+            yield self._parse_cheapest_flight(fare["outbound"])
+
+    def iter_cheapest_return_flights(
+        self,
+        source_airport: str,
+        date_from: Union[datetime, date, str],
+        date_to: Union[datetime, date, str],
+        return_date_from: Union[datetime, date, str],
+        return_date_to: Union[datetime, date, str],
+        destination_country: Optional[str] = None,
+        custom_params: Optional[dict] = None,
+        outbound_departure_time_from: Union[str, time] = "00:00",
+        outbound_departure_time_to: Union[str, time] = "23:59",
+        inbound_departure_time_from: Union[str, time] = "00:00",
+        inbound_departure_time_to: Union[str, time] = "23:59",
+        max_price: Optional[int] = None,
+        destination_airport: Optional[str] = None,
+    ) -> Iterator[Trip]:
+        """
+        Like :meth:`get_cheapest_return_flights`, but yields each ``Trip`` as soon as it has been downloaded.
+        """
+        if not self._route_possible(
+            source_airport, destination_airport, destination_country
+        ):
+            return
+
+        query_url, params = self._build_cheapest_return_flights_query(
+            source_airport,
+            date_from,
+            date_to,
+            return_date_from,
+            return_date_to,
+            destination_country=destination_country,
+            custom_params=custom_params,
+            outbound_departure_time_from=outbound_departure_time_from,
+            outbound_departure_time_to=outbound_departure_time_to,
+            inbound_departure_time_from=inbound_departure_time_from,
+            inbound_departure_time_to=inbound_departure_time_to,
+            max_price=max_price,
+            destination_airport=destination_airport,
+        )
+
+        for fare in self._iter_fares(query_url, params):
+            yield self._parse_cheapest_return_flights_as_trip(
+                fare["outbound"], fare["inbound"]
+            )
+
+    def get_fares_body(self, query: Query) -> bytes:
+        """
+        The raw response body of a one-way or round-trip ``query``, fetched (or taken from the cache) like the fares
+        it would return but left unparsed, e.g. to parse many of them with :class:`ryanair.parallel.FareParserPool`.
+        """
+        if query.method == "get_cheapest_flights":
+            query_url, params = self._build_cheapest_flights_query(
+                *query.args, **query.kwargs
+            )
+        elif query.method == "get_cheapest_return_flights":
+            query_url, params = self._build_cheapest_return_flights_query(
+                *query.args, **query.kwargs
+            )
+        else:
+            raise ValueError(f"{query.method} queries don't return fares")
+
+        if not self._route_possible(
+            params["departureAirportIataCode"],
+            params.get("arrivalAirportIataCode"),
+            params.get("arrivalCountryCode"),
+        ):
+            return b'{"fares": []}'
+        return self._fetch_body(query_url, params)
+
+    def get_fare_calendar(
+        self,
+        origin: str,
+        destination: str,
+        month: Union[datetime, date, str],
+    ) -> FareCalendar:
+        """
+        Cheapest one-way fare for every day of ``month`` on a single route, fetched in one request.
+        """
+        if not self._route_possible(origin, destination):
+            return self._empty_fare_calendar(origin, destination)
+
+        query_url, params = self._build_fare_calendar_query(origin, destination, month)
+
+        response = self._retryable_query(query_url, params)
+
+        return self._parse_fare_calendar(origin, destination, response["outbound"])
+
+    def get_return_fare_calendar(
+        self,
+        origin: str,
+        destination: str,
+        outbound_month: Union[datetime, date, str],
+        inbound_month: Optional[Union[datetime, date, str]] = None,
+    ) -> Tuple[FareCalendar, FareCalendar]:
+        """
+        Cheapest fare for every day of ``outbound_month`` from ``origin`` to ``destination`` and of
+        ``inbound_month`` (defaults to the outbound month) back again, fetched in one request.
+        """
+        if not self._route_possible(origin, destination):
+            return (
+                self._empty_fare_calendar(origin, destination),
+                self._empty_fare_calendar(destination, origin),
+            )
+
+        query_url, params = self._build_return_fare_calendar_query(
+            origin, destination, outbound_month, inbound_month or outbound_month
+        )
+
+        response = self._retryable_query(query_url, params)
+
+        return (
+            self._parse_fare_calendar(origin, destination, response["outbound"]),
+            self._parse_fare_calendar(destination, origin, response["inbound"]),
+        )
+
+    def get_many(
+        self, queries: Iterable[Query], max_workers: Optional[int] = None
+    ) -> List:
+        """
+        Run the given queries on a pool of ``max_workers`` threads and return their results
+        in input order. A query that fails has its exception in its slot in the result list,
+        the rest of the batch still runs.
+
+        ``max_workers`` defaults to 8, or to the controller's ``max_limit`` with an adaptive ``concurrency``
+        controller, which then decides how many of the workers have a request in flight.
+        """
+        if max_workers is None:
+            max_workers = self.concurrency.max_limit if self.concurrency else 8
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(query.run, self) for query in queries]
+
+        return [
+            future.exception() if future.exception() else future.result()
+            for future in futures
+        ]
+
+    def _route_possible(
+        self, origin, destination_airport=None, destination_country=None
+    ):
+        impossible = self._route_known_impossible(
+            origin, destination_airport, destination_country
+        )
+        if (
+            impossible is None
+            and self.route_map
+            and (destination_airport or destination_country)
+        ):
+            url = self.route_map.routes_url(origin)
+            try:
+                self.route_map.get_or_fetch(origin, lambda: self._retryable_query(url))
+            except Exception as e:
+                self._on_routes_error(origin, e)
+                return True
+            impossible = self._route_known_impossible(
+                origin, destination_airport, destination_country
+            )
+        return not impossible
+
+    def close(self):
+        """Close the transport's connections."""
+        self.session_manager.close()
+
+    def _get_session(self):
+        if threading.get_ident() == self._session_thread:
+            return self.session
+
+        session = getattr(self._thread_local, "session", None)
+        if session is None:
+            session = self._thread_local.session = self.session_manager.new_session()
+        return session
+
+    def _retryable_query(self, url, params=None):
+        return loads(self._fetch_body(url, params))
+
+    def _fetch_body(self, url, params=None) -> bytes:
+        if self.cache is None:
+            return self._query_with_retries(url, params)
+        if self.metrics is None:
+            return self.cache.get_or_fetch(
+                url, params, lambda: self._query_with_retries(url, params)
+            )
+
+        fetched = False
+
+        def fetch():
+            nonlocal fetched
+            fetched = True
+            return self._query_with_retries(url, params)
+
+        body = self.cache.get_or_fetch(url, params, fetch)
+        if not fetched:
+            self.metrics.record_cache_hit(url)
+        return body
+
+    def _iter_fares(self, url, params=None) -> Iterator[dict]:
+        # Streamed responses aren't stored in the cache (that would mean holding the whole body), but a cached
+        # response is still used instead of going to the network
+        body = self.cache.get(url, params) if self.cache is not None else None
+        if body is not None:
+            if self.metrics is not None:
+                self.metrics.record_cache_hit(url)
+            yield from iter_array_items((body,))
+            return
+
+        response = self._open_stream(url, params)
+        chunks = response.iter_content(chunk_size=self.STREAM_CHUNK_SIZE)
+        try:
+            if self.metrics is None:
+                yield from iter_array_items(chunks)
+                return
+            # Parsing overlaps with reading the stream, so only bytes and fares are recorded
+            received = 0
+
+            def counted(chunks):
+                nonlocal received
+                for chunk in chunks:
+                    received += len(chunk)
+                    yield chunk
+
+            fares = 0
+            try:
+                for fare in iter_array_items(counted(chunks)):
+                    fares += 1
+                    yield fare
+            finally:
+                self.metrics.record_bytes(url, received)
+            self.metrics.record_parse(url, fares)
+        finally:
+            response.close()
+
+    def _open_stream(self, url, params=None):
+        return self.retry_policy.call(
+            self._open_stream_once, url, params, on_retry=self._retry_hook(url)
+        )
+
+    def _open_stream_once(self, url, params=None):
+        with self._lock:
+            self._num_queries += 1
+        with self._concurrency_slot():
+            start = perf_counter()
+            try:
+                response = self._get_session().get(url, params=params, stream=True)
+                self._raise_for_status(response)
+            except Exception as e:
+                if self.metrics is not None:
+                    self._record_request(url, start, error=e)
+                raise
+            if self.metrics is not None:
+                # The body is counted as it is streamed
+                self._record_request(url, start)
+        return response
+
+    def _query_with_retries(self, url, params=None) -> bytes:
+        return self.retry_policy.call(
+            self._query_once, url, params, on_retry=self._retry_hook(url)
+        )
+
+    def _query_once(self, url, params=None) -> bytes:
+        with self._lock:
+            self._num_queries += 1
+        with self._concurrency_slot():
+            start = perf_counter()
+            try:
+                response = self._get_session().get(url, params=params)
+                self._raise_for_status(response)
+            except Exception as e:
+                if self.metrics is not None:
+                    self._record_request(url, start, error=e)
+                raise
+            if self.metrics is not None:
+                self._record_request(url, start, response.content)
+        return response.content
+
+    def _raise_for_status(self, response):
+        try:
+            response.raise_for_status()
+        except requests.HTTPError as e:
+            if RetryPolicy.classify(e) == "session":
+                # Retried by the retry policy, with the new cookies
+                self.session_manager.refresh()
+            raise
+
+    def _concurrency_slot(self):
+        if self.concurrency is None:
+            return nullcontext()
+        return self.concurrency.slot(RetryPolicy.is_congestion)
+
+
+class AsyncRyanair(_RyanairBase):
+    """
+    asyncio counterpart of :class:`Ryanair`, with the same query methods and return types.
+
+    At most ``max_concurrency`` requests are in flight at once, so a batch of queries issued
+    through :meth:`gather_many` costs roughly one round-trip per concurrency slot rather than
+    one per query. With an adaptive ``concurrency`` controller, the controller's limit is used
+    instead. The ``transport``'s timeouts apply, and an :class:`HTTP2Transport` multiplexes the
+    requests over HTTP/2; recording, replaying and fake server transports work as they do with
+    :class:`Ryanair`. Requires ``httpx`` (``pip install ryanair-py[async]``).
+    """
+
+    def __init__(
+        self,
+        currency: Optional[str] = None,
+        max_concurrency: int = 8,
+        route_map: Optional[RouteMap] = None,
+        cache: Optional[ResponseCache] = None,
+        lazy_fares: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+        concurrency: Optional[AIMDController] = None,
+        transport: Optional[Transport] = None,
+        metrics: Optional[Metrics] = None,
+    ):
+        if httpx is None:
+            raise RyanairException(
+                "AsyncRyanair requires httpx, install it with `pip install httpx`"
+            )
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        super().__init__(
+            currency, route_map, cache, lazy_fares, retry_policy, concurrency, metrics
+        )
+
+        self.max_concurrency = max_concurrency
+        # Requests always go through httpx, via the transport's async_transport()
+        self.transport = transport if transport is not None else RequestsTransport()
+        # Shares the session cookies with Ryanair clients and earlier runs; nothing is fetched until needed
+        self.session_manager = SessionManager()
+        self.client = None
+        self._client_lock = None
+        self._semaphore = None
+        self._in_flight = {}
+        self._route_lookups = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    async def aclose(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def get_cheapest_flights(
+        self,
+        airport: str,
+        date_from: Union[datetime, date, str],
+        date_to: Union[datetime, date, str],
+        destination_country: Optional[str] = None,
+        custom_params: Optional[dict] = None,
+        departure_time_from: Union[str, time] = "00:00",
+        departure_time_to: Union[str, time] = "23:59",
+        max_price: Optional[int] = None,
+        destination_airport: Optional[str] = None,
+    ):
+        if not await self._route_possible(
+            airport, destination_airport, destination_country
+        ):
+            return []
+
+        query_url, params = self._build_cheapest_flights_query(
+            airport,
+            date_from,
+            date_to,
+            destination_country=destination_country,
+            custom_params=custom_params,
+            departure_time_from=departure_time_from,
+            departure_time_to=departure_time_to,
+            max_price=max_price,
+            destination_airport=destination_airport,
+        )
+
+        body = await self._fetch_body(query_url, params)
+
+        return self._parse_fares_body(
+            query_url,
+            params,
+            body,
+            self._parse_cheapest_flights,
+            self._parse_typed_flights,
+        )
+
+    async def get_cheapest_return_flights(
+        self,
+        source_airport: str,
+        date_from: Union[datetime, date, str],
+        date_to: Union[datetime, date, str],
+        return_date_from: Union[datetime, date, str],
+        return_date_to: Union[datetime, date, str],
+        destination_country: Optional[str] = None,
+        custom_params: Optional[dict] = None,
+        outbound_departure_time_from: Union[str, time] = "00:00",
+        outbound_departure_time_to: Union[str, time] = "23:59",
+        inbound_departure_time_from: Union[str, time] = "00:00",
+        inbound_departure_time_to: Union[str, time] = "23:59",
+        max_price: Optional[int] = None,
+        destination_airport: Optional[str] = None,
+    ):
+        if not await self._route_possible(
+            source_airport, destination_airport, destination_country
+        ):
+            return []
+
+        query_url, params = self._build_cheapest_return_flights_query(
+            source_airport,
+            date_from,
+            date_to,
+            return_date_from,
+            return_date_to,
+            destination_country=destination_country,
+            custom_params=custom_params,
+            outbound_departure_time_from=outbound_departure_time_from,
+            outbound_departure_time_to=outbound_departure_time_to,
+            inbound_departure_time_from=inbound_departure_time_from,
+            inbound_departure_time_to=inbound_departure_time_to,
+            max_price=max_price,
+            destination_airport=destination_airport,
+        )
+
+        body = await self._fetch_body(query_url, params)
+
+        return self._parse_fares_body(
+            query_url,
+            params,
+            body,
+            self._parse_cheapest_return_flights,
+            self._parse_typed_return_flights,
+        )
+
+    async def get_fare_calendar(
+        self,
+        origin: str,
+        destination: str,
+        month: Union[datetime, date, str],
+    ) -> FareCalendar:
+        """
+        Cheapest one-way fare for every day of ``month`` on a single route, fetched in one request.
+        """
+        if not await self._route_possible(origin, destination):
+            return self._empty_fare_calendar(origin, destination)
+
+        query_url, params = self._build_fare_calendar_query(origin, destination, month)
+
+        response = await self._retryable_query(query_url, params)
+
+        return self._parse_fare_calendar(origin, destination, response["outbound"])
+
+    async def get_return_fare_calendar(
+        self,
+        origin: str,
+        destination: str,
+        outbound_month: Union[datetime, date, str],
+        inbound_month: Optional[Union[datetime, date, str]] = None,
+    ) -> Tuple[FareCalendar, FareCalendar]:
+        """
+        Cheapest fare for every day of ``outbound_month`` from ``origin`` to ``destination`` and of
+        ``inbound_month`` (defaults to the outbound month) back again, fetched in one request.
+        """
+        if not await self._route_possible(origin, destination):
+            return (
+                self._empty_fare_calendar(origin, destination),
+                self._empty_fare_calendar(destination, origin),
+            )
+
+        query_url, params = self._build_return_fare_calendar_query(
+            origin, destination, outbound_month, inbound_month or outbound_month
+        )
+
+        response = await self._retryable_query(query_url, params)
+
+        return (
+            self._parse_fare_calendar(origin, destination, response["outbound"]),
+            self._parse_fare_calendar(destination, origin, response["inbound"]),
+        )
+
+    async def gather_many(
+        self, queries: Iterable[Query], return_exceptions: bool = False
+    ) -> List:
+        """
+        Run the given queries concurrently and return their results in input order.
+        With ``return_exceptions=True`` a failed query yields its exception instead of
+        aborting the whole batch.
+        """
+        return await asyncio.gather(
+            *(query.run(self) for query in queries),
+            return_exceptions=return_exceptions,
+        )
+
+    async def _route_possible(
+        self, origin, destination_airport=None, destination_country=None
+    ):
+        impossible = self._route_known_impossible(
+            origin, destination_airport, destination_country
+        )
+        if (
+            impossible is None
+            and self.route_map
+            and (destination_airport or destination_country)
+        ):
+            try:
+                await self._lookup_routes(origin)
+            except Exception as e:
+                self._on_routes_error(origin, e)
+                return True
+            impossible = self._route_known_impossible(
+                origin, destination_airport, destination_country
+            )
+        return not impossible
+
+    async def _lookup_routes(self, origin):
+        # Single-flight: concurrent queries from the same origin share one routes lookup
+        task = self._route_lookups.get(origin)
+        if task is None:
+            task = self._route_lookups[origin] = asyncio.ensure_future(
+                self._fetch_routes(origin)
+            )
+            task.add_done_callback(lambda _: self._route_lookups.pop(origin, None))
+        return await asyncio.shield(task)
+
+    async def _fetch_routes(self, origin):
+        routes = await self._retryable_query(self.route_map.routes_url(origin))
+        return self.route_map.update(origin, routes)
+
+    async def _get_client(self):
+        # Created lazily so that the asyncio primitives bind to the running loop
+        if self._client_lock is None:
+            self._client_lock = asyncio.Lock()
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._client_lock:
+            if self.client is None:
+                limits = httpx.Limits(
+                    max_connections=self.concurrency.max_limit
+                    if self.concurrency
+                    else self.max_concurrency
+                )
+                needs_cookies = self.transport.needs_session_cookies
+                cookies = (
+                    self.session_manager.valid_cookies() if needs_cookies else None
+                )
+                client = httpx.AsyncClient(
+                    transport=self.transport.async_transport(limits),
+                    timeout=self.transport.httpx_timeout(),
+                    cookies=cookies,
+                )
+                if needs_cookies and cookies is None:
+                    try:
+                        await self._bootstrap_session(client)
+                    except BaseException:
+                        await client.aclose()
+                        raise
+                self.client = client
+        return self.client
+
+    async def _bootstrap_session(self, client):
+        # Visit main website to get session cookies
+        response = await client.get(SessionManager.BASE_SITE_FOR_SESSION_URL)
+        response.raise_for_status()
+        self.session_manager.store_cookies(client.cookies.jar)
+
+    async def _refresh_session(self, client):
+        async with self._client_lock:
+            if self.session_manager.recently_refreshed():
+                # Another request (or client) already replaced the cookies
+                cookies = self.session_manager.valid_cookies()
+                if cookies is not None:
+                    client.cookies = cookies
+                return
+            logger.info("Refreshing the Ryanair session cookies")
+            self.session_manager.invalidate()
+            client.cookies.clear()
+            await self._bootstrap_session(client)
+
+    async def _retryable_query(self, url, params=None):
+        return loads(await self._fetch_body(url, params))
+
+    async def _fetch_body(self, url, params=None) -> bytes:
+        if self.cache is None:
+            return await self._query_with_retries(url, params)
+
+        cached = self.cache.get(url, params)
+        if cached is not None:
+            if self.metrics is not None:
+                self.metrics.record_cache_hit(url)
+            return cached
+
+        # Single-flight: concurrent identical queries share one upstream request
+        key = cache_key(url, params)
+        task = self._in_flight.get(key)
+        if task is not None and self.metrics is not None:
+            self.metrics.record_cache_hit(url)
+        if task is None:
+            task = self._in_flight[key] = asyncio.ensure_future(
+                self._query_and_store(url, params)
+            )
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _query_and_store(self, url, params):
+        response = await self._query_with_retries(url, params)
+        self.cache.set(url, params, response)
+        return response
+
+    async def _query_with_retries(self, url, params=None) -> bytes:
+        return await self.retry_policy.call(
+            self._query_once, url, params, on_retry=self._retry_hook(url)
+        )
+
+    async def _query_once(self, url, params=None) -> bytes:
+        client = await self._get_client()
+        async with self._concurrency_slot():
+            self._num_queries += 1
+            start = perf_counter()
+            try:
+                response = await client.get(url, params=params)
+                response.raise_for_status()
+            except Exception as e:
+                if self.metrics is not None:
+                    self._record_request(url, start, error=e)
+                if (
+                    isinstance(e, httpx.HTTPStatusError)
+                    and RetryPolicy.classify(e) == "session"
+                ):
+                    # Retried by the retry policy, with the new cookies
+                    await self._refresh_session(client)
+                raise
+            if self.metrics is not None:
+                self._record_request(url, start, response.content)
+        return response.content
+
+    def _concurrency_slot(self):
+        if self.concurrency is None:
+            return self._semaphore
+        return self.concurrency.async_slot(RetryPolicy.is_congestion)
+
+    @property
+    def concurrency_limit(self) -> int:
+        return self.concurrency.limit if self.concurrency else self.max_concurrency
@@ -0,0 +1,99 @@
+"""
+Incremental parsing of fare responses, so the items of the ``fares`` array can be handed out one at a time while the
+response is still being downloaded, without ever holding the whole body (or all of its parsed fares) in memory.
+"""
+import codecs
+import json
+from typing import Iterable, Iterator
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+class _Buffer:
+    """Decoded response text read on demand from an iterable of byte chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Read another chunk, returning False once the stream is exhausted."""
+        if self.eof:
+            return False
+        for chunk in self._chunks:
+            text = self._utf8.decode(chunk)
+            if text:
+                # Drop what has been consumed already, so the buffer never grows past about one fare + one chunk
+                self.text = self.text[self.pos :] + text
+                self.pos = 0
+                return True
+        self.text = self.text[self.pos :] + self._utf8.decode(b"", final=True)
+        self.pos = 0
+        self.eof = True
+        return False
+
+    def peek(self) -> str:
+        """The next non-whitespace character, without consuming it."""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                raise ValueError("Unexpected end of response body")
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos}, found {found!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # A number at the very end of the buffer may continue in the next chunk
+            if end == len(self.text) and not self.eof and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_array_items(chunks: Iterable[bytes], key: str = "fares") -> Iterator:
+    """
+    Yield the items of the array stored under ``key`` in the top-level JSON object read from ``chunks``, each one
+    as soon as it has been received. Other members of the object are skipped; a missing or ``null`` array yields
+    nothing.
+    """
+    buffer = _Buffer(chunks)
+    buffer.expect("{")
+    if buffer.peek() == "}":
+        return
+    while True:
+        name = buffer.value()
+        buffer.expect(":")
+        if name == key and buffer.peek() == "[":
+            buffer.pos += 1
+            if buffer.peek() != "]":
+                while True:
+                    yield buffer.value()
+                    if buffer.peek() != ",":
+                        break
+                    buffer.pos += 1
+            buffer.expect("]")
+        else:
+            buffer.value()
+        if buffer.peek() != ",":
+            break
+        buffer.pos += 1
+    buffer.expect("}")
@@ -1,8 +1,14 @@
-from dataclasses import dataclass
-from datetime import datetime
+import functools
+import sys
+from dataclasses import dataclass, field, replace
+from datetime import datetime, date
+from typing import Dict, Optional
 
+# Fares are created by the hundred thousand in wide sweeps, so they have no per-instance __dict__ where supported
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(frozen=True, **_SLOTS)
 class Flight:
     departureTime: datetime
     flightNumber: str
@@ -12,10 +18,265 @@ class Flight:
     originFull: str
     destination: str
     destinationFull: str
+    # The airport a search was made from (for the inbound leg of a return trip, the one it flies back to)
+    searchOrigin: Optional[str] = None
+    searchOriginName: Optional[str] = None
 
+    def with_search_origin(self, code: str, name: Optional[str] = None) -> "Flight":
+        return replace(self, searchOrigin=code, searchOriginName=name)
 
-@dataclass
+
+@dataclass(frozen=True, **_SLOTS)
 class Trip:
     totalPrice: float
     outbound: Flight
     inbound: Flight
+    searchOrigin: Optional[str] = None
+    searchOriginName: Optional[str] = None
+
+    def with_search_origin(self, code: str, name: Optional[str] = None) -> "Trip":
+        """A copy of this trip with both legs labelled with the airport the search was made from."""
+        return replace(
+            self,
+            outbound=self.outbound.with_search_origin(code, name),
+            inbound=self.inbound.with_search_origin(code, name),
+            searchOrigin=code,
+            searchOriginName=name,
+        )
+
+
+@functools.lru_cache(maxsize=4096)
+def _airport_label(name: str, country_name: str) -> str:
+    # There are only a few hundred airports, so every fare for one shares the same label string
+    return sys.intern(", ".join((name, country_name)))
+
+
+def _flight_number(raw: str) -> str:
+    return sys.intern(f"{raw[:2]} {raw[2:]}")
+
+
+_UNSET = object()
+
+
+class LazyFlight:
+    """
+    Read-only view of one leg of a raw fare from the API with the same attributes as :class:`Flight`. Cheap fields
+    are read straight from the fare, the rest (departure time, flight number) are parsed when first accessed.
+    Views keep the raw fare alive; use :meth:`to_flight` to get a plain ``Flight``.
+    """
+
+    __slots__ = (
+        "_fare",
+        "_departure_time",
+        "_flight_number",
+        "_search_origin",
+        "_search_origin_name",
+    )
+
+    def __init__(
+        self,
+        fare: dict,
+        search_origin: Optional[str] = None,
+        search_origin_name: Optional[str] = None,
+    ):
+        self._fare = fare
+        self._departure_time = _UNSET
+        self._flight_number = _UNSET
+        self._search_origin = search_origin
+        self._search_origin_name = search_origin_name
+
+    @property
+    def departureTime(self) -> datetime:
+        if self._departure_time is _UNSET:
+            self._departure_time = datetime.fromisoformat(self._fare["departureDate"])
+        return self._departure_time
+
+    @property
+    def flightNumber(self) -> str:
+        if self._flight_number is _UNSET:
+            self._flight_number = _flight_number(self._fare["flightNumber"])
+        return self._flight_number
+
+    @property
+    def price(self) -> float:
+        return self._fare["price"]["value"]
+
+    @property
+    def currency(self) -> str:
+        return self._fare["price"]["currencyCode"]
+
+    @property
+    def origin(self) -> str:
+        return self._fare["departureAirport"]["iataCode"]
+
+    @property
+    def originFull(self) -> str:
+        airport = self._fare["departureAirport"]
+        return _airport_label(airport["name"], airport["countryName"])
+
+    @property
+    def destination(self) -> str:
+        return self._fare["arrivalAirport"]["iataCode"]
+
+    @property
+    def destinationFull(self) -> str:
+        airport = self._fare["arrivalAirport"]
+        return _airport_label(airport["name"], airport["countryName"])
+
+    @property
+    def searchOrigin(self) -> Optional[str]:
+        return self._search_origin
+
+    @property
+    def searchOriginName(self) -> Optional[str]:
+        return self._search_origin_name
+
+    def with_search_origin(self, code: str, name: Optional[str] = None) -> "LazyFlight":
+        view = LazyFlight(self._fare, code, name)
+        view._departure_time = self._departure_time
+        view._flight_number = self._flight_number
+        return view
+
+    def to_flight(self) -> Flight:
+        return Flight(
+            departureTime=self.departureTime,
+            flightNumber=self.flightNumber,
+            price=self.price,
+            currency=self.currency,
+            origin=self.origin,
+            originFull=self.originFull,
+            destination=self.destination,
+            destinationFull=self.destinationFull,
+            searchOrigin=self.searchOrigin,
+            searchOriginName=self.searchOriginName,
+        )
+
+    def __eq__(self, other):
+        if isinstance(other, (Flight, LazyFlight)):
+            return self.to_flight() == _materialize(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.to_flight())
+
+    def __repr__(self):
+        return f"Lazy{self.to_flight()!r}"
+
+
+class LazyTrip:
+    """Read-only view of a raw round-trip fare with the same attributes as :class:`Trip`."""
+
+    __slots__ = ("outbound", "inbound", "_search_origin", "_search_origin_name")
+
+    def __init__(
+        self,
+        outbound: LazyFlight,
+        inbound: LazyFlight,
+        search_origin: Optional[str] = None,
+        search_origin_name: Optional[str] = None,
+    ):
+        self.outbound = outbound
+        self.inbound = inbound
+        self._search_origin = search_origin
+        self._search_origin_name = search_origin_name
+
+    @property
+    def totalPrice(self) -> float:
+        return self.outbound.price + self.inbound.price
+
+    @property
+    def searchOrigin(self) -> Optional[str]:
+        return self._search_origin
+
+    @property
+    def searchOriginName(self) -> Optional[str]:
+        return self._search_origin_name
+
+    def with_search_origin(self, code: str, name: Optional[str] = None) -> "LazyTrip":
+        return LazyTrip(
+            self.outbound.with_search_origin(code, name),
+            self.inbound.with_search_origin(code, name),
+            code,
+            name,
+        )
+
+    def to_trip(self) -> Trip:
+        return Trip(
+            totalPrice=self.totalPrice,
+            outbound=self.outbound.to_flight(),
+            inbound=self.inbound.to_flight(),
+            searchOrigin=self.searchOrigin,
+            searchOriginName=self.searchOriginName,
+        )
+
+    def __eq__(self, other):
+        if isinstance(other, (Trip, LazyTrip)):
+            return self.to_trip() == _materialize(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.to_trip())
+
+    def __repr__(self):
+        return f"Lazy{self.to_trip()!r}"
+
+
+def _materialize(fare):
+    if isinstance(fare, LazyFlight):
+        return fare.to_flight()
+    if isinstance(fare, LazyTrip):
+        return fare.to_trip()
+    return fare
+
+
+class FareList(list):
+    """
+    The fares (``Flight`` or ``Trip``) from one query, with a digest of the response body they were parsed from.
+    ``changed`` is False when the response is byte-identical to the previous response to the same query.
+    """
+
+    def __init__(self, fares=(), digest: Optional[str] = None, changed: bool = True):
+        super().__init__(fares)
+        self.digest = digest
+        self.changed = changed
+
+
+@dataclass
+class FareCalendar:
+    """Cheapest fare per day for one route; days without an available fare are omitted."""
+
+    origin: str
+    destination: str
+    currency: Optional[str]
+    prices: Dict[date, float]
+
+
+@dataclass
+class Query:
+    """
+    A deferred call to one of the client query methods, so batches of queries can be
+    handed to :meth:`Ryanair.get_many` or :meth:`AsyncRyanair.gather_many`.
+    """
+
+    method: str
+    args: tuple = ()
+    kwargs: dict = field(default_factory=dict)
+
+    @classmethod
+    def one_way(cls, *args, **kwargs):
+        return cls("get_cheapest_flights", args, kwargs)
+
+    @classmethod
+    def round_trip(cls, *args, **kwargs):
+        return cls("get_cheapest_return_flights", args, kwargs)
+
+    @classmethod
+    def fare_calendar(cls, *args, **kwargs):
+        return cls("get_fare_calendar", args, kwargs)
+
+    @classmethod
+    def return_fare_calendar(cls, *args, **kwargs):
+        return cls("get_return_fare_calendar", args, kwargs)
+
+    def run(self, api):
+        return getattr(api, self.method)(*self.args, **self.kwargs)
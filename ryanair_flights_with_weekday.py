@@ -1,4 +1,5 @@
 from ryanair import Ryanair
+from ryanair.types import Query
 
 # Create an API instance
 api = Ryanair(currency="EUR")
@@ -16,6 +17,7 @@ days_ahead = 14  # Search for the next 30 days
 return_days_min = 2  # Minimum days for return
 return_days_max = 3  # Maximum days for return
 max_price = 80
+max_workers = 8  # parallel fare queries
 
 print(f"Searching for flights from {len(origin_airports)} airports over the next {days_ahead} days...")
 print("=" * 80)
@@ -24,7 +26,8 @@ print("=" * 80)
 all_flights = []
 all_trips = []
 
-# Search for flights from each airport
+# Build the one-way and return queries for every airport and day, then run them on a thread pool
+queries = []
 for airport_code, airport_name in origin_airports:
     print(f"📍 Collecting flights from {airport_name} ({airport_code})...")
 
@@ -33,31 +36,33 @@ for airport_code, airport_name in origin_airports:
         search_date = datetime.today().date() + timedelta(days=day_offset)
 
         # Get cheapest one-way flights for this day
-        flights = api.get_cheapest_flights(airport_code, search_date, search_date + timedelta(days=1))
-
-        if flights:
-            # Add airport info to each flight for later display
-            for flight in flights:
-                flight._origin_airport = airport_name
-                flight._origin_code = airport_code
-            all_flights.extend(flights)
+        queries.append((airport_code, airport_name, Query.one_way(
+            airport_code, search_date, search_date + timedelta(days=1)
+        )))
 
         # Get cheapest return flights for this day (return 2-4 days later)
         return_date_from = search_date + timedelta(days=return_days_min)
         return_date_to = search_date + timedelta(days=return_days_max)
-        
-        trips = api.get_cheapest_return_flights(
-            airport_code, 
+
+        queries.append((airport_code, airport_name, Query.round_trip(
+            airport_code,
             search_date, search_date + timedelta(days=1),
             return_date_from, return_date_to
-        )
+        )))
+
+results = api.get_many([query for _, _, query in queries], max_workers=max_workers)
+
+for (airport_code, airport_name, query), result in zip(queries, results):
+    if isinstance(result, Exception):
+        print(f"⚠️  Query {query.args} from {airport_code} failed: {result}")
+        continue
 
-        if trips:
-            # Add airport info to each trip for later display
-            for trip in trips:
-                trip._origin_airport = airport_name
-                trip._origin_code = airport_code
-            all_trips.extend(trips)
+    # Add airport info to each flight/trip for later display
+    labelled = [fare.with_search_origin(airport_code, airport_name) for fare in result]
+    if query.method == "get_cheapest_flights":
+        all_flights.extend(labelled)
+    else:
+        all_trips.extend(labelled)
 
 print(f"\n✈️  Found {len(all_flights)} one-way flights and {len(all_trips)} return trips from all airports")
 print("=" * 80)
@@ -74,14 +79,12 @@ for flight in all_flights:
 # Add outbound legs of return trips
 for trip in all_trips:
     flight = trip.outbound
-    flight._origin_code = trip._origin_code
     if flight.price <= max_price:
         outbound_flights.append(('return-outbound', flight, flight.price))
 
 # Add inbound legs of return trips
 for trip in all_trips:
-    flight = trip.inbound
-    flight._origin_code = trip._origin_code  # This will be the return destination (searched airport)
+    flight = trip.inbound  # searchOrigin is the return destination (searched airport)
     # Limit return-in flights to 2026-02-05
     if flight.departureTime.date() <= datetime(2026, 3, 5).date() and flight.price <= max_price:
         inbound_flights.append(('return-inbound', flight, flight.price))
@@ -102,7 +105,7 @@ for i, (flight_type, flight, price) in enumerate(outbound_flights, 1):
     origin_city = flight.originFull.split(',')[0] if ',' in flight.originFull else flight.originFull
     dest_city = flight.destinationFull.split(',')[0] if ',' in flight.destinationFull else flight.destinationFull
     type_label = "ONE-WAY" if flight_type == 'one-way' else "RETURN-OUT"
-    print(f"{i:3d}. {departure_datetime} {price}€ {origin_city} ({flight._origin_code}) → {dest_city} ({flight.destination})")
+    print(f"{i:3d}. {departure_datetime} {price}€ {origin_city} ({flight.searchOrigin}) → {dest_city} ({flight.destination})")
 
 print("\n" + "=" * 80)
 
@@ -115,7 +118,7 @@ for i, (flight_type, flight, price) in enumerate(inbound_flights, 1):
     departure_datetime = flight.departureTime.strftime('%Y-%m-%d %A %H:%M')
     origin_city = flight.originFull.split(',')[0] if ',' in flight.originFull else flight.originFull
     dest_city = flight.destinationFull.split(',')[0] if ',' in flight.destinationFull else flight.destinationFull
-    print(f"{i:3d}. {departure_datetime} {price}€ {origin_city} ({flight.origin}) → {dest_city} ({flight._origin_code})")
+    print(f"{i:3d}. {departure_datetime} {price}€ {origin_city} ({flight.origin}) → {dest_city} ({flight.searchOrigin})")
 
 print("\n" + "=" * 80)
 print("📊 SUMMARY:")
@@ -22,5 +22,11 @@ setup(
         "Operating System :: OS Independent",
     ],
     install_requires=["requests", "backoff"],
+    extras_require={
+        "async": ["httpx"],
+        "http2": ["httpx[http2]"],
+        "frame": ["numpy"],
+        "fast": ["msgspec", "orjson"],
+    },
     package_data={"ryanair": ["airports.csv"]},
 )
@@ -0,0 +1,4 @@
+from ryanair.SessionManager import SessionManager
+
+# Keep session cookies in memory, so tests never read or overwrite the ones persisted by real runs
+SessionManager.COOKIE_PATH = None
@@ -0,0 +1,221 @@
+import asyncio
+import datetime
+import unittest
+from unittest import mock
+from unittest.mock import patch, Mock, AsyncMock, call
+
+import requests
+
+from ryanair import AsyncRyanair
+from ryanair.cache import MemoryResponseCache
+from ryanair.routes import RouteMap
+from ryanair.types import Flight, Query
+from tests.test_routes import MOCKED_ROUTES_RESPONSE
+from tests.test_ryanair import _body, MOCKED_ONE_WAY_RESPONSE, MOCKED_RETURN_RESPONSE
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+def _mock_response(payload):
+    response = Mock()
+    response.content = _body(payload)
+    return response
+
+
+@unittest.skipIf(httpx is None, "httpx is not installed")
+class TestAsyncRyanair(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        patcher = patch("ryanair.ryanair.httpx.AsyncClient")
+        self.mock_client_cls = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_client = self.mock_client_cls.return_value
+        self.mock_client.get = AsyncMock()
+        self.mock_client.aclose = AsyncMock()
+
+    async def test_get_cheapest_flights(self):
+        self.mock_client.get.side_effect = [
+            Mock(),  # session cookie bootstrap
+            _mock_response(MOCKED_ONE_WAY_RESPONSE),
+        ]
+
+        async with AsyncRyanair() as api:
+            flights = await api.get_cheapest_flights("DUB", "2023-09-01", "2023-09-30")
+
+        self.assertEqual(len(flights), 2)
+        self.assertEqual(
+            flights[0],
+            Flight(
+                departureTime=datetime.datetime(2023, 8, 23, 8, 20),
+                flightNumber="FR 504",
+                price=17.68,
+                currency="EUR",
+                origin="DUB",
+                originFull="Dublin, Ireland",
+                destination="BRS",
+                destinationFull="Bristol, United Kingdom",
+            ),
+        )
+        self.assertEqual(api.num_queries, 1)
+        self.mock_client.aclose.assert_awaited_once()
+
+    async def test_session_is_bootstrapped_once(self):
+        self.mock_client.get.return_value = _mock_response({"fares": []})
+
+        async with AsyncRyanair() as api:
+            await api.gather_many(
+                [Query.one_way("DUB", "2023-09-01", "2023-09-01") for _ in range(5)]
+            )
+
+        self.mock_client_cls.assert_called_once()
+        self.assertEqual(self.mock_client.get.await_count, 6)
+        self.assertEqual(api.num_queries, 5)
+
+    async def test_gather_many_returns_results_in_input_order(self):
+        async def get(url, params=None):
+            if params is None:
+                return Mock()
+            # Make the first query the slowest to finish
+            if params["departureAirportIataCode"] == "DUB":
+                await asyncio.sleep(0.01)
+                return _mock_response(MOCKED_ONE_WAY_RESPONSE)
+            return _mock_response(MOCKED_RETURN_RESPONSE)
+
+        self.mock_client.get.side_effect = get
+
+        async with AsyncRyanair() as api:
+            flights, trips = await api.gather_many(
+                [
+                    Query.one_way("DUB", "2023-09-01", "2023-09-01"),
+                    Query.round_trip(
+                        "STN", "2023-09-01", "2023-09-01", "2023-09-02", "2023-09-03"
+                    ),
+                ]
+            )
+
+        self.assertEqual([f.destination for f in flights], ["BRS", "EDI"])
+        self.assertEqual([t.outbound.destination for t in trips], ["LBA", "LPL"])
+
+    async def test_in_flight_requests_never_exceed_max_concurrency(self):
+        in_flight = 0
+        peak = 0
+
+        async def get(url, params=None):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.005)
+            in_flight -= 1
+            return _mock_response({"fares": []})
+
+        self.mock_client.get.side_effect = get
+
+        async with AsyncRyanair(max_concurrency=3) as api:
+            await api.gather_many(
+                [Query.one_way("DUB", "2023-09-01", "2023-09-01") for _ in range(12)]
+            )
+
+        self.assertEqual(peak, 3)
+
+    async def test_gather_many_can_return_exceptions(self):
+        self.mock_client.get.side_effect = [
+            Mock(),
+            requests.HTTPError(),
+            requests.HTTPError(),
+            requests.HTTPError(),
+            requests.HTTPError(),
+            requests.HTTPError(),
+        ]
+
+        async with AsyncRyanair() as api:
+            (result,) = await api.gather_many(
+                [Query.one_way("DUB", "2023-09-01", "2023-09-01")],
+                return_exceptions=True,
+            )
+
+        self.assertIsInstance(result, requests.HTTPError)
+        self.assertEqual(api.num_queries, 5)
+
+    async def test_query_params_match_blocking_client(self):
+        self.mock_client.get.return_value = _mock_response({"fares": []})
+
+        async with AsyncRyanair("EUR") as api:
+            await api.get_cheapest_return_flights(
+                "DUB",
+                "2023-08-23",
+                datetime.date(2023, 8, 23),
+                "2023-09-25",
+                "2023-09-25",
+                outbound_departure_time_from=datetime.time(17, 0),
+                max_price=100,
+            )
+
+        self.mock_client.get.assert_has_calls(
+            [
+                call(
+                    mock.ANY,
+                    params={
+                        "departureAirportIataCode": "DUB",
+                        "outboundDepartureDateFrom": "2023-08-23",
+                        "outboundDepartureDateTo": "2023-08-23",
+                        "inboundDepartureDateFrom": "2023-09-25",
+                        "inboundDepartureDateTo": "2023-09-25",
+                        "outboundDepartureTimeFrom": "17:00",
+                        "outboundDepartureTimeTo": "23:59",
+                        "inboundDepartureTimeFrom": "00:00",
+                        "inboundDepartureTimeTo": "23:59",
+                        "currency": "EUR",
+                        "priceValueTo": 100,
+                    },
+                )
+            ]
+        )
+
+    async def test_concurrent_identical_queries_are_single_flight_with_a_cache(self):
+        async def get(url, params=None):
+            await asyncio.sleep(0.01)
+            return _mock_response(MOCKED_ONE_WAY_RESPONSE)
+
+        self.mock_client.get.side_effect = get
+
+        async with AsyncRyanair(cache=MemoryResponseCache()) as api:
+            results = await api.gather_many(
+                [Query.one_way("DUB", "2023-09-01", "2023-09-01") for _ in range(5)]
+            )
+            await api.get_cheapest_flights("DUB", "2023-09-01", "2023-09-01")
+
+        self.assertEqual(api.num_queries, 1)
+        self.assertEqual(api.cache_hits, 1)
+        self.assertTrue(all(len(result) == 2 for result in results))
+
+    async def test_concurrent_route_lookups_for_an_origin_are_single_flight(self):
+        route_urls = []
+
+        async def get(url, params=None):
+            await asyncio.sleep(0.01)
+            if url.startswith(RouteMap.ROUTES_API_URL):
+                route_urls.append(url)
+                return _mock_response(MOCKED_ROUTES_RESPONSE)
+            return _mock_response({"fares": []})
+
+        self.mock_client.get.side_effect = get
+
+        async with AsyncRyanair(route_map=RouteMap(path=None)) as api:
+            await api.gather_many(
+                [
+                    Query.one_way(
+                        "DUB", "2023-09-01", "2023-09-01", destination_airport=code
+                    )
+                    for code in ("BCN", "STN", "PMI")
+                ]
+            )
+
+        self.assertEqual(len(route_urls), 1)
+        # PMI is only served with a connection, so just BCN and STN were queried
+        self.assertEqual(api.num_queries, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
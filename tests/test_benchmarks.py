@@ -0,0 +1,37 @@
+import unittest
+
+from benchmarks.hot_paths import BENCHMARKS, compare
+
+
+def _results(**seconds):
+    return {"results": {name: {"seconds": value} for name, value in seconds.items()}}
+
+
+class TestCompare(unittest.TestCase):
+    def test_flags_changes_beyond_the_threshold(self):
+        baseline = _results(parse=1.0, html=1.0, haversine=1.0, gone=1.0)
+        current = _results(parse=1.2, html=0.5, haversine=1.05, added=1.0)
+
+        rows = {
+            name: status
+            for name, _, _, status in compare(baseline, current, threshold=0.1)
+        }
+
+        self.assertEqual(
+            rows,
+            {
+                "parse": "regression",
+                "html": "improvement",
+                "haversine": "ok",
+                "gone": "missing",
+                "added": "new",
+            },
+        )
+
+    def test_sizes_are_separate_benchmarks(self):
+        self.assertIn("build_html[10]", BENCHMARKS)
+        self.assertIn("build_html[1000]", BENCHMARKS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,347 @@
+import datetime
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch, Mock
+
+import requests
+
+from ryanair import Ryanair
+from ryanair.cache import (
+    MemoryResponseCache,
+    SQLiteResponseCache,
+    cache_key,
+    endpoint_name,
+)
+from ryanair.types import Query
+from tests.test_ryanair import _body, MOCKED_ONE_WAY_RESPONSE
+
+FARES_URL = "https://services-api.ryanair.com/farfnd/v4/oneWayFares"
+
+
+class TestCacheKey(unittest.TestCase):
+    def test_dates_and_iso_strings_share_a_key(self):
+        self.assertEqual(
+            cache_key(
+                FARES_URL,
+                {
+                    "outboundDepartureDateFrom": datetime.date(2023, 9, 1),
+                    "outboundDepartureTimeFrom": datetime.time(17, 0),
+                    "departureAirportIataCode": "DUB",
+                },
+            ),
+            cache_key(
+                FARES_URL,
+                {
+                    "departureAirportIataCode": "DUB",
+                    "outboundDepartureDateFrom": "2023-09-01",
+                    "outboundDepartureTimeFrom": "17:00",
+                },
+            ),
+        )
+
+    def test_endpoint_name(self):
+        self.assertEqual(endpoint_name(FARES_URL), "oneWayFares")
+        self.assertEqual(
+            endpoint_name(
+                "https://services-api.ryanair.com/farfnd/v4/roundTripFares/DUB/BCN/cheapestPerDay"
+            ),
+            "cheapestPerDay",
+        )
+
+
+class TestSQLiteResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.path = os.path.join(self.tmp_dir.name, "cache", "responses.sqlite3")
+
+    def test_round_trip(self):
+        cache = SQLiteResponseCache(self.path)
+        cache.set(FARES_URL, {"a": "1"}, _body(MOCKED_ONE_WAY_RESPONSE))
+
+        self.assertEqual(
+            cache.get(FARES_URL, {"a": "1"}), _body(MOCKED_ONE_WAY_RESPONSE)
+        )
+        self.assertIsNone(cache.get(FARES_URL, {"a": "2"}))
+
+    def test_entries_are_shared_between_cache_instances(self):
+        SQLiteResponseCache(self.path).set(FARES_URL, None, b'{"fares": []}')
+
+        self.assertEqual(
+            SQLiteResponseCache(self.path).get(FARES_URL), b'{"fares": []}'
+        )
+
+    def test_entries_expire_per_endpoint(self):
+        cache = SQLiteResponseCache(self.path, ttls={"oneWayFares": 10})
+        with patch("ryanair.cache.time.time", return_value=1000):
+            cache.set(FARES_URL, None, b'{"fares": []}')
+        with patch("ryanair.cache.time.time", return_value=1009):
+            self.assertEqual(cache.get(FARES_URL), b'{"fares": []}')
+        with patch("ryanair.cache.time.time", return_value=1010):
+            self.assertIsNone(cache.get(FARES_URL))
+
+    def test_max_age_is_applied_when_reading(self):
+        SQLiteResponseCache(self.path).set(FARES_URL, None, b'{"fares": []}')
+        # Stored with the default one hour TTL, read two hours later
+        with patch("ryanair.cache.time.time", return_value=time.time() + 2 * 60 * 60):
+            self.assertIsNone(SQLiteResponseCache(self.path).get(FARES_URL))
+            sweep = SQLiteResponseCache(
+                self.path, max_ages={"oneWayFares": 6 * 60 * 60}
+            )
+            self.assertEqual(sweep.get(FARES_URL), b'{"fares": []}')
+            self.assertIsNone(sweep.get(FARES_URL, max_age=60 * 60))
+
+    def test_entries_written_with_a_long_max_age_keep_the_default_ttl(self):
+        sweep = SQLiteResponseCache(self.path, max_ages={"oneWayFares": 6 * 60 * 60})
+        sweep.set(FARES_URL, None, b'{"fares": []}')
+
+        with patch("ryanair.cache.time.time", return_value=time.time() + 2 * 60 * 60):
+            self.assertIsNone(SQLiteResponseCache(self.path).get(FARES_URL))
+
+    def test_expired_entries_are_retained_for_longer_max_ages(self):
+        cache = SQLiteResponseCache(self.path, ttls={"oneWayFares": 10}, retain=100)
+        with patch("ryanair.cache.time.time", return_value=1000):
+            cache.set(FARES_URL, {"i": 0}, b'{"fares": []}')
+        with patch("ryanair.cache.time.time", return_value=1050):
+            cache.set(FARES_URL, {"i": 1}, b'{"fares": []}')
+            self.assertIsNotNone(cache.get(FARES_URL, {"i": 0}, max_age=100))
+        with patch("ryanair.cache.time.time", return_value=1101):
+            cache.set(FARES_URL, {"i": 2}, b'{"fares": []}')
+            self.assertIsNone(cache.get(FARES_URL, {"i": 0}, max_age=1000))
+        self.assertEqual(cache.evictions, 1)
+
+    def test_counters_are_exact_across_threads(self):
+        cache = SQLiteResponseCache(self.path)
+        cache.set(FARES_URL, None, b'{"fares": []}')
+        # Switch threads as often as possible, so unguarded increments would lose counts
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.addCleanup(sys.setswitchinterval, interval)
+
+        def worker():
+            for i in range(100):
+                cache.get(FARES_URL)
+                cache.get(FARES_URL, {"i": i})
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual((cache.hits, cache.misses), (800, 800))
+
+    def test_oldest_entries_are_evicted_beyond_max_bytes(self):
+        cache = SQLiteResponseCache(self.path, max_bytes=2000)
+        for i in range(20):
+            with patch("ryanair.cache.time.time", return_value=1000 + i):
+                cache.set(FARES_URL, {"i": i}, os.urandom(256))
+
+        with patch("ryanair.cache.time.time", return_value=1100):
+            self.assertIsNone(cache.get(FARES_URL, {"i": 0}))
+            self.assertIsNotNone(cache.get(FARES_URL, {"i": 19}))
+        total = (
+            cache._connection().execute("SELECT SUM(size) FROM responses").fetchone()[0]
+        )
+        self.assertLessEqual(total, 2000)
+
+
+class TestRyanairWithCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.cache = SQLiteResponseCache(
+            os.path.join(self.tmp_dir.name, "responses.sqlite3")
+        )
+
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_cache_hits_skip_the_network(self, mock_get_session):
+        mock_get_session.return_value.get.return_value.content = _body(
+            MOCKED_ONE_WAY_RESPONSE
+        )
+
+        first = Ryanair(cache=self.cache).get_cheapest_flights(
+            "DUB", datetime.date(2023, 9, 1), "2023-09-30"
+        )
+        ryanair_instance = Ryanair(cache=self.cache)
+        second = ryanair_instance.get_cheapest_flights(
+            "DUB", "2023-09-01", datetime.date(2023, 9, 30)
+        )
+
+        self.assertEqual(first, second)
+        self.assertEqual(ryanair_instance.num_queries, 0)
+        mock_get_session.return_value.get.assert_called_once()
+
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_failures_are_not_cached(self, mock_get_session):
+        mock_get_session.return_value.get.side_effect = requests.HTTPError()
+
+        ryanair_instance = Ryanair(cache=self.cache)
+        with self.assertRaises(requests.HTTPError):
+            ryanair_instance.get_cheapest_flights("DUB", "2023-09-01", "2023-09-30")
+
+        self.assertIsNone(self.cache.get(FARES_URL))
+
+
+class TestMemoryResponseCache(unittest.TestCase):
+    def test_least_recently_used_entries_are_evicted_beyond_max_entries(self):
+        cache = MemoryResponseCache(max_entries=2)
+        cache.set(FARES_URL, {"i": 0}, b'{"fares": []}')
+        cache.set(FARES_URL, {"i": 1}, b'{"fares": []}')
+        cache.get(FARES_URL, {"i": 0})
+        cache.set(FARES_URL, {"i": 2}, b'{"fares": []}')
+
+        self.assertIsNotNone(cache.get(FARES_URL, {"i": 0}))
+        self.assertIsNone(cache.get(FARES_URL, {"i": 1}))
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+    def test_entries_are_evicted_beyond_max_bytes(self):
+        cache = MemoryResponseCache(max_bytes=100)
+        for i in range(5):
+            cache.set(FARES_URL, {"i": i}, b"x" * 40)
+
+        self.assertLessEqual(cache.size_bytes, 100)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.evictions, 3)
+
+    def test_entries_expire(self):
+        cache = MemoryResponseCache(ttls={"oneWayFares": 10})
+        with patch("ryanair.cache.time.time", return_value=1000):
+            cache.set(FARES_URL, None, b'{"fares": []}')
+        with patch("ryanair.cache.time.time", return_value=1011):
+            self.assertIsNone(cache.get(FARES_URL))
+        self.assertEqual(len(cache), 0)
+
+    def test_concurrent_identical_fetches_are_single_flight(self):
+        cache = MemoryResponseCache()
+        fetch = Mock(side_effect=lambda: time.sleep(0.05) or b'{"fares": []}')
+        barrier = threading.Barrier(8)
+        results = []
+
+        def worker():
+            barrier.wait()
+            results.append(cache.get_or_fetch(FARES_URL, {"a": 1}, fetch))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        fetch.assert_called_once()
+        self.assertEqual(results, [b'{"fares": []}'] * 8)
+        self.assertEqual(cache.coalesced + cache.hits, 7)
+
+    def test_single_flight_failures_reach_every_waiter_and_are_not_cached(self):
+        cache = MemoryResponseCache()
+        started = threading.Event()
+        release = threading.Event()
+        errors = []
+
+        def failing_fetch():
+            started.set()
+            release.wait()
+            raise requests.HTTPError()
+
+        def worker(fetch):
+            try:
+                cache.get_or_fetch(FARES_URL, None, fetch)
+            except requests.HTTPError as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=worker, args=(failing_fetch,))
+        leader.start()
+        started.wait()
+        follower = threading.Thread(target=worker, args=(Mock(),))
+        follower.start()
+        while cache.coalesced == 0:
+            time.sleep(0.001)
+        release.set()
+        leader.join()
+        follower.join()
+
+        self.assertEqual(len(errors), 2)
+        self.assertIsNone(cache.get(FARES_URL))
+
+    def test_backend_is_read_and_written_through(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            backend = SQLiteResponseCache(os.path.join(tmp_dir, "responses.sqlite3"))
+            backend.set(FARES_URL, {"a": 1}, b"persisted")
+            cache = MemoryResponseCache(backend=backend)
+
+            self.assertEqual(cache.get(FARES_URL, {"a": 1}), b"persisted")
+            cache.get_or_fetch(FARES_URL, {"a": 2}, lambda: b"fetched")
+            self.assertEqual(backend.get(FARES_URL, {"a": 2}), b"fetched")
+
+    def test_entries_read_through_expire_with_the_backend_entry(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            backend = SQLiteResponseCache(
+                os.path.join(tmp_dir, "responses.sqlite3"), ttls={"oneWayFares": 100}
+            )
+            with patch("ryanair.cache.time.time", return_value=1000):
+                backend.set(FARES_URL, {"a": 1}, b"persisted")
+                backend.set(FARES_URL, {"a": 2}, b"persisted")
+            cache = MemoryResponseCache(backend=backend)
+            fetch = Mock(return_value=b"fetched")
+
+            # Read through 90 seconds into the backend entry's 100 second TTL
+            with patch("ryanair.cache.time.time", return_value=1090):
+                self.assertEqual(cache.get(FARES_URL, {"a": 1}), b"persisted")
+                self.assertEqual(
+                    cache.get_or_fetch(FARES_URL, {"a": 2}, fetch), b"persisted"
+                )
+            with patch("ryanair.cache.time.time", return_value=1101):
+                self.assertIsNone(cache.get(FARES_URL, {"a": 1}))
+                self.assertEqual(
+                    cache.get_or_fetch(FARES_URL, {"a": 2}, fetch), b"fetched"
+                )
+            fetch.assert_called_once()
+
+
+class TestRyanairWithMemoryCache(unittest.TestCase):
+    @patch("ryanair.SessionManager.SessionManager.new_session")
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_concurrent_identical_queries_hit_upstream_once(
+        self, mock_get_session, mock_new_session
+    ):
+        def get(url, params=None):
+            time.sleep(0.05)
+            return Mock(content=_body(MOCKED_ONE_WAY_RESPONSE))
+
+        mock_new_session.return_value.get.side_effect = get
+
+        ryanair_instance = Ryanair(cache=MemoryResponseCache())
+        results = ryanair_instance.get_many(
+            [Query.one_way("DUB", "2023-09-01", "2023-09-30") for _ in range(6)],
+            max_workers=6,
+        )
+        ryanair_instance.get_cheapest_flights("DUB", "2023-09-01", "2023-09-30")
+
+        self.assertEqual(ryanair_instance.num_queries, 1)
+        self.assertTrue(all(len(result) == 2 for result in results))
+        self.assertEqual(ryanair_instance.cache_misses, 1)
+        self.assertGreaterEqual(ryanair_instance.cache_hits, 1)
+        self.assertEqual(ryanair_instance.cache_evictions, 0)
+
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_counters_are_zero_without_a_cache(self, mock_get_session):
+        ryanair_instance = Ryanair()
+
+        self.assertEqual(
+            (
+                ryanair_instance.cache_hits,
+                ryanair_instance.cache_misses,
+                ryanair_instance.cache_evictions,
+            ),
+            (0, 0, 0),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
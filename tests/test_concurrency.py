@@ -0,0 +1,161 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import patch, Mock
+
+import requests
+
+from ryanair import Ryanair
+from ryanair.concurrency import AIMDController
+from ryanair.types import Query
+from tests.test_ryanair import _body
+
+
+class _Congestion(Exception):
+    pass
+
+
+def _is_congestion(e):
+    return isinstance(e, _Congestion)
+
+
+class TestAIMDController(unittest.TestCase):
+    def _complete(
+        self, controller, latency=0.1, fail=False, concurrent=1, error=_Congestion
+    ):
+        """Run ``concurrent`` requests that overlap, each taking ``latency`` seconds."""
+        clock = [0.0]
+        with patch("ryanair.concurrency.time.monotonic", side_effect=lambda: clock[0]):
+            slots = [controller.slot(_is_congestion) for _ in range(concurrent)]
+            for slot in slots:
+                slot.__enter__()
+            clock[0] += latency
+            for slot in slots:
+                if fail:
+                    try:
+                        raise error()
+                    except error as e:
+                        self.assertFalse(slot.__exit__(type(e), e, e.__traceback__))
+                else:
+                    slot.__exit__(None, None, None)
+
+    def test_limit_grows_while_healthy(self):
+        controller = AIMDController(initial_limit=2, max_limit=4)
+        for _ in range(20):
+            self._complete(controller, concurrent=controller.limit)
+
+        self.assertEqual(controller.limit, 4)
+        self.assertEqual(controller.in_flight, 0)
+        # Counted when the limit rises, not on every fractional step towards it
+        self.assertEqual(controller.increases, 2)
+
+    def test_other_failures_only_free_their_slot(self):
+        controller = AIMDController(initial_limit=2, max_limit=4)
+        for _ in range(20):
+            self._complete(controller, latency=5.0, fail=True, error=ValueError)
+
+        self.assertEqual(controller.limit, 2)
+        self.assertIsNone(controller.latency)
+        self.assertEqual((controller.increases, controller.decreases), (0, 0))
+        self.assertEqual(controller.in_flight, 0)
+
+    def test_limit_does_not_grow_when_unused(self):
+        controller = AIMDController(initial_limit=4, max_limit=32)
+        for _ in range(20):
+            self._complete(controller, concurrent=1)
+
+        self.assertEqual(controller.limit, 4)
+
+    def test_congestion_halves_the_limit_once_per_round(self):
+        controller = AIMDController(initial_limit=16, max_limit=32)
+        self._complete(controller, fail=True, concurrent=8)
+
+        self.assertEqual(controller.limit, 8)
+        self.assertEqual(controller.decreases, 1)
+
+        self._complete(controller, fail=True)
+        self.assertEqual(controller.limit, 4)
+
+    def test_latency_spike_cuts_the_limit(self):
+        controller = AIMDController(initial_limit=8, max_limit=8)
+        for _ in range(5):
+            self._complete(controller, latency=0.1, concurrent=8)
+        self._complete(controller, latency=1.0)
+
+        self.assertEqual(controller.limit, 4)
+
+    def test_limit_never_drops_below_minimum(self):
+        controller = AIMDController(initial_limit=2, min_limit=2)
+        for _ in range(5):
+            self._complete(controller, fail=True)
+
+        self.assertEqual(controller.limit, 2)
+
+    def test_threads_wait_for_a_slot(self):
+        controller = AIMDController(initial_limit=2, max_limit=2)
+        lock = threading.Lock()
+        running, peak = [0], [0]
+
+        def work():
+            with controller.slot():
+                with lock:
+                    running[0] += 1
+                    peak[0] = max(peak[0], running[0])
+                time.sleep(0.01)
+                with lock:
+                    running[0] -= 1
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(peak[0], 2)
+
+    def test_async_slots(self):
+        controller = AIMDController(initial_limit=3, max_limit=3)
+        running, peak = [0], [0]
+
+        async def work():
+            async with controller.async_slot():
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+                await asyncio.sleep(0.01)
+                running[0] -= 1
+
+        async def main():
+            await asyncio.gather(*(work() for _ in range(10)))
+
+        asyncio.run(main())
+        self.assertEqual(peak[0], 3)
+        self.assertEqual(controller.in_flight, 0)
+
+
+class TestRyanairAdaptiveConcurrency(unittest.TestCase):
+    @patch("ryanair.SessionManager.SessionManager.new_session")
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_throttling_reduces_the_limit(self, mock_get_session, mock_new_session):
+        throttled = Mock(status_code=429, headers={})
+        throttled.raise_for_status.side_effect = requests.HTTPError(response=throttled)
+        ok = Mock(content=_body({"fares": []}))
+        session = Mock()
+        session.get.side_effect = [throttled] + [ok] * 10
+        mock_get_session.return_value = session
+        mock_new_session.return_value = session
+
+        controller = AIMDController(initial_limit=4, max_limit=4)
+        ryanair_instance = Ryanair(concurrency=controller)
+        results = ryanair_instance.get_many(
+            [Query.one_way("DUB", "2023-09-01", "2023-09-01")] * 3, max_workers=1
+        )
+
+        self.assertEqual(results, [[], [], []])
+        self.assertEqual(controller.decreases, 1)
+        self.assertEqual(ryanair_instance.concurrency_limit, 2)
+        self.assertIsNone(Ryanair().concurrency_limit)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import json
+import unittest
+from unittest.mock import patch
+
+from ryanair import decoding
+from ryanair.decoding import decode_fares, loads
+from ryanair.fake_server import synthetic_fares_response
+from ryanair.ryanair import _RyanairBase
+from tests.test_ryanair import _body, MOCKED_ONE_WAY_RESPONSE, MOCKED_RETURN_RESPONSE
+
+ROUND_TRIP_URL = "https://services-api.ryanair.com/farfnd/v4/roundTripFares"
+PARAMS = {
+    "departureAirportIataCode": "DUB",
+    "outboundDepartureDateFrom": "2024-01-01",
+    "outboundDepartureDateTo": "2024-01-31",
+    "inboundDepartureDateFrom": "2024-01-03",
+    "inboundDepartureDateTo": "2024-02-03",
+}
+
+
+class TestLoads(unittest.TestCase):
+    def test_matches_json(self):
+        body = _body(MOCKED_RETURN_RESPONSE)
+        self.assertEqual(loads(body), json.loads(body))
+
+        with patch.object(decoding, "orjson", None):
+            self.assertEqual(loads(body), json.loads(body))
+
+    def test_invalid_json(self):
+        with self.assertRaises(json.JSONDecodeError):
+            loads(b'{"fares": [')
+
+
+@unittest.skipIf(decoding.msgspec is None, "msgspec is not installed")
+class TestTypedDecoding(unittest.TestCase):
+    def setUp(self):
+        self.parser = _RyanairBase(currency="EUR")
+
+    def test_typed_fares_match_parsed_dicts(self):
+        one_way = _body(MOCKED_ONE_WAY_RESPONSE)
+        self.assertEqual(
+            self.parser._parse_typed_flights(decode_fares(one_way)),
+            self.parser._parse_cheapest_flights(json.loads(one_way)["fares"]),
+        )
+
+        for body in (
+            _body(MOCKED_RETURN_RESPONSE),
+            _body(synthetic_fares_response(ROUND_TRIP_URL, PARAMS, destinations=200)),
+        ):
+            self.assertEqual(
+                self.parser._parse_typed_return_flights(decode_fares(body)),
+                self.parser._parse_cheapest_return_flights(json.loads(body)["fares"]),
+            )
+
+    def test_unexpected_payloads_fall_back(self):
+        self.assertEqual(decode_fares(_body({"fares": None})), [])
+        self.assertIsNone(decode_fares(_body({"message": "no fares"})))
+        self.assertIsNone(decode_fares(b'{"fares": ['))
+
+        fare = json.loads(json.dumps(MOCKED_ONE_WAY_RESPONSE["fares"][0]))
+        fare["outbound"]["price"]["value"] = "19.99"
+        body = _body({"fares": [fare]})
+        self.assertIsNone(decode_fares(body))
+        # The dict path doesn't validate types, so it still parses
+        flight = self.parser._decode_and_parse(
+            body, self.parser._parse_cheapest_flights, self.parser._parse_typed_flights
+        )[0]
+        self.assertEqual(flight.price, "19.99")
+
+    def test_lazy_fares_keep_the_dicts(self):
+        lazy = _RyanairBase(lazy_fares=True)
+        with patch("ryanair.ryanair.decode_fares") as mock_decode:
+            lazy._decode_and_parse(
+                _body(MOCKED_ONE_WAY_RESPONSE),
+                lazy._parse_cheapest_flights,
+                lazy._parse_typed_flights,
+            )
+
+        mock_decode.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
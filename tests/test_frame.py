@@ -0,0 +1,135 @@
+import datetime
+import unittest
+
+from ryanair.types import Flight, Trip
+
+try:
+    import numpy as np
+    from ryanair.frame import FareFrame
+except ImportError:
+    np = None
+
+
+def _flight(departure, price, destination, origin="DUB"):
+    return Flight(
+        departureTime=departure,
+        flightNumber="FR 1",
+        price=price,
+        currency="EUR",
+        origin=origin,
+        originFull=f"{origin}, Somewhere",
+        destination=destination,
+        destinationFull=f"{destination}, Somewhere",
+    )
+
+
+def _trip(departure, outbound_price, inbound_price, destination):
+    return Trip(
+        totalPrice=outbound_price + inbound_price,
+        outbound=_flight(departure, outbound_price, destination),
+        inbound=_flight(
+            departure + datetime.timedelta(days=3), inbound_price, "DUB", destination
+        ),
+    )
+
+
+THURSDAY_EVENING = datetime.datetime(2023, 9, 7, 18, 30)
+FRIDAY_MORNING = datetime.datetime(2023, 9, 8, 9, 15)
+FRIDAY_NOON = datetime.datetime(2023, 9, 8, 12, 0)
+SATURDAY = datetime.datetime(2023, 9, 9, 11, 0)
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestFareFrame(unittest.TestCase):
+    def setUp(self):
+        self.flights = [
+            _flight(THURSDAY_EVENING, 30.0, "BCN"),
+            _flight(FRIDAY_MORNING, 12.5, "STN"),
+            _flight(FRIDAY_NOON, 19.99, "BCN"),
+            _flight(SATURDAY, 12.5, "AGP"),
+            _flight(SATURDAY, 45.0, "STN"),
+        ]
+        self.frame = FareFrame.from_fares(self.flights)
+
+    def test_columns(self):
+        self.assertEqual(len(self.frame), 5)
+        self.assertFalse(self.frame.is_return)
+        np.testing.assert_array_equal(self.frame.price, [30.0, 12.5, 19.99, 12.5, 45.0])
+        np.testing.assert_array_equal(self.frame.weekday, [3, 4, 4, 5, 5])
+        np.testing.assert_array_equal(self.frame.hour, [18, 9, 12, 11, 11])
+        self.assertEqual(
+            self.frame.departure[0],
+            int(THURSDAY_EVENING.replace(tzinfo=datetime.timezone.utc).timestamp()),
+        )
+        self.assertEqual(
+            self.frame.destination.tolist(), ["BCN", "STN", "BCN", "AGP", "STN"]
+        )
+
+    def test_round_trips_to_list(self):
+        self.assertEqual(self.frame.to_list(), self.flights)
+        self.assertIs(self.frame[[2]].to_list()[0], self.flights[2])
+        self.assertEqual(FareFrame.from_fares([]).to_list(), [])
+
+    def test_weekday_and_time_masks(self):
+        mask = (self.frame.weekday_mask(3) & self.frame.time_mask("17:00")) | (
+            self.frame.weekday_mask(4) & self.frame.time_mask(datetime.time(11, 0))
+        )
+        self.assertEqual(self.frame[mask].to_list(), [self.flights[0], self.flights[2]])
+
+    def test_top_k_matches_full_sort(self):
+        self.assertEqual(
+            self.frame.top_k(3).to_list(),
+            [self.flights[1], self.flights[3], self.flights[2]],
+        )
+        self.assertEqual(
+            self.frame.top_k(10).to_list(), self.frame.sort_by_price().to_list()
+        )
+        self.assertEqual(len(self.frame.top_k(0)), 0)
+
+    def test_top_k_breaks_ties_like_sorted(self):
+        flights = [
+            _flight(SATURDAY - datetime.timedelta(days=i % 3), 20.0, f"D{i:02}")
+            for i in range(20)
+        ]
+        flights.append(_flight(SATURDAY, 10.0, "D99"))
+        rank = lambda f: (f.price, f.departureTime.date(), f.destination)
+
+        frame = FareFrame.from_fares(flights)
+
+        for k in (1, 3, 7, 21):
+            with self.subTest(k=k):
+                self.assertEqual(
+                    frame.top_k(k).to_list(), sorted(flights, key=rank)[:k]
+                )
+
+    def test_cheapest_per_destination(self):
+        self.assertEqual(
+            self.frame.min_price_by_destination(),
+            {"AGP": 12.5, "BCN": 19.99, "STN": 12.5},
+        )
+        self.assertEqual(
+            self.frame.cheapest_per_destination().to_list(),
+            [self.flights[3], self.flights[2], self.flights[1]],
+        )
+
+    def test_round_trip_frames(self):
+        trips = [
+            _trip(THURSDAY_EVENING, 30.0, 10.0, "BCN"),
+            _trip(FRIDAY_NOON, 20.0, 5.0, "STN"),
+        ]
+        frame = FareFrame.from_fares(trips)
+
+        self.assertTrue(frame.is_return)
+        np.testing.assert_array_equal(frame.price, [40.0, 25.0])
+        np.testing.assert_array_equal(frame.inbound_price, [10.0, 5.0])
+        np.testing.assert_array_equal(frame.return_weekday, [6, 0])
+        self.assertEqual(
+            frame[frame.weekday_mask(0, leg="inbound")].to_list(), [trips[1]]
+        )
+        self.assertEqual(frame.top_k(1).to_list(), [trips[1]])
+        with self.assertRaises(ValueError):
+            self.frame.weekday_mask(0, leg="inbound")
+
+
+if __name__ == "__main__":
+    unittest.main()
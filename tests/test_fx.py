@@ -0,0 +1,158 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import Mock
+
+import requests
+
+from ryanair.fx import FxError, FxRates, fetch_ecb_rates, load_rates
+from ryanair.ryanair import _RyanairBase
+from ryanair.types import LazyTrip, Trip
+from tests.test_ryanair import MOCKED_ONE_WAY_RESPONSE, MOCKED_RETURN_RESPONSE
+
+AS_OF = datetime(2024, 1, 5, 13, 10, tzinfo=timezone.utc)
+RATES = FxRates(base="EUR", rates={"EUR": 1.0, "GBP": 0.86, "PLN": 4.36}, as_of=AS_OF)
+
+ECB_RESPONSE = b"""<?xml version="1.0" encoding="UTF-8"?>
+<gesmes:Envelope xmlns:gesmes="http://www.gesmes.org/xml/2002-08-01" xmlns="http://www.ecb.int/vocabulary/2002-08-01/eurofxref">
+  <gesmes:subject>Reference rates</gesmes:subject>
+  <Cube>
+    <Cube time="2024-01-05">
+      <Cube currency="USD" rate="1.0921"/>
+      <Cube currency="GBP" rate="0.86"/>
+      <Cube currency="PLN" rate="4.36"/>
+    </Cube>
+  </Cube>
+</gesmes:Envelope>
+"""
+
+
+class TestFxRates(unittest.TestCase):
+    def test_rates_and_rebasing(self):
+        self.assertEqual(RATES.rate("EUR", "EUR"), 1.0)
+        self.assertAlmostEqual(RATES.rate("GBP", "PLN"), 4.36 / 0.86)
+        self.assertEqual(RATES.convert(100, "EUR", "GBP"), 86.0)
+
+        in_gbp = RATES.rebased("GBP")
+        self.assertEqual(in_gbp.base, "GBP")
+        self.assertEqual(in_gbp.rates["GBP"], 1.0)
+        self.assertAlmostEqual(in_gbp.rate("EUR", "PLN"), RATES.rate("EUR", "PLN"))
+        self.assertEqual(in_gbp.as_of, AS_OF)
+
+        with self.assertRaises(FxError):
+            RATES.rate("EUR", "XYZ")
+
+    def test_convert_fares(self):
+        parser = _RyanairBase(currency="EUR")
+        flights = parser._parse_cheapest_flights(MOCKED_ONE_WAY_RESPONSE["fares"])
+        trips = parser._parse_cheapest_return_flights(MOCKED_RETURN_RESPONSE["fares"])
+
+        converted = RATES.convert_fares(flights + trips, "PLN")
+
+        flight = converted[0]
+        self.assertEqual(flight.currency, "PLN")
+        self.assertEqual(flight.price, round(flights[0].price * 4.36, 2))
+        self.assertEqual(flight.departureTime, flights[0].departureTime)
+        trip = converted[-1]
+        self.assertIsInstance(trip, Trip)
+        self.assertEqual(trip.inbound.currency, "PLN")
+        self.assertEqual(
+            trip.totalPrice, round(trip.outbound.price + trip.inbound.price, 2)
+        )
+        # Converting to the currency fares are already in leaves them as they are
+        self.assertIs(RATES.convert_flight(flights[0], "EUR"), flights[0])
+
+    def test_lazy_fares_are_converted(self):
+        lazy = _RyanairBase(lazy_fares=True)._parse_cheapest_return_flights(
+            MOCKED_RETURN_RESPONSE["fares"]
+        )[0]
+        self.assertIsInstance(lazy, LazyTrip)
+
+        self.assertEqual(
+            RATES.convert_trip(lazy, "GBP"), RATES.convert_trip(lazy.to_trip(), "GBP")
+        )
+
+    def test_round_trips_through_dict(self):
+        self.assertEqual(
+            FxRates.from_dict(json.loads(json.dumps(RATES.to_dict()))), RATES
+        )
+
+
+class TestFetchEcbRates(unittest.TestCase):
+    def test_parses_daily_reference_rates(self):
+        session = Mock()
+        session.get.return_value.content = ECB_RESPONSE
+
+        rates = fetch_ecb_rates(session)
+
+        self.assertEqual(rates.base, "EUR")
+        self.assertEqual(
+            rates.rates, {"EUR": 1.0, "USD": 1.0921, "GBP": 0.86, "PLN": 4.36}
+        )
+        self.assertEqual(rates.as_of, AS_OF)
+        self.assertGreater(rates.fetched_at, 0)
+
+    def test_fixing_time_follows_central_european_summer_time(self):
+        session = Mock()
+        session.get.return_value.content = ECB_RESPONSE.replace(
+            b"2024-01-05", b"2024-07-05"
+        )
+
+        rates = fetch_ecb_rates(session)
+
+        self.assertEqual(rates.as_of, datetime(2024, 7, 5, 12, 10, tzinfo=timezone.utc))
+
+    def test_no_rates(self):
+        session = Mock()
+        session.get.return_value.content = b"<Envelope><Cube/></Envelope>"
+
+        with self.assertRaises(FxError):
+            fetch_ecb_rates(session)
+
+
+class TestLoadRates(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.path = os.path.join(self.tmp_dir.name, "fx_rates.json")
+        self.fetch = Mock(
+            return_value=FxRates(**{**RATES.__dict__, "fetched_at": time.time()})
+        )
+
+    def test_fetches_once_then_reads_the_cached_table(self):
+        first = load_rates("EUR", self.path, fetch=self.fetch)
+        second = load_rates("PLN", self.path, fetch=self.fetch)
+
+        self.assertEqual(self.fetch.call_count, 1)
+        self.assertEqual(first.rates, RATES.rates)
+        self.assertEqual(second.base, "PLN")
+        self.assertEqual(second.as_of, AS_OF)
+
+    def test_refetches_when_the_table_is_too_old(self):
+        load_rates("EUR", self.path, fetch=self.fetch)
+        load_rates("EUR", self.path, max_age=0, fetch=self.fetch)
+
+        self.assertEqual(self.fetch.call_count, 2)
+
+    def test_falls_back_to_an_old_table(self):
+        load_rates("EUR", self.path, fetch=self.fetch)
+        self.fetch.side_effect = requests.ConnectionError()
+
+        with self.assertLogs("ryanair", level="WARNING"):
+            rates = load_rates("GBP", self.path, max_age=0, fetch=self.fetch)
+
+        self.assertEqual(rates.as_of, AS_OF)
+        self.assertEqual(rates.base, "GBP")
+
+    def test_no_table_at_all(self):
+        self.fetch.side_effect = requests.ConnectionError()
+
+        with self.assertRaises(FxError):
+            load_rates("EUR", self.path, fetch=self.fetch)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,210 @@
+import unittest
+from unittest.mock import patch, Mock, AsyncMock
+
+import requests
+
+from ryanair import Ryanair, AsyncRyanair
+from ryanair.cache import MemoryResponseCache
+from ryanair.concurrency import AIMDController
+from ryanair.metrics import Histogram, Metrics
+from ryanair.ryanair import RetryPolicy
+from tests.test_ryanair import _body, MOCKED_ONE_WAY_RESPONSE, MOCKED_RETURN_RESPONSE
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+ONE_WAY_URL = "https://services-api.ryanair.com/farfnd/v4/oneWayFares"
+
+
+class TestHistogram(unittest.TestCase):
+    def test_quantiles(self):
+        histogram = Histogram()
+        for i in range(1, 101):
+            histogram.observe(i / 100)
+
+        # Within one bucket (a factor of 2 ** 0.25) of the exact quantiles
+        for q, exact in ((0.5, 0.5), (0.95, 0.95), (0.99, 0.99)):
+            self.assertGreaterEqual(histogram.quantile(q), exact)
+            self.assertLess(histogram.quantile(q), exact * 2**0.25)
+        self.assertEqual(histogram.count, 100)
+        self.assertAlmostEqual(histogram.sum, 50.5)
+        self.assertEqual(histogram.quantile(1), 1.0)
+
+    def test_values_out_of_range(self):
+        histogram = Histogram(smallest=0.01, largest=1)
+        histogram.observe(0.0001)
+        histogram.observe(5)
+
+        self.assertEqual(histogram.quantile(0.5), 0.01)
+        self.assertEqual(histogram.quantile(0.99), 5)
+
+    def test_empty(self):
+        self.assertIsNone(Histogram().quantile(0.5))
+        self.assertIsNone(Histogram().to_dict()["p99"])
+
+
+class TestMetrics(unittest.TestCase):
+    def test_to_dict(self):
+        metrics = Metrics()
+        metrics.record_request(ONE_WAY_URL, 0.2, 1000)
+        metrics.record_request(ONE_WAY_URL, 0.4, error="throttled")
+        metrics.record_retry(ONE_WAY_URL, "throttled")
+        metrics.record_parse(ONE_WAY_URL, 30, 0.01)
+        metrics.record_parse(ONE_WAY_URL, 10)
+        metrics.record_cache_hit(ONE_WAY_URL + "/DUB/BCN/cheapestPerDay")
+
+        endpoints = metrics.to_dict()
+
+        self.assertEqual(sorted(endpoints), ["cheapestPerDay", "oneWayFares"])
+        one_way = endpoints["oneWayFares"]
+        self.assertEqual(one_way["requests"], 2)
+        self.assertEqual(one_way["errors"], {"throttled": 1})
+        self.assertEqual(one_way["retries"], {"throttled": 1})
+        self.assertEqual(one_way["response_bytes"], 1000)
+        self.assertEqual(one_way["fares_per_response"], 20)
+        self.assertEqual(one_way["latency"]["count"], 2)
+        self.assertEqual(one_way["latency"]["max"], 0.4)
+        self.assertEqual(one_way["parse_time"]["count"], 1)
+        self.assertEqual(endpoints["cheapestPerDay"]["cache_hits"], 1)
+
+    def test_to_prometheus(self):
+        metrics = Metrics()
+        metrics.record_request(ONE_WAY_URL, 0.25, 1000)
+        metrics.record_retry(ONE_WAY_URL, "timeout")
+
+        text = metrics.to_prometheus()
+
+        self.assertIn("# TYPE ryanair_requests_total counter\n", text)
+        self.assertIn('ryanair_requests_total{endpoint="oneWayFares"} 1\n', text)
+        self.assertIn(
+            'ryanair_retries_total{endpoint="oneWayFares",kind="timeout"} 1\n', text
+        )
+        self.assertIn(
+            'ryanair_response_bytes_total{endpoint="oneWayFares"} 1000\n', text
+        )
+        self.assertIn("# TYPE ryanair_request_duration_seconds summary\n", text)
+        self.assertIn(
+            'ryanair_request_duration_seconds{endpoint="oneWayFares",quantile="0.99"} 0.25\n',
+            text,
+        )
+        self.assertIn(
+            'ryanair_request_duration_seconds_count{endpoint="oneWayFares"} 1\n', text
+        )
+        # No parse time recorded, so no samples for it
+        self.assertNotIn("ryanair_parse_duration_seconds_count", text)
+        # No concurrency controller tracked
+        self.assertNotIn("ryanair_concurrency_limit", text)
+        self.assertIsNone(metrics.concurrency_limit)
+
+    def test_concurrency_limit_gauge(self):
+        controller = AIMDController(initial_limit=4, max_limit=8)
+        metrics = Metrics()
+        Ryanair(concurrency=controller, metrics=metrics)
+
+        with self.assertRaises(requests.Timeout):
+            with controller.slot(RetryPolicy.is_congestion):
+                raise requests.Timeout()
+
+        self.assertEqual(metrics.concurrency_limit, 2)
+        text = metrics.to_prometheus()
+        self.assertIn("# TYPE ryanair_concurrency_limit gauge\n", text)
+        self.assertIn("ryanair_concurrency_limit 2\n", text)
+
+
+class TestClientMetrics(unittest.TestCase):
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_requests_retries_and_parsing_are_recorded(self, mock_get_session):
+        failed = Mock()
+        failed.raise_for_status.side_effect = requests.ConnectionError()
+        body = _body(MOCKED_ONE_WAY_RESPONSE)
+        mock_get_session.return_value.get.side_effect = [failed, Mock(content=body)]
+
+        metrics = Metrics()
+        ryanair_instance = Ryanair(metrics=metrics)
+        ryanair_instance.get_cheapest_flights("DUB", "2023-09-01", "2023-09-30")
+
+        one_way = metrics.to_dict()["oneWayFares"]
+        self.assertEqual(one_way["requests"], 2)
+        self.assertEqual(one_way["errors"], {"connection": 1})
+        self.assertEqual(one_way["retries"], {"connection": 1})
+        self.assertEqual(one_way["response_bytes"], len(body))
+        self.assertEqual(one_way["responses_parsed"], 1)
+        self.assertEqual(one_way["fares"], 2)
+        self.assertEqual(one_way["parse_time"]["count"], 1)
+
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_cache_hits_are_recorded(self, mock_get_session):
+        mock_get_session.return_value.get.return_value.content = _body(
+            MOCKED_RETURN_RESPONSE
+        )
+
+        metrics = Metrics()
+        ryanair_instance = Ryanair(metrics=metrics, cache=MemoryResponseCache())
+        for _ in range(3):
+            ryanair_instance.get_cheapest_return_flights(
+                "DUB", "2023-09-01", "2023-09-02", "2023-09-03", "2023-09-04"
+            )
+
+        round_trip = metrics.to_dict()["roundTripFares"]
+        self.assertEqual(round_trip["requests"], 1)
+        self.assertEqual(round_trip["cache_hits"], 2)
+        self.assertEqual(round_trip["responses_parsed"], 3)
+        # Identical responses are parsed once
+        self.assertEqual(round_trip["parse_time"]["count"], 1)
+
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_streamed_responses_are_recorded(self, mock_get_session):
+        body = _body(MOCKED_ONE_WAY_RESPONSE)
+        mock_get_session.return_value.get.return_value.iter_content.return_value = [
+            body[i : i + 100] for i in range(0, len(body), 100)
+        ]
+
+        metrics = Metrics()
+        ryanair_instance = Ryanair(metrics=metrics)
+        list(ryanair_instance.iter_cheapest_flights("DUB", "2023-09-01", "2023-09-30"))
+
+        one_way = metrics.to_dict()["oneWayFares"]
+        self.assertEqual(one_way["requests"], 1)
+        self.assertEqual(one_way["response_bytes"], len(body))
+        self.assertEqual(one_way["fares"], 2)
+
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_no_metrics_by_default(self, mock_get_session):
+        mock_get_session.return_value.get.return_value.content = _body({"fares": []})
+
+        ryanair_instance = Ryanair()
+        ryanair_instance.get_cheapest_flights("DUB", "2023-09-01", "2023-09-30")
+
+        self.assertIsNone(ryanair_instance.metrics)
+
+
+@unittest.skipIf(httpx is None, "httpx is not installed")
+class TestAsyncClientMetrics(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        patcher = patch("ryanair.ryanair.httpx.AsyncClient")
+        self.mock_client = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.mock_client.get = AsyncMock()
+        self.mock_client.aclose = AsyncMock()
+
+    async def test_requests_are_recorded(self):
+        body = _body(MOCKED_ONE_WAY_RESPONSE)
+        self.mock_client.get.side_effect = [
+            Mock(),  # session cookie bootstrap
+            Mock(content=body),
+        ]
+
+        metrics = Metrics()
+        async with AsyncRyanair(metrics=metrics) as api:
+            await api.get_cheapest_flights("DUB", "2023-09-01", "2023-09-30")
+
+        one_way = metrics.to_dict()["oneWayFares"]
+        self.assertEqual(one_way["requests"], 1)
+        self.assertEqual(one_way["response_bytes"], len(body))
+        self.assertEqual(one_way["fares"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
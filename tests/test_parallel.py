@@ -0,0 +1,167 @@
+import json
+import unittest
+from multiprocessing import shared_memory
+from unittest.mock import patch
+
+import requests
+
+from ryanair import Ryanair, decoding
+from ryanair.SessionManager import SessionManager
+from ryanair.fake_server import FakeFareServer, synthetic_fares_response
+from ryanair.ryanair import _RyanairBase
+from ryanair.types import Query
+from tests.test_ryanair import _body, MOCKED_ONE_WAY_RESPONSE, MOCKED_RETURN_RESPONSE
+
+try:
+    import numpy as np
+    from ryanair.frame import FareFrame
+    from ryanair import parallel
+    from ryanair.parallel import FareParserPool
+except ImportError:
+    np = None
+
+ROUND_TRIP_URL = "https://services-api.ryanair.com/farfnd/v4/roundTripFares"
+
+
+def _round_trip_body(origin, destinations=50):
+    params = {
+        "departureAirportIataCode": origin,
+        "outboundDepartureDateFrom": "2024-01-04",
+        "outboundDepartureDateTo": "2024-01-05",
+        "inboundDepartureDateFrom": "2024-01-07",
+        "inboundDepartureDateTo": "2024-01-09",
+    }
+    return _body(
+        synthetic_fares_response(ROUND_TRIP_URL, params, destinations=destinations)
+    )
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestFareParserPool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = FareParserPool(processes=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+
+    def setUp(self):
+        self.parser = _RyanairBase(currency="EUR")
+        self.bodies = [
+            _round_trip_body("CGN"),
+            _body({"fares": []}),
+            _round_trip_body("NRN", 80),
+        ]
+        self.search_origins = [("CGN", "Köln"), ("DUB", None), ("NRN", "Weeze")]
+        self.trips = [
+            trip.with_search_origin(code, name)
+            for body, (code, name) in zip(self.bodies, self.search_origins)
+            for trip in self.parser._parse_cheapest_return_flights(
+                json.loads(body)["fares"]
+            )
+        ]
+
+    def test_frames_match_parsed_fares(self):
+        expected = FareFrame.from_fares(self.trips)
+
+        for processes in (0, 2):
+            with self.subTest(processes=processes):
+                pool = self.pool if processes else FareParserPool(processes=0)
+                frame = pool.parse(
+                    iter(self.bodies),
+                    is_return=True,
+                    search_origins=self.search_origins,
+                )
+
+                self.assertEqual(frame.to_list(), self.trips)
+                self.assertEqual(frame.top_k(5).to_list(), expected.top_k(5).to_list())
+                for name, column in expected.columns.items():
+                    np.testing.assert_array_equal(
+                        frame.columns[name], column, err_msg=name
+                    )
+
+    def test_one_way_fares(self):
+        flights = self.parser._parse_cheapest_flights(MOCKED_ONE_WAY_RESPONSE["fares"])
+
+        frame = self.pool.parse([_body(MOCKED_ONE_WAY_RESPONSE)])
+
+        self.assertFalse(frame.is_return)
+        self.assertEqual(frame.to_list(), flights)
+
+    def test_without_msgspec(self):
+        trips = self.parser._parse_cheapest_return_flights(
+            MOCKED_RETURN_RESPONSE["fares"]
+        )
+
+        with patch.object(decoding, "msgspec", None):
+            frame = FareParserPool(processes=0).parse(
+                [_body(MOCKED_RETURN_RESPONSE)], is_return=True
+            )
+
+        self.assertEqual(frame.to_list(), trips)
+
+    def test_no_bodies(self):
+        frame = self.pool.parse([], is_return=True, search_origins=[])
+
+        self.assertEqual(len(frame), 0)
+        self.assertEqual(frame.to_list(), [])
+
+    def test_invalid_body(self):
+        with self.assertRaises(json.JSONDecodeError):
+            self.pool.parse(
+                [self.bodies[0], b'{"fares": [', self.bodies[2]], is_return=True
+            )
+        # The pool is still usable
+        self.assertEqual(len(self.pool.parse(self.bodies[:1], is_return=True)), 50)
+
+    def test_failing_bodies_iterator_releases_submitted_segments(self):
+        def bodies():
+            yield self.bodies[0]
+            yield self.bodies[2]
+            raise requests.ConnectionError("fetch failed")
+
+        with patch.object(parallel, "_release", wraps=parallel._release) as release:
+            with self.assertRaises(requests.ConnectionError):
+                self.pool.parse(bodies(), is_return=True)
+
+        names = [name for call in release.call_args_list for name in call.args[0]]
+        self.assertEqual(len(names), 2)
+        for name in names:
+            with self.assertRaises(FileNotFoundError):
+                shared_memory.SharedMemory(name=name)
+
+    def test_columns_only_frame_without_fare_fields(self):
+        frame = FareFrame({"price": np.array([1.0])})
+
+        with self.assertRaises(ValueError):
+            frame.to_list()
+
+
+class TestGetFaresBody(unittest.TestCase):
+    def setUp(self):
+        shared = patch.dict(SessionManager._shared, clear=True)
+        shared.start()
+        self.addCleanup(shared.stop)
+
+    def test_body_of_a_fares_query(self):
+        query = Query.round_trip(
+            "DUB", "2024-01-04", "2024-01-05", "2024-01-07", "2024-01-09"
+        )
+        with FakeFareServer(destinations=10) as server:
+            api = Ryanair(currency="EUR", transport=server.transport())
+            body = api.get_fares_body(query)
+            trips = query.run(api)
+            api.close()
+
+        parser = _RyanairBase(currency="EUR")
+        self.assertEqual(
+            parser._parse_cheapest_return_flights(json.loads(body)["fares"]), trips
+        )
+
+        with self.assertRaises(ValueError):
+            api.get_fares_body(Query.fare_calendar("DUB", "STN", "2024-01"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,211 @@
+import datetime
+import unittest
+from unittest.mock import Mock
+
+import requests
+
+from ryanair.query_planner import LogicalQuery, plan_queries
+from ryanair.types import Flight, Trip
+
+
+def _flight(departure, destination="BCN", price=10.0):
+    return Flight(
+        departureTime=departure,
+        flightNumber="FR 1",
+        price=price,
+        currency="EUR",
+        origin="CGN",
+        originFull="Cologne, Germany",
+        destination=destination,
+        destinationFull="Barcelona, Spain",
+    )
+
+
+def _trip(outbound_departure, inbound_departure):
+    outbound = _flight(outbound_departure)
+    inbound = _flight(inbound_departure)
+    return Trip(totalPrice=20.0, outbound=outbound, inbound=inbound)
+
+
+class TestQueryPlanner(unittest.TestCase):
+    def test_identical_queries_are_fetched_once(self):
+        queries = [LogicalQuery("CGN", "2024-05-02", "2024-05-02") for _ in range(3)]
+
+        plan = plan_queries(queries, max_span_days=1)
+
+        self.assertEqual(len(plan.upstream), 1)
+        self.assertEqual(plan.calls_saved, 2)
+        self.assertEqual(plan.members, [[0, 1, 2]])
+
+    def test_adjacent_windows_are_merged(self):
+        queries = [
+            LogicalQuery("CGN", "2024-05-02", "2024-05-02", time_from="17:00"),
+            LogicalQuery("CGN", "2024-05-03", "2024-05-03", time_from="17:00"),
+            LogicalQuery("CGN", "2024-05-09", "2024-05-09", time_from="17:00"),
+        ]
+
+        plan = plan_queries(queries)
+
+        self.assertEqual(plan.calls_saved, 1)
+        merged = plan.upstream[0]
+        self.assertEqual(merged.method, "get_cheapest_flights")
+        self.assertEqual(
+            merged.args[1:], (datetime.date(2024, 5, 2), datetime.date(2024, 5, 3))
+        )
+        self.assertEqual(merged.kwargs["departure_time_from"], datetime.time(17, 0))
+        self.assertEqual(plan.members, [[0, 1], [2]])
+
+    def test_max_span_days_bounds_merged_windows(self):
+        queries = [
+            LogicalQuery("CGN", day, day + datetime.timedelta(days=1))
+            for day in (
+                datetime.date(2024, 5, 1) + datetime.timedelta(days=i) for i in range(6)
+            )
+        ]
+
+        plan = plan_queries(queries, max_span_days=4)
+
+        self.assertEqual(len(plan.upstream), 2)
+        self.assertEqual(plan.members, [[0, 1, 2], [3, 4, 5]])
+
+    def test_incompatible_queries_are_not_merged(self):
+        queries = [
+            LogicalQuery("CGN", "2024-05-02", "2024-05-02"),
+            LogicalQuery("NRN", "2024-05-02", "2024-05-02"),
+            LogicalQuery("CGN", "2024-05-02", "2024-05-02", destination_airport="BCN"),
+            LogicalQuery(
+                "CGN",
+                "2024-05-02",
+                "2024-05-02",
+                return_date_from="2024-05-04",
+                return_date_to="2024-05-06",
+            ),
+            LogicalQuery(
+                "CGN",
+                "2024-05-03",
+                "2024-05-03",
+                return_date_from="2024-05-20",
+                return_date_to="2024-05-22",
+            ),
+        ]
+
+        plan = plan_queries(queries)
+
+        self.assertEqual(plan.calls_saved, 0)
+
+    def test_split_filters_fares_per_logical_query(self):
+        queries = [
+            LogicalQuery(
+                "CGN",
+                day,
+                day,
+                time_from="17:00",
+                return_date_from="2024-05-05",
+                return_date_to="2024-05-06",
+            )
+            for day in ("2024-05-02", "2024-05-03")
+        ]
+        plan = plan_queries(queries)
+        self.assertEqual(len(plan.upstream), 1)
+        self.assertEqual(
+            plan.upstream[0].args[1:],
+            (
+                datetime.date(2024, 5, 2),
+                datetime.date(2024, 5, 3),
+                datetime.date(2024, 5, 5),
+                datetime.date(2024, 5, 6),
+            ),
+        )
+
+        thursday = _trip(
+            datetime.datetime(2024, 5, 2, 18), datetime.datetime(2024, 5, 5, 9)
+        )
+        friday = _trip(
+            datetime.datetime(2024, 5, 3, 19), datetime.datetime(2024, 5, 6, 9)
+        )
+
+        self.assertEqual(plan.split([[thursday, friday]]), [[thursday], [friday]])
+
+    def test_queries_with_different_time_or_return_windows_are_not_merged(self):
+        # The Thu evening / Fri schedule: merged into Thu-Fri 11:00-23:59 with a Sat-Tue return, the cheapest fare
+        # per destination could be a Thu 12:00 one that matches neither query, hiding the fares that do
+        queries = [
+            LogicalQuery(
+                "CGN",
+                "2024-05-02",
+                "2024-05-02",
+                time_from="17:00",
+                return_date_from="2024-05-05",
+                return_date_to="2024-05-06",
+            ),
+            LogicalQuery(
+                "CGN",
+                "2024-05-03",
+                "2024-05-03",
+                time_from="11:00",
+                return_date_from="2024-05-06",
+                return_date_to="2024-05-07",
+            ),
+            LogicalQuery(
+                "CGN",
+                "2024-05-03",
+                "2024-05-03",
+                time_from="17:00",
+                return_date_from="2024-05-06",
+                return_date_to="2024-05-07",
+            ),
+        ]
+
+        plan = plan_queries(queries)
+
+        self.assertEqual(plan.calls_saved, 0)
+        self.assertEqual(
+            [query.args[1:] for query in plan.upstream],
+            [
+                (
+                    query.date_from,
+                    query.date_to,
+                    query.return_date_from,
+                    query.return_date_to,
+                )
+                for query in queries
+            ],
+        )
+        thursday_evening = _trip(
+            datetime.datetime(2024, 5, 2, 18), datetime.datetime(2024, 5, 5, 9)
+        )
+        friday_noon = _trip(
+            datetime.datetime(2024, 5, 3, 12), datetime.datetime(2024, 5, 7, 9)
+        )
+        self.assertEqual(
+            plan.split([[thursday_evening], [friday_noon], [friday_noon]]),
+            [[thursday_evening], [friday_noon], []],
+        )
+
+    def test_execute_runs_upstream_queries_and_propagates_errors(self):
+        queries = [
+            LogicalQuery("CGN", "2024-05-02", "2024-05-02"),
+            LogicalQuery("CGN", "2024-05-03", "2024-05-03"),
+            LogicalQuery("NRN", "2024-05-02", "2024-05-02"),
+        ]
+        plan = plan_queries(queries)
+        error = requests.HTTPError()
+        api = Mock()
+        api.get_many.return_value = [
+            [
+                _flight(datetime.datetime(2024, 5, 2, 8)),
+                _flight(datetime.datetime(2024, 5, 3, 8), "STN"),
+            ],
+            error,
+        ]
+
+        results = plan.execute(api, max_workers=4)
+
+        api.get_many.assert_called_once_with(plan.upstream, max_workers=4)
+        self.assertEqual([f.destination for f in results[0]], ["BCN"])
+        self.assertEqual([f.destination for f in results[1]], ["STN"])
+        self.assertIs(results[2], error)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,262 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import requests
+
+from ryanair import AsyncRyanair, Ryanair
+from ryanair.SessionManager import RequestsTransport, SessionManager
+from ryanair.fake_server import FakeFareServer, synthetic_fares_response
+from ryanair.replay import (
+    ExchangeStore,
+    RecordingTransport,
+    ReplayMissError,
+    ReplayTransport,
+)
+from tests.test_ryanair import _body, MOCKED_ONE_WAY_RESPONSE
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+ONE_WAY_URL = "https://services-api.ryanair.com/farfnd/v4/oneWayFares"
+ROUND_TRIP_URL = "https://services-api.ryanair.com/farfnd/v4/roundTripFares"
+PARAMS = {
+    "departureAirportIataCode": "DUB",
+    "outboundDepartureDateFrom": "2024-01-01",
+    "outboundDepartureDateTo": "2024-01-07",
+    "outboundDepartureTimeFrom": "17:00",
+    "outboundDepartureTimeTo": "23:59",
+}
+
+
+class TestSyntheticFares(unittest.TestCase):
+    def test_deterministic(self):
+        self.assertEqual(
+            synthetic_fares_response(ONE_WAY_URL, PARAMS),
+            synthetic_fares_response(ONE_WAY_URL, dict(reversed(PARAMS.items()))),
+        )
+        self.assertNotEqual(
+            synthetic_fares_response(ONE_WAY_URL, PARAMS, seed=0),
+            synthetic_fares_response(ONE_WAY_URL, PARAMS, seed=1),
+        )
+
+    def test_query_is_honoured(self):
+        fares = synthetic_fares_response(ONE_WAY_URL, PARAMS, destinations=20)["fares"]
+
+        self.assertEqual(len(fares), 20)
+        prices = [fare["summary"]["price"]["value"] for fare in fares]
+        self.assertEqual(prices, sorted(prices))
+        for fare in fares:
+            departure = fare["outbound"]["departureDate"]
+            self.assertTrue("2024-01-01" <= departure[:10] <= "2024-01-07")
+            self.assertTrue("17:00" <= departure[11:16] <= "23:59")
+
+    def test_filters(self):
+        everything = synthetic_fares_response(ONE_WAY_URL, PARAMS)["fares"]
+
+        cheap = synthetic_fares_response(
+            ONE_WAY_URL, {**PARAMS, "priceValueTo": "100"}
+        )["fares"]
+        self.assertEqual(
+            cheap, [f for f in everything if f["summary"]["price"]["value"] <= 100]
+        )
+
+        destination = everything[3]["outbound"]["arrivalAirport"]["iataCode"]
+        one = synthetic_fares_response(
+            ONE_WAY_URL, {**PARAMS, "arrivalAirportIataCode": destination}
+        )
+        self.assertEqual(one["fares"], [everything[3]])
+
+    def test_round_trips(self):
+        params = {
+            **PARAMS,
+            "inboundDepartureDateFrom": "2024-01-04",
+            "inboundDepartureDateTo": "2024-01-10",
+        }
+        fare = synthetic_fares_response(ROUND_TRIP_URL, params)["fares"][0]
+
+        self.assertEqual(fare["inbound"]["arrivalAirport"]["iataCode"], "DUB")
+        self.assertAlmostEqual(
+            fare["summary"]["price"]["value"],
+            fare["outbound"]["price"]["value"] + fare["inbound"]["price"]["value"],
+        )
+
+
+class TestFakeFareServer(unittest.TestCase):
+    def setUp(self):
+        shared = patch.dict(SessionManager._shared, clear=True)
+        shared.start()
+        self.addCleanup(shared.stop)
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def test_serves_synthetic_fares(self):
+        with FakeFareServer(destinations=10) as server:
+            api = Ryanair(transport=server.transport())
+            flights = api.get_cheapest_flights("DUB", "2024-01-01", "2024-01-07")
+            streamed = list(
+                api.iter_cheapest_flights("DUB", "2024-01-01", "2024-01-07")
+            )
+            api.close()
+
+        self.assertEqual(len(flights), 10)
+        self.assertEqual(streamed, flights)
+        self.assertEqual(server.requests, 2)
+
+    def test_latency(self):
+        with FakeFareServer(latency=0.05, jitter=0.01) as server:
+            api = Ryanair(transport=server.transport())
+            start = time.perf_counter()
+            api.get_cheapest_flights("DUB", "2024-01-01", "2024-01-07")
+
+            self.assertGreaterEqual(time.perf_counter() - start, 0.04)
+
+    def test_error_injection(self):
+        with FakeFareServer(error_rate=1.0, retry_after=0) as server:
+            api = Ryanair(transport=server.transport())
+            with self.assertRaises(requests.HTTPError) as raised:
+                api.get_cheapest_flights("DUB", "2024-01-01", "2024-01-07")
+
+            self.assertEqual(raised.exception.response.status_code, 503)
+            self.assertEqual(server.errors, api.retry_policy.max_tries)
+            self.assertEqual(
+                api.retry_counts["throttled"], api.retry_policy.max_tries - 1
+            )
+
+    def test_serves_recordings(self):
+        store = ExchangeStore(self.tmp_dir.name)
+        store.save(ONE_WAY_URL, PARAMS, 200, {}, _body(MOCKED_ONE_WAY_RESPONSE))
+
+        with FakeFareServer(recordings=self.tmp_dir.name) as server:
+            api = Ryanair(transport=server.transport())
+            flights = api.get_cheapest_flights(
+                "DUB", "2024-01-01", "2024-01-07", departure_time_from="17:00"
+            )
+            other = api.get_cheapest_flights("DUB", "2024-01-01", "2024-01-07")
+
+        self.assertEqual([f.destination for f in flights], ["BRS", "EDI"])
+        # Not recorded, so synthetic
+        self.assertEqual(len(other), 50)
+
+
+class TestRecordReplay(unittest.TestCase):
+    def setUp(self):
+        shared = patch.dict(SessionManager._shared, clear=True)
+        shared.start()
+        self.addCleanup(shared.stop)
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def test_replays_recorded_responses(self):
+        with FakeFareServer() as server:
+            api = Ryanair(
+                transport=RecordingTransport(self.tmp_dir.name, server.transport())
+            )
+            recorded = api.get_cheapest_return_flights(
+                "DUB", "2024-01-01", "2024-01-07", "2024-01-04", "2024-01-10"
+            )
+            api.close()
+        self.assertEqual(len(os.listdir(self.tmp_dir.name)), 1)
+
+        with patch("requests.adapters.HTTPAdapter.send") as mock_send:
+            api = Ryanair(transport=ReplayTransport(self.tmp_dir.name))
+            replayed = api.get_cheapest_return_flights(
+                "DUB", "2024-01-01", "2024-01-07", "2024-01-04", "2024-01-10"
+            )
+            streamed = list(
+                api.iter_cheapest_return_flights(
+                    "DUB", "2024-01-01", "2024-01-07", "2024-01-04", "2024-01-10"
+                )
+            )
+
+            with self.assertRaises(ReplayMissError):
+                api.get_cheapest_flights("DUB", "2024-01-01", "2024-01-07")
+
+        self.assertEqual(replayed, recorded)
+        self.assertEqual(streamed, recorded)
+        self.assertEqual(api.num_queries, 3)
+        mock_send.assert_not_called()
+
+    def test_failures_are_not_recorded(self):
+        with FakeFareServer(error_rate=1.0, retry_after=0) as server:
+            api = Ryanair(
+                transport=RecordingTransport(self.tmp_dir.name, server.transport())
+            )
+            with self.assertRaises(requests.HTTPError):
+                api.get_cheapest_flights("DUB", "2024-01-01", "2024-01-07")
+
+        self.assertFalse(
+            os.path.exists(self.tmp_dir.name) and os.listdir(self.tmp_dir.name)
+        )
+
+
+@unittest.skipIf(httpx is None, "httpx is not installed")
+class TestAsyncTransports(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        shared = patch.dict(SessionManager._shared, clear=True)
+        shared.start()
+        self.addCleanup(shared.stop)
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    async def test_fake_server(self):
+        with FakeFareServer(destinations=10) as server:
+            async with AsyncRyanair(transport=server.transport()) as api:
+                flights = await api.get_cheapest_flights(
+                    "DUB", "2024-01-01", "2024-01-07"
+                )
+            expected = Ryanair(transport=server.transport()).get_cheapest_flights(
+                "DUB", "2024-01-01", "2024-01-07"
+            )
+
+        self.assertEqual(flights, expected)
+        # No visit to the main website for session cookies
+        self.assertEqual(server.requests, 2)
+
+    async def test_replays_recorded_responses(self):
+        with FakeFareServer() as server:
+            transport = RecordingTransport(self.tmp_dir.name, server.transport())
+            async with AsyncRyanair(transport=transport) as api:
+                recorded = await api.get_cheapest_return_flights(
+                    "DUB", "2024-01-01", "2024-01-07", "2024-01-04", "2024-01-10"
+                )
+        self.assertEqual(len(os.listdir(self.tmp_dir.name)), 1)
+
+        with patch("httpx.AsyncHTTPTransport.handle_async_request") as mock_send:
+            async with AsyncRyanair(
+                transport=ReplayTransport(self.tmp_dir.name)
+            ) as api:
+                replayed = await api.get_cheapest_return_flights(
+                    "DUB", "2024-01-01", "2024-01-07", "2024-01-04", "2024-01-10"
+                )
+                with self.assertRaises(ReplayMissError):
+                    await api.get_cheapest_flights("DUB", "2024-01-01", "2024-01-07")
+        sync_replayed = Ryanair(
+            transport=ReplayTransport(self.tmp_dir.name)
+        ).get_cheapest_return_flights(
+            "DUB", "2024-01-01", "2024-01-07", "2024-01-04", "2024-01-10"
+        )
+
+        self.assertEqual(replayed, recorded)
+        self.assertEqual(sync_replayed, recorded)
+        mock_send.assert_not_called()
+
+    async def test_custom_adapters_are_refused(self):
+        class CustomTransport(RequestsTransport):
+            def _new_adapter(self):
+                return super()._new_adapter()
+
+        async with AsyncRyanair(transport=CustomTransport()) as api:
+            with self.assertRaises(TypeError):
+                await api.get_cheapest_flights("DUB", "2024-01-01", "2024-01-07")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest.mock import patch, Mock
+
+import requests
+
+from ryanair import Ryanair
+from ryanair.ryanair import RetryBudget, RetryPolicy
+from tests.test_ryanair import _body
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+def _http_error(status, headers=None):
+    response = Mock(status_code=status, headers=headers or {})
+    response.raise_for_status.side_effect = requests.HTTPError(response=response)
+    return response
+
+
+def _ok():
+    return Mock(content=_body({"fares": []}))
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_classify(self):
+        classify = RetryPolicy.classify
+
+        self.assertEqual(classify(requests.ReadTimeout()), "timeout")
+        self.assertEqual(classify(requests.ConnectionError()), "connection")
+        self.assertEqual(
+            classify(requests.HTTPError(response=Mock(status_code=429))), "throttled"
+        )
+        self.assertEqual(
+            classify(requests.HTTPError(response=Mock(status_code=503))), "throttled"
+        )
+        self.assertEqual(
+            classify(requests.HTTPError(response=Mock(status_code=502))), "server"
+        )
+        self.assertEqual(
+            classify(requests.HTTPError(response=Mock(status_code=404))), "client"
+        )
+        self.assertEqual(classify(KeyError("fares")), "other")
+        self.assertEqual(classify(ValueError()), "other")
+
+    @unittest.skipIf(httpx is None, "httpx is not installed")
+    def test_classify_httpx(self):
+        request = httpx.Request("GET", "https://example.com")
+        self.assertEqual(
+            RetryPolicy.classify(httpx.ReadTimeout("", request=request)), "timeout"
+        )
+        self.assertEqual(
+            RetryPolicy.classify(httpx.ConnectError("", request=request)), "connection"
+        )
+        error = httpx.HTTPStatusError(
+            "", request=request, response=httpx.Response(429, request=request)
+        )
+        self.assertEqual(RetryPolicy.classify(error), "throttled")
+
+    def test_retry_after(self):
+        def error(value):
+            return requests.HTTPError(response=Mock(headers={"Retry-After": value}))
+
+        self.assertEqual(RetryPolicy.retry_after(error("7")), 7)
+        in_a_minute = format_datetime(
+            datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True
+        )
+        self.assertAlmostEqual(RetryPolicy.retry_after(error(in_a_minute)), 60, delta=2)
+        self.assertIsNone(RetryPolicy.retry_after(error("soon")))
+        self.assertIsNone(RetryPolicy.retry_after(requests.ConnectionError()))
+
+    def test_budget(self):
+        budget = RetryBudget(ratio=0.5, initial=1, max_tokens=2)
+        budget.withdraw()
+        budget.withdraw()
+        self.assertEqual(budget.tokens, 0)
+        for _ in range(10):
+            budget.deposit()
+        self.assertEqual(budget.tokens, 2)
+
+
+class TestRyanairRetries(unittest.TestCase):
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_client_errors_are_not_retried(self, mock_get_session):
+        mock_get_session.return_value.get.return_value = _http_error(404)
+
+        ryanair_instance = Ryanair()
+        with self.assertRaises(requests.HTTPError):
+            ryanair_instance._retryable_query("mock_url")
+
+        self.assertEqual(ryanair_instance.num_queries, 1)
+
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_unexpected_errors_are_not_retried(self, mock_get_session):
+        mock_get_session.return_value.get.side_effect = KeyError("fares")
+
+        ryanair_instance = Ryanair()
+        with self.assertRaises(KeyError):
+            ryanair_instance._retryable_query("mock_url")
+
+        self.assertEqual(ryanair_instance.num_queries, 1)
+
+    @patch("backoff._sync.time.sleep")
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_only_exhausted_retries_are_logged_as_errors(self, mock_get_session, _):
+        mock_get_session.return_value.get.return_value = _http_error(404)
+        ryanair_instance = Ryanair(retry_policy=RetryPolicy(max_tries=2))
+
+        with self.assertLogs("ryanair", level="DEBUG") as logs:
+            with self.assertRaises(requests.HTTPError):
+                ryanair_instance._retryable_query("mock_url")
+        self.assertEqual({record.levelname for record in logs.records}, {"DEBUG"})
+
+        mock_get_session.return_value.get.return_value = None
+        mock_get_session.return_value.get.side_effect = requests.ConnectionError()
+        with self.assertLogs("ryanair", level="DEBUG") as logs:
+            with self.assertRaises(requests.ConnectionError):
+                ryanair_instance._retryable_query("mock_url")
+        errors = [record for record in logs.records if record.levelname == "ERROR"]
+        self.assertEqual(len(errors), 1)
+        self.assertIn("after 2 tries", errors[0].getMessage())
+        self.assertIsNotNone(errors[0].exc_info)
+
+    @patch("backoff._sync.time.sleep")
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_retry_after_is_honoured(self, mock_get_session, mock_sleep):
+        mock_get_session.return_value.get.side_effect = [
+            _http_error(429, {"Retry-After": "3"}),
+            requests.ConnectionError(),
+            _ok(),
+        ]
+
+        ryanair_instance = Ryanair()
+        self.assertEqual(ryanair_instance._retryable_query("mock_url"), {"fares": []})
+
+        self.assertEqual(mock_sleep.call_args_list[0].args, (3.0,))
+        self.assertEqual(
+            ryanair_instance.retry_counts,
+            {"timeout": 0, "connection": 1, "throttled": 1, "server": 0, "session": 0},
+        )
+
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_long_retry_after_gives_up(self, mock_get_session):
+        mock_get_session.return_value.get.return_value = _http_error(
+            503, {"Retry-After": "3600"}
+        )
+
+        ryanair_instance = Ryanair()
+        with self.assertRaises(requests.HTTPError):
+            ryanair_instance._retryable_query("mock_url")
+
+        self.assertEqual(ryanair_instance.num_queries, 1)
+
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_retry_budget_is_shared_by_queries(self, mock_get_session):
+        mock_get_session.return_value.get.side_effect = requests.ConnectionError()
+
+        policy = RetryPolicy(budget=RetryBudget(initial=3))
+        ryanair_instance = Ryanair(retry_policy=policy)
+        for _ in range(2):
+            with self.assertRaises(requests.ConnectionError):
+                ryanair_instance._retryable_query("mock_url")
+
+        # 3 retries in total: the first query used them all, the second got none
+        self.assertEqual(ryanair_instance.num_queries, 5)
+        self.assertEqual(ryanair_instance.retry_counts["connection"], 3)
+        self.assertEqual(policy.budget_exhausted, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
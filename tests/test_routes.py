@@ -0,0 +1,199 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch, Mock
+
+import requests
+
+from ryanair import Ryanair
+from ryanair.routes import RouteMap
+from tests.test_ryanair import _body
+
+
+def _route(destination, country, connecting=None):
+    return {
+        "departureAirport": {"code": "DUB"},
+        "arrivalAirport": {
+            "code": destination,
+            "name": destination,
+            "country": {"code": country, "name": country},
+        },
+        "connectingAirport": connecting,
+        "operator": "FR",
+    }
+
+
+MOCKED_ROUTES_RESPONSE = [
+    _route("BCN", "es"),
+    _route("STN", "gb"),
+    _route("PMI", "es", connecting={"code": "BGY"}),
+]
+
+
+class TestRouteMap(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.path = os.path.join(self.tmp_dir.name, "routes.json")
+
+    def test_update_keeps_direct_routes_only(self):
+        route_map = RouteMap(self.path)
+
+        destinations = route_map.update("DUB", MOCKED_ROUTES_RESPONSE)
+
+        self.assertEqual(destinations, {"BCN": "ES", "STN": "GB"})
+        self.assertEqual(route_map.get("DUB"), destinations)
+        self.assertIsNone(route_map.get("STN"))
+
+    def test_routes_are_persisted(self):
+        RouteMap(self.path).update("DUB", MOCKED_ROUTES_RESPONSE)
+
+        self.assertEqual(RouteMap(self.path).get("DUB"), {"BCN": "ES", "STN": "GB"})
+
+    def test_stale_routes_are_ignored(self):
+        route_map = RouteMap(self.path, ttl=60)
+        with patch("ryanair.routes.time.time", return_value=1000):
+            route_map.update("DUB", MOCKED_ROUTES_RESPONSE)
+
+        with patch("ryanair.routes.time.time", return_value=1061):
+            self.assertIsNone(route_map.get("DUB"))
+
+    def test_save_keeps_routes_saved_by_other_processes(self):
+        ours, theirs = RouteMap(self.path), RouteMap(self.path)
+
+        theirs.update("STN", [_route("DUB", "ie")])
+        ours.update("DUB", MOCKED_ROUTES_RESPONSE)
+
+        reloaded = RouteMap(self.path)
+        self.assertEqual(reloaded.get("DUB"), {"BCN": "ES", "STN": "GB"})
+        self.assertEqual(reloaded.get("STN"), {"DUB": "IE"})
+
+    def test_save_keeps_the_newest_routes_for_an_origin(self):
+        ours, theirs = RouteMap(self.path), RouteMap(self.path)
+
+        with patch("ryanair.routes.time.time", return_value=2000):
+            theirs.update("DUB", MOCKED_ROUTES_RESPONSE)
+        with patch("ryanair.routes.time.time", return_value=1000):
+            ours.update("DUB", [])
+
+        with patch("ryanair.routes.time.time", return_value=2000):
+            self.assertEqual(RouteMap(self.path).get("DUB"), {"BCN": "ES", "STN": "GB"})
+
+    def test_concurrent_lookups_share_one_fetch(self):
+        route_map = RouteMap(self.path)
+        release = threading.Event()
+        fetches = []
+
+        def fetch():
+            fetches.append(1)
+            release.wait(5)
+            return MOCKED_ROUTES_RESPONSE
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(route_map.get_or_fetch("DUB", fetch))
+            )
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        while not fetches:
+            release.wait(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(fetches), 1)
+        self.assertEqual(results, [{"BCN": "ES", "STN": "GB"}] * 4)
+
+    def test_allows(self):
+        destinations = {"BCN": "ES", "STN": "GB"}
+
+        self.assertTrue(RouteMap.allows(None, "PMI"))
+        self.assertTrue(RouteMap.allows(destinations, "BCN"))
+        self.assertTrue(RouteMap.allows(destinations, destination_country="es"))
+        self.assertFalse(RouteMap.allows(destinations, "PMI"))
+        self.assertFalse(RouteMap.allows(destinations, destination_country="DE"))
+
+
+class TestRyanairRoutePruning(unittest.TestCase):
+    def setUp(self):
+        self.route_map = RouteMap(path=None)
+
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_queries_for_missing_routes_are_answered_locally(self, mock_get_session):
+        mock_get_session.return_value.get.return_value.content = _body(
+            MOCKED_ROUTES_RESPONSE
+        )
+
+        ryanair_instance = Ryanair(route_map=self.route_map)
+        flights = ryanair_instance.get_cheapest_flights(
+            "DUB", "2023-09-01", "2023-09-30", destination_airport="PMI"
+        )
+        trips = ryanair_instance.get_cheapest_return_flights(
+            "DUB",
+            "2023-09-01",
+            "2023-09-02",
+            "2023-09-03",
+            "2023-09-04",
+            destination_country="DE",
+        )
+        calendar = ryanair_instance.get_fare_calendar("DUB", "KRK", "2023-09")
+
+        self.assertEqual(flights, [])
+        self.assertEqual(trips, [])
+        self.assertEqual(calendar.prices, {})
+        # Only the routes lookup went to the network
+        mock_get_session.return_value.get.assert_called_once_with(
+            "https://www.ryanair.com/api/views/locate/searchWidget/routes/en/airport/DUB",
+            params=None,
+        )
+
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_existing_routes_are_queried(self, mock_get_session):
+        routes_response = Mock(content=_body(MOCKED_ROUTES_RESPONSE))
+        fares_response = Mock(content=_body({"fares": []}))
+        mock_get_session.return_value.get.side_effect = [
+            routes_response,
+            fares_response,
+            fares_response,
+        ]
+
+        ryanair_instance = Ryanair(route_map=self.route_map)
+        ryanair_instance.get_cheapest_flights(
+            "DUB", "2023-09-01", "2023-09-30", destination_airport="BCN"
+        )
+        ryanair_instance.get_cheapest_flights(
+            "DUB", "2023-09-01", "2023-09-30", destination_country="gb"
+        )
+
+        self.assertEqual(ryanair_instance.num_queries, 3)
+
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_unfiltered_queries_skip_the_route_lookup(self, mock_get_session):
+        mock_get_session.return_value.get.return_value.content = _body({"fares": []})
+
+        ryanair_instance = Ryanair(route_map=self.route_map)
+        ryanair_instance.get_cheapest_flights("DUB", "2023-09-01", "2023-09-30")
+
+        self.assertEqual(ryanair_instance.num_queries, 1)
+
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_route_lookup_failure_does_not_prune(self, mock_get_session):
+        mock_get_session.return_value.get.side_effect = [
+            requests.ConnectionError()
+        ] * 5 + [Mock(content=_body({"fares": []}))]
+
+        ryanair_instance = Ryanair(route_map=self.route_map)
+        flights = ryanair_instance.get_cheapest_flights(
+            "DUB", "2023-09-01", "2023-09-30", destination_airport="PMI"
+        )
+
+        self.assertEqual(flights, [])
+        self.assertEqual(ryanair_instance.num_queries, 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,6 @@
 import datetime
+import json
+import threading
 import unittest
 from unittest import mock
 from unittest.mock import patch, Mock, call
@@ -7,7 +9,12 @@ from unittest.mock import patch, Mock, call
 import requests
 
 from ryanair import Ryanair
-from ryanair.types import Flight, Trip
+from ryanair.types import Flight, Trip, Query, FareCalendar
+
+
+def _body(payload):
+    return json.dumps(payload).encode()
+
 
 MOCKED_ONE_WAY_RESPONSE = {
     "arrivalAirportCategories": None,
@@ -266,6 +273,46 @@ MOCKED_RETURN_RESPONSE = {
 }
 
 
+def _calendar_fare(day, value, unavailable=False):
+    return {
+        "day": day,
+        "arrivalDate": None if unavailable else f"{day}T10:05:00",
+        "departureDate": None if unavailable else f"{day}T08:20:00",
+        "price": None
+        if unavailable
+        else {
+            "value": value,
+            "valueMainUnit": str(int(value)),
+            "valueFractionalUnit": "99",
+            "currencyCode": "EUR",
+            "currencySymbol": "€",
+        },
+        "soldOut": False,
+        "unavailable": unavailable,
+    }
+
+
+MOCKED_FARE_CALENDAR_RESPONSE = {
+    "outbound": {
+        "fares": [
+            _calendar_fare("2023-09-01", 19.99),
+            _calendar_fare("2023-09-02", None, unavailable=True),
+            _calendar_fare("2023-09-03", 24.99),
+        ],
+        "minFare": None,
+        "maxFare": None,
+    },
+    "inbound": {
+        "fares": [
+            _calendar_fare("2023-09-04", 14.99),
+            _calendar_fare("2023-09-05", 29.99),
+        ],
+        "minFare": None,
+        "maxFare": None,
+    },
+}
+
+
 class TestRyanair(unittest.TestCase):
     @patch("ryanair.SessionManager.SessionManager.get_session")
     def test_initialization(self, mock_get_session):
@@ -276,7 +323,7 @@ class TestRyanair(unittest.TestCase):
     def test_retryable_query_success(self, mock_get_session):
         mock_response = Mock()
         mock_response.status_code = 200
-        mock_response.json.return_value = {"fares": []}
+        mock_response.content = _body({"fares": []})
         mock_get_session.return_value.get.return_value = mock_response
         ryanair_instance = Ryanair()
         response = ryanair_instance._retryable_query("mock_url")
@@ -313,7 +360,7 @@ class TestRyanair(unittest.TestCase):
     @patch("ryanair.SessionManager.SessionManager.get_session")
     def test_get_cheapest_flights(self, mock_get_session):
         mock_response = Mock()
-        mock_response.json.return_value = MOCKED_ONE_WAY_RESPONSE
+        mock_response.content = _body(MOCKED_ONE_WAY_RESPONSE)
         mock_get_session.return_value.get.return_value = mock_response
 
         ryanair_instance = Ryanair()
@@ -362,7 +409,7 @@ class TestRyanair(unittest.TestCase):
     @patch("ryanair.SessionManager.SessionManager.get_session")
     def test_get_cheapest_return_flights(self, mock_get_session):
         mock_response = Mock()
-        mock_response.json.return_value = MOCKED_RETURN_RESPONSE
+        mock_response.content = _body(MOCKED_RETURN_RESPONSE)
         mock_get_session.return_value.get.return_value = mock_response
 
         ryanair_instance = Ryanair()
@@ -445,7 +492,7 @@ class TestRyanair(unittest.TestCase):
     def test_retryable_query_retries_on_failure(self, mock_get_session):
         mock_response = Mock()
         mock_response.status_code = 200
-        mock_response.json.return_value = {"fares": []}
+        mock_response.content = _body({"fares": []})
 
         mock_get_session.return_value.get.side_effect = [
             requests.ConnectionError(),
@@ -466,7 +513,7 @@ class TestRyanair(unittest.TestCase):
     def test_retryable_query_retries_on_failure_5_times(self, mock_get_session):
         mock_response = Mock()
         mock_response.status_code = 200
-        mock_response.json.return_value = {"fares": []}
+        mock_response.content = _body({"fares": []})
 
         mock_get_session.return_value.get.side_effect = [
             requests.ConnectionError(),
@@ -511,7 +558,7 @@ class TestRyanair(unittest.TestCase):
         self, mock_logger, mock_get_session
     ):
         mock_response = Mock()
-        mock_response.json.return_value = MOCKED_ONE_WAY_RESPONSE
+        mock_response.content = _body(MOCKED_ONE_WAY_RESPONSE)
         mock_get_session.return_value.get.return_value = mock_response
         request_currency = "FAKECURRENCY"
 
@@ -531,7 +578,7 @@ class TestRyanair(unittest.TestCase):
 
     @patch("ryanair.SessionManager.SessionManager.get_session")
     def test_currency_added_to_relevant_queries_if_provided(self, mock_get_session):
-        mock_get_session.return_value.get.return_value.json.return_value = {"fares": []}
+        mock_get_session.return_value.get.return_value.content = _body({"fares": []})
 
         ryanair_instance = Ryanair("EUR")
         ryanair_instance.get_cheapest_flights("DUB", "2023-08-23", "2023-08-23")
@@ -575,7 +622,7 @@ class TestRyanair(unittest.TestCase):
     def test_currency_not_added_to_relevant_queries_if_not_provided(
         self, mock_get_session
     ):
-        mock_get_session.return_value.get.return_value.json.return_value = {"fares": []}
+        mock_get_session.return_value.get.return_value.content = _body({"fares": []})
 
         ryanair_instance = Ryanair()
         ryanair_instance.get_cheapest_flights("DUB", "2023-08-23", "2023-08-23")
@@ -617,7 +664,7 @@ class TestRyanair(unittest.TestCase):
     def test_optional_param_added_to_relevant_queries_if_provided(
         self, mock_get_session
     ):
-        mock_get_session.return_value.get.return_value.json.return_value = {"fares": []}
+        mock_get_session.return_value.get.return_value.content = _body({"fares": []})
 
         ryanair_instance = Ryanair()
         ryanair_instance.get_cheapest_flights(
@@ -681,7 +728,7 @@ class TestRyanair(unittest.TestCase):
 
     @patch("ryanair.SessionManager.SessionManager.get_session")
     def test_all_date_time_fields_accept_valid_types(self, mock_get_session):
-        mock_get_session.return_value.get.return_value.json.return_value = {"fares": []}
+        mock_get_session.return_value.get.return_value.content = _body({"fares": []})
 
         ryanair_instance = Ryanair()
         ryanair_instance.get_cheapest_flights(
@@ -750,6 +797,287 @@ class TestRyanair(unittest.TestCase):
             any_order=True,
         )
 
+    @patch("ryanair.SessionManager.SessionManager.new_session")
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_get_many_returns_results_in_input_order(
+        self, mock_get_session, mock_new_session
+    ):
+        def get(url, params=None):
+            response = Mock()
+            if url.endswith("oneWayFares"):
+                response.content = _body(MOCKED_ONE_WAY_RESPONSE)
+            else:
+                response.content = _body(MOCKED_RETURN_RESPONSE)
+            return response
+
+        mock_new_session.return_value.get.side_effect = get
+
+        ryanair_instance = Ryanair()
+        flights, trips, more_flights = ryanair_instance.get_many(
+            [
+                Query.one_way("DUB", "2023-09-01", "2023-09-01"),
+                Query.round_trip(
+                    "DUB", "2023-09-01", "2023-09-01", "2023-09-02", "2023-09-03"
+                ),
+                Query.one_way("DUB", "2023-09-02", "2023-09-02"),
+            ],
+            max_workers=3,
+        )
+
+        self.assertEqual([f.destination for f in flights], ["BRS", "EDI"])
+        self.assertEqual([t.outbound.destination for t in trips], ["LBA", "LPL"])
+        self.assertEqual(flights, more_flights)
+        self.assertEqual(ryanair_instance.num_queries, 3)
+        mock_get_session.return_value.get.assert_not_called()
+
+    @patch("ryanair.SessionManager.SessionManager.new_session")
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_get_many_captures_per_query_exceptions(
+        self, mock_get_session, mock_new_session
+    ):
+        def get(url, params=None):
+            if params["departureAirportIataCode"] == "XXX":
+                raise requests.HTTPError()
+            response = Mock()
+            response.content = _body(MOCKED_ONE_WAY_RESPONSE)
+            return response
+
+        mock_new_session.return_value.get.side_effect = get
+
+        ryanair_instance = Ryanair()
+        results = ryanair_instance.get_many(
+            [
+                Query.one_way("XXX", "2023-09-01", "2023-09-01"),
+                Query.one_way("DUB", "2023-09-01", "2023-09-01"),
+            ],
+            max_workers=2,
+        )
+
+        self.assertIsInstance(results[0], requests.HTTPError)
+        self.assertEqual(len(results[1]), 2)
+        # 5 tries for the failing query, 1 for the successful one
+        self.assertEqual(ryanair_instance.num_queries, 6)
+
+    @patch("ryanair.SessionManager.SessionManager.new_session")
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_each_worker_thread_gets_its_own_session(
+        self, mock_get_session, mock_new_session
+    ):
+        sessions = {}
+        barrier = threading.Barrier(4)
+
+        def new_session():
+            session = Mock()
+
+            def get(url, params=None):
+                barrier.wait(timeout=5)
+                sessions.setdefault(threading.get_ident(), set()).add(id(session))
+                return Mock(content=_body({"fares": []}))
+
+            session.get.side_effect = get
+            return session
+
+        mock_new_session.side_effect = new_session
+
+        ryanair_instance = Ryanair()
+        ryanair_instance.get_many(
+            [Query.one_way("DUB", "2023-09-01", "2023-09-01") for _ in range(4)],
+            max_workers=4,
+        )
+
+        self.assertEqual(len(sessions), 4)
+        self.assertEqual(mock_new_session.call_count, 4)
+        self.assertEqual(len(set().union(*sessions.values())), 4)
+        self.assertEqual(ryanair_instance.num_queries, 4)
+
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_get_fare_calendar(self, mock_get_session):
+        mock_get_session.return_value.get.return_value.content = _body(
+            MOCKED_FARE_CALENDAR_RESPONSE
+        )
+
+        ryanair_instance = Ryanair("EUR")
+        calendar = ryanair_instance.get_fare_calendar(
+            "DUB", "BCN", datetime.date(2023, 9, 14)
+        )
+
+        self.assertEqual(
+            calendar,
+            FareCalendar(
+                origin="DUB",
+                destination="BCN",
+                currency="EUR",
+                prices={
+                    datetime.date(2023, 9, 1): 19.99,
+                    datetime.date(2023, 9, 3): 24.99,
+                },
+            ),
+        )
+        mock_get_session.return_value.get.assert_called_once_with(
+            "https://services-api.ryanair.com/farfnd/v4/oneWayFares/DUB/BCN/cheapestPerDay",
+            params={"outboundMonthOfDate": "2023-09-01", "currency": "EUR"},
+        )
+
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_get_return_fare_calendar(self, mock_get_session):
+        mock_get_session.return_value.get.return_value.content = _body(
+            MOCKED_FARE_CALENDAR_RESPONSE
+        )
+
+        ryanair_instance = Ryanair()
+        outbound, inbound = ryanair_instance.get_return_fare_calendar(
+            "DUB", "BCN", "2023-09"
+        )
+
+        self.assertEqual((outbound.origin, outbound.destination), ("DUB", "BCN"))
+        self.assertEqual((inbound.origin, inbound.destination), ("BCN", "DUB"))
+        self.assertEqual(
+            inbound.prices,
+            {datetime.date(2023, 9, 4): 14.99, datetime.date(2023, 9, 5): 29.99},
+        )
+        mock_get_session.return_value.get.assert_called_once_with(
+            "https://services-api.ryanair.com/farfnd/v4/roundTripFares/DUB/BCN/cheapestPerDay",
+            params={
+                "outboundMonthOfDate": "2023-09-01",
+                "inboundMonthOfDate": "2023-09-01",
+            },
+        )
+
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_identical_response_bodies_are_not_parsed_again(self, mock_get_session):
+        mock_get_session.return_value.get.return_value.content = _body(
+            MOCKED_RETURN_RESPONSE
+        )
+
+        ryanair_instance = Ryanair()
+        first = ryanair_instance.get_cheapest_return_flights(
+            "DUB", "2023-09-01", "2023-09-15", "2023-09-16", "2023-09-30"
+        )
+        with patch.object(
+            ryanair_instance, "_parse_cheapest_return_flights_as_trip"
+        ) as mock_parse:
+            second = ryanair_instance.get_cheapest_return_flights(
+                "DUB", "2023-09-01", "2023-09-15", "2023-09-16", "2023-09-30"
+            )
+
+        mock_parse.assert_not_called()
+        self.assertEqual(first, second)
+        self.assertTrue(all(a is b for a, b in zip(first, second)))
+        self.assertEqual(first.digest, second.digest)
+        self.assertTrue(first.changed)
+        self.assertFalse(second.changed)
+
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_changed_responses_are_flagged(self, mock_get_session):
+        changed_response = json.loads(json.dumps(MOCKED_ONE_WAY_RESPONSE))
+        changed_response["fares"][0]["outbound"]["price"]["value"] = 9.99
+        mock_get_session.return_value.get.side_effect = [
+            Mock(content=_body(MOCKED_ONE_WAY_RESPONSE)),
+            Mock(content=_body(MOCKED_ONE_WAY_RESPONSE)),
+            Mock(content=_body(changed_response)),
+        ]
+
+        ryanair_instance = Ryanair()
+        results = [
+            ryanair_instance.get_cheapest_flights("DUB", "2023-09-01", "2023-09-30")
+            for _ in range(3)
+        ]
+
+        self.assertEqual([r.changed for r in results], [True, False, True])
+        self.assertEqual(results[2][0].price, 9.99)
+        self.assertNotEqual(results[1].digest, results[2].digest)
+
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_parsed_fares_memo_is_bounded(self, mock_get_session):
+        mock_get_session.return_value.get.side_effect = [
+            Mock(content=_body({"fares": [], "i": i})) for i in range(5)
+        ]
+
+        ryanair_instance = Ryanair()
+        ryanair_instance.PARSED_FARES_MEMO_SIZE = 3
+        for _ in range(5):
+            ryanair_instance.get_cheapest_flights("DUB", "2023-09-01", "2023-09-30")
+
+        self.assertEqual(len(ryanair_instance._parsed_fares), 3)
+
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_last_digests_are_bounded(self, mock_get_session):
+        mock_get_session.return_value.get.return_value.content = _body({"fares": []})
+
+        ryanair_instance = Ryanair()
+        ryanair_instance.PARSED_FARES_MEMO_SIZE = 3
+        airports = ["DUB", "STN", "BGY", "CGN", "NRN"]
+        for airport in airports:
+            ryanair_instance.get_cheapest_flights(airport, "2023-09-01", "2023-09-30")
+
+        self.assertEqual(len(ryanair_instance._last_digests), 3)
+        # The most recent queries are still recognised as unchanged, the oldest are forgotten
+        self.assertFalse(
+            ryanair_instance.get_cheapest_flights(
+                "NRN", "2023-09-01", "2023-09-30"
+            ).changed
+        )
+        self.assertTrue(
+            ryanair_instance.get_cheapest_flights(
+                "DUB", "2023-09-01", "2023-09-30"
+            ).changed
+        )
+
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_iter_cheapest_flights_streams_the_response(self, mock_get_session):
+        body = _body(MOCKED_ONE_WAY_RESPONSE)
+        mock_response = mock_get_session.return_value.get.return_value
+        mock_response.iter_content.return_value = [
+            body[i : i + 100] for i in range(0, len(body), 100)
+        ]
+
+        ryanair_instance = Ryanair()
+        flights = ryanair_instance.iter_cheapest_flights(
+            "DUB", "2023-09-01", "2023-09-30"
+        )
+
+        self.assertEqual(next(flights).destination, "BRS")
+        self.assertEqual([flight.destination for flight in flights], ["EDI"])
+        mock_get_session.return_value.get.assert_called_once_with(
+            mock.ANY, params=mock.ANY, stream=True
+        )
+        mock_response.close.assert_called_once()
+        self.assertEqual(ryanair_instance.num_queries, 1)
+
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_iter_cheapest_return_flights(self, mock_get_session):
+        mock_get_session.return_value.get.return_value.iter_content.return_value = [
+            _body(MOCKED_RETURN_RESPONSE)
+        ]
+        mock_get_session.return_value.get.return_value.content = _body(
+            MOCKED_RETURN_RESPONSE
+        )
+
+        ryanair_instance = Ryanair()
+        args = ("DUB", "2023-09-01", "2023-09-15", "2023-09-16", "2023-09-30")
+
+        self.assertEqual(
+            list(ryanair_instance.iter_cheapest_return_flights(*args)),
+            ryanair_instance.get_cheapest_return_flights(*args),
+        )
+
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_iter_cheapest_flights_retries_opening_the_stream(self, mock_get_session):
+        mock_response = Mock()
+        mock_response.iter_content.return_value = [_body(MOCKED_ONE_WAY_RESPONSE)]
+        mock_get_session.return_value.get.side_effect = [
+            requests.ConnectionError(),
+            mock_response,
+        ]
+
+        ryanair_instance = Ryanair()
+        flights = list(
+            ryanair_instance.iter_cheapest_flights("DUB", "2023-09-01", "2023-09-30")
+        )
+
+        self.assertEqual(len(flights), 2)
+        self.assertEqual(ryanair_instance.num_queries, 2)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,364 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch, Mock, AsyncMock
+
+import requests
+
+from ryanair import Ryanair, AsyncRyanair
+from ryanair.ryanair import RetryPolicy
+from ryanair.SessionManager import (
+    SessionManager,
+    Transport,
+    RequestsTransport,
+    HTTP2Transport,
+)
+from tests.test_ryanair import _body, MOCKED_ONE_WAY_RESPONSE
+from tests.test_retry import _http_error
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+API_URL = "https://www.ryanair.com/api/farfnd/v4/oneWayFares"
+
+
+def _set_session_cookie(manager):
+    manager.cookies.set("rid", "abc", domain=".ryanair.com", path="/")
+
+
+class TestSessionManager(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.path = os.path.join(self.tmp_dir.name, "session.json")
+
+        shared = patch.dict(SessionManager._shared, clear=True)
+        shared.start()
+        self.addCleanup(shared.stop)
+
+        bootstrap = patch.object(
+            SessionManager,
+            "_update_session_cookie",
+            autospec=True,
+            side_effect=_set_session_cookie,
+        )
+        self.mock_bootstrap = bootstrap.start()
+        self.addCleanup(bootstrap.stop)
+
+        request = patch("requests.Session.request")
+        self.mock_request = request.start()
+        self.addCleanup(request.stop)
+
+    def test_nothing_is_fetched_on_init(self):
+        SessionManager(self.path)
+
+        self.mock_bootstrap.assert_not_called()
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_first_request_bootstraps_once(self):
+        manager = SessionManager(self.path)
+        manager.get_session().get(API_URL)
+        manager.get_session().get(API_URL)
+        manager.new_session().get(API_URL)
+
+        self.mock_bootstrap.assert_called_once()
+        self.assertEqual(self.mock_request.call_count, 3)
+        self.assertEqual(manager.new_session().cookies["rid"], "abc")
+
+    def test_cookies_are_shared_by_managers(self):
+        SessionManager(self.path).get_session().get(API_URL)
+        SessionManager(self.path).get_session().get(API_URL)
+
+        self.mock_bootstrap.assert_called_once()
+
+    def test_cookies_are_persisted(self):
+        SessionManager(self.path).get_session().get(API_URL)
+        # As in a new process
+        SessionManager._shared.clear()
+
+        manager = SessionManager(self.path)
+        self.assertEqual(manager.valid_cookies()["rid"], "abc")
+        manager.get_session().get(API_URL)
+
+        self.mock_bootstrap.assert_called_once()
+
+    def test_expired_cookies_are_replaced(self):
+        manager = SessionManager(self.path)
+        manager.get_session().get(API_URL)
+
+        later = time.time() + SessionManager.SESSION_MAX_AGE + 1
+        with patch("ryanair.SessionManager.time.time", return_value=later):
+            self.assertIsNone(manager.valid_cookies())
+            manager.get_session().get(API_URL)
+
+        self.assertEqual(self.mock_bootstrap.call_count, 2)
+
+    def test_cookie_expiry_bounds_the_session(self):
+        def set_short_lived_cookie(manager):
+            manager.cookies.set("rid", "abc", expires=int(time.time()) + 60)
+
+        self.mock_bootstrap.side_effect = set_short_lived_cookie
+        manager = SessionManager(self.path)
+        manager.ensure_session()
+
+        with patch("ryanair.SessionManager.time.time", return_value=time.time() + 61):
+            self.assertIsNone(manager.valid_cookies())
+
+    def test_refresh_replaces_the_cookies_once(self):
+        manager = SessionManager(self.path)
+        manager.ensure_session()
+
+        later = time.time() + SessionManager.MIN_REFRESH_INTERVAL + 1
+        with patch("ryanair.SessionManager.time.time", return_value=later):
+            manager.refresh()
+            # Refreshed by another thread already
+            manager.refresh()
+
+        self.assertEqual(self.mock_bootstrap.call_count, 2)
+
+    def test_unreadable_cookie_file_is_ignored(self):
+        with open(self.path, "w") as f:
+            f.write("not json")
+
+        manager = SessionManager(self.path)
+        manager.ensure_session()
+
+        self.mock_bootstrap.assert_called_once()
+
+
+class TestFailedBootstrap(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.path = os.path.join(self.tmp_dir.name, "session.json")
+
+        shared = patch.dict(SessionManager._shared, clear=True)
+        shared.start()
+        self.addCleanup(shared.stop)
+
+        request = patch("requests.Session.request")
+        self.mock_request = request.start()
+        self.addCleanup(request.stop)
+
+    def test_refused_visit_is_not_stored(self):
+        self.mock_request.return_value = _http_error(403)
+        manager = SessionManager(self.path)
+
+        with self.assertRaises(requests.HTTPError):
+            manager.get_session().get(API_URL)
+
+        # Only the website was visited, and nothing is reused
+        self.assertEqual(self.mock_request.call_count, 1)
+        self.assertIsNone(manager.valid_cookies())
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_visit_without_cookies_is_not_persisted(self):
+        manager = SessionManager(self.path)
+
+        with self.assertLogs("ryanair", level="WARNING"):
+            manager.get_session().get(API_URL)
+        manager.get_session().get(API_URL)
+
+        # Not visited again straight away, but not for the usual session lifetime either
+        self.assertEqual(self.mock_request.call_count, 3)
+        self.assertFalse(os.path.exists(self.path))
+        later = time.time() + SessionManager.MIN_REFRESH_INTERVAL + 1
+        with patch("ryanair.SessionManager.time.time", return_value=later):
+            self.assertIsNone(manager.valid_cookies())
+
+
+class TestRequestsTransport(unittest.TestCase):
+    def setUp(self):
+        shared = patch.dict(SessionManager._shared, clear=True)
+        shared.start()
+        self.addCleanup(shared.stop)
+
+    @patch.object(SessionManager, "ensure_session")
+    @patch("requests.Session.request")
+    def test_timeouts_apply_to_every_request(self, mock_request, _):
+        transport = RequestsTransport(connect_timeout=2, read_timeout=10)
+        SessionManager(transport=transport).new_session().get(API_URL)
+
+        self.assertEqual(mock_request.call_args.kwargs["timeout"], (2, 10))
+
+    def test_sessions_share_one_pool(self):
+        manager = SessionManager(transport=RequestsTransport(pool_maxsize=64))
+        first, second = manager.new_session(), manager.new_session()
+
+        adapter = first.get_adapter(API_URL)
+        self.assertIs(second.get_adapter(API_URL), adapter)
+        self.assertEqual(adapter._pool_maxsize, 64)
+        self.assertIs(first.cookies, manager.cookies)
+
+    def test_transports_must_make_sessions(self):
+        with self.assertRaises(TypeError):
+            Transport()
+
+    @unittest.skipIf(httpx is None, "httpx is not installed")
+    def test_async_client_defaults_to_requests_transport_settings(self):
+        api = AsyncRyanair()
+
+        self.assertIsInstance(api.transport, RequestsTransport)
+        self.assertEqual(api.transport.httpx_timeout().read, 30.0)
+
+
+@unittest.skipIf(httpx is None, "httpx is not installed")
+class TestHTTP2Transport(unittest.TestCase):
+    def setUp(self):
+        shared = patch.dict(SessionManager._shared, clear=True)
+        shared.start()
+        self.addCleanup(shared.stop)
+
+        self.requests = []
+        self.responses = {}
+        client_cls = httpx.Client
+
+        def client(**kwargs):
+            self.client_kwargs = kwargs
+            return client_cls(transport=httpx.MockTransport(self._handle), **kwargs)
+
+        patcher = patch("ryanair.SessionManager.httpx.Client", side_effect=client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _handle(self, request):
+        self.requests.append(request)
+        if str(request.url) == SessionManager.BASE_SITE_FOR_SESSION_URL:
+            return httpx.Response(
+                200, headers={"Set-Cookie": "rid=abc; Domain=.ryanair.com; Path=/"}
+            )
+        return self.responses[request.url.path].pop(0)
+
+    def test_queries_share_the_session_cookies(self):
+        self.responses["/farfnd/v4/oneWayFares"] = [
+            httpx.Response(200, content=_body(MOCKED_ONE_WAY_RESPONSE))
+        ] * 2
+
+        ryanair_instance = Ryanair(transport=HTTP2Transport(read_timeout=10))
+        flights = ryanair_instance.get_cheapest_flights(
+            "DUB", "2023-09-01", "2023-09-30"
+        )
+        streamed = list(
+            ryanair_instance.iter_cheapest_flights("DUB", "2023-09-01", "2023-09-30")
+        )
+        ryanair_instance.close()
+
+        self.assertEqual([f.destination for f in flights], ["BRS", "EDI"])
+        self.assertEqual([f.destination for f in streamed], ["BRS", "EDI"])
+        self.assertEqual(len(self.requests), 3)
+        self.assertEqual(self.requests[1].headers["Cookie"], "rid=abc")
+        self.assertEqual(self.requests[1].url.params["departureAirportIataCode"], "DUB")
+        self.assertTrue(self.client_kwargs["http2"])
+        self.assertEqual(self.client_kwargs["timeout"].read, 10)
+
+    def test_errors_are_surfaced_like_requests_errors(self):
+        self.responses["/farfnd/v4/oneWayFares"] = [
+            httpx.Response(429, headers={"Retry-After": "0"}),
+            httpx.Response(404),
+        ]
+
+        ryanair_instance = Ryanair(transport=HTTP2Transport())
+        with self.assertRaises(requests.HTTPError) as raised:
+            ryanair_instance.get_cheapest_flights("DUB", "2023-09-01", "2023-09-30")
+
+        self.assertEqual(raised.exception.response.status_code, 404)
+        self.assertEqual(ryanair_instance.retry_counts["throttled"], 1)
+
+
+class TestSessionRefresh(unittest.TestCase):
+    @patch("ryanair.SessionManager.SessionManager.refresh")
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_refused_session_is_refreshed_and_retried(
+        self, mock_get_session, mock_refresh
+    ):
+        mock_get_session.return_value.get.side_effect = [
+            _http_error(403),
+            Mock(content=_body({"fares": []})),
+        ]
+
+        ryanair_instance = Ryanair()
+        flights = ryanair_instance.get_cheapest_flights(
+            "DUB", "2023-09-01", "2023-09-30"
+        )
+
+        self.assertEqual(flights, [])
+        mock_refresh.assert_called_once()
+        self.assertEqual(ryanair_instance.retry_counts["session"], 1)
+
+
+@unittest.skipIf(httpx is None, "httpx is not installed")
+class TestAsyncSession(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        shared = patch.dict(SessionManager._shared, clear=True)
+        shared.start()
+        self.addCleanup(shared.stop)
+
+        patcher = patch("ryanair.ryanair.httpx.AsyncClient")
+        self.mock_client_cls = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_client = self.mock_client_cls.return_value
+        self.mock_client.get = AsyncMock()
+        self.mock_client.aclose = AsyncMock()
+
+    async def test_valid_cookies_skip_the_bootstrap(self):
+        manager = SessionManager()
+        jar = requests.cookies.RequestsCookieJar()
+        jar.set("rid", "abc")
+        manager.store_cookies(jar)
+        self.mock_client.get.return_value = Mock(content=_body({"fares": []}))
+
+        async with AsyncRyanair() as api:
+            await api.get_cheapest_flights("DUB", "2023-09-01", "2023-09-30")
+
+        self.mock_client.get.assert_awaited_once()
+        self.assertIs(self.mock_client_cls.call_args.kwargs["cookies"], manager.cookies)
+
+    async def test_refused_bootstrap_is_not_stored(self):
+        request = httpx.Request("GET", SessionManager.BASE_SITE_FOR_SESSION_URL)
+        refused = Mock()
+        refused.raise_for_status.side_effect = httpx.HTTPStatusError(
+            "", request=request, response=httpx.Response(403, request=request)
+        )
+        self.mock_client.get.return_value = refused
+
+        with patch.object(SessionManager, "COOKIE_PATH", None):
+            async with AsyncRyanair(retry_policy=RetryPolicy(max_tries=2)) as api:
+                with self.assertRaises(httpx.HTTPStatusError):
+                    await api.get_cheapest_flights("DUB", "2023-09-01", "2023-09-30")
+
+        # Only the website was visited, once per attempt, and each client closed
+        self.assertEqual(self.mock_client.get.await_count, 2)
+        self.assertEqual(self.mock_client.aclose.await_count, 2)
+        self.assertIsNone(api.session_manager.valid_cookies())
+
+    async def test_refused_session_is_refreshed_and_retried(self):
+        request = httpx.Request("GET", API_URL)
+        refused = Mock()
+        refused.raise_for_status.side_effect = httpx.HTTPStatusError(
+            "", request=request, response=httpx.Response(401, request=request)
+        )
+        self.mock_client.get.side_effect = [
+            Mock(),  # session cookie bootstrap
+            refused,
+            Mock(),  # session cookie refresh
+            Mock(content=_body({"fares": []})),
+        ]
+
+        async with AsyncRyanair() as api:
+            api.session_manager.MIN_REFRESH_INTERVAL = 0
+            flights = await api.get_cheapest_flights("DUB", "2023-09-01", "2023-09-30")
+
+        self.assertEqual(flights, [])
+        self.assertEqual(self.mock_client.get.await_count, 4)
+        self.assertEqual(
+            self.mock_client.get.await_args_list[2].args,
+            (SessionManager.BASE_SITE_FOR_SESSION_URL,),
+        )
+        self.assertEqual(api.retry_counts["session"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import json
+import unittest
+
+from ryanair.streaming import iter_array_items
+from tests.test_ryanair import MOCKED_ONE_WAY_RESPONSE, MOCKED_RETURN_RESPONSE
+
+
+def _chunked(payload, size):
+    body = json.dumps(payload, ensure_ascii=False).encode()
+    return [body[i : i + size] for i in range(0, len(body), size)]
+
+
+class TestIterArrayItems(unittest.TestCase):
+    def test_yields_fares_for_any_chunk_size(self):
+        for payload in (MOCKED_ONE_WAY_RESPONSE, MOCKED_RETURN_RESPONSE):
+            for size in (1, 2, 7, 64, 1 << 20):
+                with self.subTest(size=size):
+                    self.assertEqual(
+                        list(iter_array_items(_chunked(payload, size))),
+                        payload["fares"],
+                    )
+
+    def test_multibyte_characters_split_across_chunks(self):
+        payload = {"fares": [{"name": "Zürich – Ålesund"}, {"name": "Kraków"}]}
+        self.assertEqual(list(iter_array_items(_chunked(payload, 1))), payload["fares"])
+
+    def test_numbers_split_across_chunks(self):
+        self.assertEqual(
+            list(iter_array_items([b'{"fares": [12', b"34, 5]}"])), [1234, 5]
+        )
+
+    def test_skips_other_members_and_handles_missing_arrays(self):
+        self.assertEqual(
+            list(
+                iter_array_items(
+                    [b'{"size": 2, "next": {"fares": [0]}, "fares": [1, 2]}']
+                )
+            ),
+            [1, 2],
+        )
+        self.assertEqual(list(iter_array_items([b'{"fares": null, "size": 0}'])), [])
+        self.assertEqual(list(iter_array_items([b'{"fares": []}'])), [])
+        self.assertEqual(list(iter_array_items([b"{}"])), [])
+
+    def test_items_are_yielded_before_the_body_is_complete(self):
+        received = []
+
+        def chunks():
+            yield b'{"fares": [{"a": 1}, '
+            received.append("second chunk")
+            yield b'{"a": 2}]}'
+
+        items = iter_array_items(chunks())
+        self.assertEqual(next(items), {"a": 1})
+        self.assertEqual(received, [])
+        self.assertEqual(list(items), [{"a": 2}])
+
+    def test_truncated_body_raises(self):
+        with self.assertRaises(ValueError):
+            list(iter_array_items([b'{"fares": [{"a": 1}, {"a"']))
+
+
+if __name__ == "__main__":
+    unittest.main()
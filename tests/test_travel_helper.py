@@ -0,0 +1,416 @@
+import asyncio
+import dataclasses
+import datetime
+import functools
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from unittest.mock import Mock, patch
+
+import requests
+
+import travel_helper
+from ryanair import AsyncRyanair, Ryanair
+from ryanair.SessionManager import SessionManager
+from ryanair.fake_server import FakeFareServer
+from ryanair.query_planner import LogicalQuery
+from ryanair.types import Flight, Trip
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+THURSDAY = datetime.datetime(2024, 1, 4, 18, 0)
+
+
+def _flight(origin, destination, departure, price):
+    return Flight(
+        departureTime=departure,
+        flightNumber="FR 1",
+        price=price,
+        currency="EUR",
+        origin=origin,
+        originFull=f"{origin}, Somewhere",
+        destination=destination,
+        destinationFull=f"{destination}, Somewhere",
+    )
+
+
+def _trip(destination, outbound_price, inbound_price=10.0, origin="CGN"):
+    outbound = _flight(origin, destination, THURSDAY, outbound_price)
+    inbound = _flight(
+        destination, origin, THURSDAY + datetime.timedelta(days=3), inbound_price
+    )
+    return Trip(
+        totalPrice=outbound_price + inbound_price, outbound=outbound, inbound=inbound
+    )
+
+
+def _candidate(trip):
+    trip = trip.with_search_origin(trip.outbound.origin, "Köln")
+    return trip.outbound, trip.inbound, trip.outbound.price
+
+
+class FakeLiveApi:
+    """Answers verification queries from ``live``: destination -> list of trips, or an exception to raise."""
+
+    def __init__(self, live):
+        self.live = live
+        self.queried = []
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+    def get_cheapest_return_flights(self, *args, destination_airport=None, **kwargs):
+        self.queried.append(destination_airport)
+        result = self.live.get(destination_airport, [])
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+class FakeAsyncApi:
+    """
+    Answers round-trip queries by origin from ``trips``: origin -> (delay, list of trips or an exception to raise).
+    An origin without an entry never answers.
+    """
+
+    concurrency = None
+
+    def __init__(self, trips):
+        self.trips = trips
+        self.started = []
+        self.cancelled = []
+        self.closed = False
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.closed = True
+
+    async def get_cheapest_return_flights(self, airport, *args, **kwargs):
+        self.started.append(airport)
+        try:
+            if airport not in self.trips:
+                await asyncio.Event().wait()
+            delay, result = self.trips[airport]
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(airport)
+            raise
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+# One query per origin: every day has an outbound window, and only today is searched
+EVERY_DAY = {weekday: ("00:00", "23:59") for weekday in range(7)}
+
+
+class TestCollectOutboundFlights(unittest.TestCase):
+    @unittest.skipUnless(travel_helper._FRAME_AVAILABLE, "numpy is not installed")
+    def test_top_n_with_ties_matches_the_list_path(self):
+        # Every query answers with the same 20 equally priced trips on three different dates
+        trips = [
+            Trip(
+                totalPrice=30.0,
+                outbound=_flight(
+                    "CGN", f"D{i:02}", THURSDAY + datetime.timedelta(days=i % 3), 20.0
+                ),
+                inbound=_flight(
+                    f"D{i:02}", "CGN", THURSDAY + datetime.timedelta(days=5), 10.0
+                ),
+            )
+            for i in range(20)
+        ]
+        results = {}
+        for frame_available in (True, False):
+            # Only the first query finds them
+            api = Mock()
+            api.return_value = api
+            api.get_cheapest_return_flights.side_effect = lambda *a, **kw: (
+                [] if api.get_cheapest_return_flights.call_count > 1 else trips
+            )
+            with patch.object(travel_helper, "Ryanair", api), patch.object(
+                travel_helper, "_FRAME_AVAILABLE", frame_available
+            ):
+                results[frame_available] = travel_helper.collect_outbound_flights(
+                    days_ahead=14, limit=3
+                )
+
+        self.assertEqual(results[True], results[False])
+        self.assertEqual(
+            [ob.destination for ob, _, _ in results[True]], ["D00", "D03", "D06"]
+        )
+
+
+class TestIterRoundTrips(unittest.IsolatedAsyncioTestCase):
+    def round_trips(self, api, origins, **kwargs):
+        patcher = patch.object(travel_helper, "AsyncRyanair", api)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return travel_helper.iter_round_trips(
+            origins=[(code, code.title()) for code in origins],
+            schedule=EVERY_DAY,
+            days_ahead=1,
+            **kwargs,
+        )
+
+    async def test_trips_are_yielded_as_queries_complete(self):
+        api = FakeAsyncApi(
+            {
+                "AAA": (0.06, [_trip("D00", 10.0, origin="AAA")]),
+                "BBB": (0.0, [_trip("D01", 20.0, origin="BBB")]),
+                "CCC": (0.03, [_trip("D02", 30.0, origin="CCC")]),
+            }
+        )
+
+        trips = [
+            trip
+            async for trip in self.round_trips(
+                api, ["AAA", "BBB", "CCC"], concurrency=3
+            )
+        ]
+
+        self.assertEqual([ob.origin for ob, _, _ in trips], ["BBB", "CCC", "AAA"])
+        self.assertEqual(
+            [ob.searchOriginName for ob, _, _ in trips], ["Bbb", "Ccc", "Aaa"]
+        )
+        self.assertEqual([price for _, _, price in trips], [20.0, 30.0, 10.0])
+        self.assertTrue(api.closed)
+
+    async def test_no_queries_start_while_the_buffer_is_full(self):
+        api = FakeAsyncApi(
+            {
+                code: (
+                    0.0,
+                    [_trip(f"D{i:02}", 10.0 + i, origin=code) for i in range(3)],
+                )
+                for code in ("AAA", "BBB", "CCC")
+            }
+        )
+        round_trips = self.round_trips(
+            api, ["AAA", "BBB", "CCC"], concurrency=1, max_buffered=1
+        )
+
+        await round_trips.__anext__()
+        await asyncio.sleep(0.05)
+        self.assertEqual(api.started, ["AAA"])
+
+        rest = [trip async for trip in round_trips]
+        self.assertEqual(len(rest), 8)
+        self.assertEqual(api.started, ["AAA", "BBB", "CCC"])
+
+    async def test_query_errors_are_raised_to_the_consumer(self):
+        api = FakeAsyncApi(
+            {
+                "AAA": (0.0, [_trip("D00", 10.0, origin="AAA")]),
+                "BBB": (0.01, requests.HTTPError("503 Server Error")),
+            }
+        )
+
+        trips = []
+        with self.assertRaises(requests.HTTPError):
+            async for trip in self.round_trips(
+                api, ["AAA", "BBB", "CCC"], concurrency=3
+            ):
+                trips.append(trip)
+
+        self.assertEqual(len(trips), 1)
+        # The query that never answers is cancelled rather than left running
+        self.assertEqual(api.cancelled, ["CCC"])
+        self.assertTrue(api.closed)
+
+    async def test_stopping_early_cancels_the_workers(self):
+        api = FakeAsyncApi({"AAA": (0.0, [_trip("D00", 10.0, origin="AAA")])})
+        round_trips = self.round_trips(api, ["AAA", "BBB", "CCC"], concurrency=2)
+
+        ob, _, _ = await round_trips.__anext__()
+        await round_trips.aclose()
+
+        self.assertEqual(ob.origin, "AAA")
+        self.assertEqual(sorted(api.started), ["AAA", "BBB", "CCC"])
+        self.assertEqual(sorted(api.cancelled), ["BBB", "CCC"])
+        self.assertTrue(api.closed)
+
+
+class TestPriceCeiling(unittest.TestCase):
+    def test_ceiling_tightens_as_cheaper_trips_arrive(self):
+        ceiling = travel_helper._PriceCeiling(2)
+        query = LogicalQuery(
+            "CGN",
+            "2024-01-04",
+            "2024-01-04",
+            return_date_from="2024-01-07",
+            return_date_to="2024-01-08",
+        )
+
+        ceiling.add([_trip("D00", 50.0)])
+        self.assertIsNone(ceiling.value)
+        self.assertIs(ceiling.apply(query), query)
+
+        ceiling.add([_trip("D01", 80.5), _trip("D02", 120.0)])
+        self.assertEqual(ceiling.value, 91)
+        self.assertEqual(ceiling.apply(query).max_price, 91)
+
+        ceiling.add([_trip("D03", 30.0), _trip("D04", 200.0)])
+        self.assertEqual(ceiling.value, 60)
+        self.assertEqual(ceiling.apply(query).max_price, 60)
+        # Queries already capped lower are left alone
+        capped = ceiling.apply(dataclasses.replace(query, max_price=40))
+        self.assertEqual(capped.max_price, 40)
+        self.assertEqual(ceiling.queries_capped, 2)
+
+
+class TestPricePushdown(unittest.TestCase):
+    def setUp(self):
+        shared = patch.dict(SessionManager._shared, clear=True)
+        shared.start()
+        self.addCleanup(shared.stop)
+
+    def collect(self, server, **kwargs):
+        stderr = io.StringIO()
+        with patch.object(
+            travel_helper,
+            "Ryanair",
+            functools.partial(Ryanair, transport=server.transport()),
+        ), patch.object(
+            travel_helper,
+            "AsyncRyanair",
+            functools.partial(AsyncRyanair, transport=server.transport()),
+        ), redirect_stderr(
+            stderr
+        ):
+            trips = travel_helper.collect_outbound_flights(days_ahead=14, **kwargs)
+        return trips, stderr.getvalue()
+
+    def test_pushdown_returns_the_same_trips(self):
+        concurrencies = (0, 2) if httpx is not None else (0,)
+        with FakeFareServer(destinations=30) as server:
+            for concurrency in concurrencies:
+                with self.subTest(concurrency=concurrency):
+                    expected, _ = self.collect(server, limit=5, concurrency=concurrency)
+                    trips, stderr = self.collect(
+                        server, limit=5, concurrency=concurrency, price_pushdown=True
+                    )
+
+                    self.assertEqual(len(expected), 5)
+                    self.assertEqual(trips, expected)
+                    self.assertRegex(
+                        stderr, r"Price pushdown: [1-9]\d* of 8 queries capped"
+                    )
+
+
+class TestVerifyLive(unittest.TestCase):
+    def verify(self, candidates, live, limit, **kwargs):
+        api = FakeLiveApi(live)
+        stderr = io.StringIO()
+        with patch.object(travel_helper, "Ryanair", api), redirect_stderr(stderr):
+            verified = travel_helper.verify_live(candidates, limit, **kwargs)
+        return verified, api.queried, stderr.getvalue()
+
+    def test_failed_re_queries_keep_the_cached_price(self):
+        trips = [_trip(f"D{i:02}", 10.0 + i) for i in range(4)]
+        live = {trip.outbound.destination: [trip] for trip in trips}
+        live["D01"] = requests.ConnectionError("connection reset")
+
+        verified, _, stderr = self.verify(
+            [_candidate(t) for t in trips], live, 3, margin=1
+        )
+
+        self.assertEqual(
+            [ob.destination for ob, _, _ in verified], ["D00", "D01", "D02"]
+        )
+        self.assertIn("1 failed", stderr)
+
+    def test_repriced_and_sold_out_candidates(self):
+        trips = [_trip(f"D{i:02}", 10.0 + i) for i in range(4)]
+        live = {trip.outbound.destination: [trip] for trip in trips}
+        live["D00"] = []
+        live["D01"] = [_trip("D01", 30.0)]
+
+        verified, queried, stderr = self.verify(
+            [_candidate(t) for t in trips], live, 2, margin=2
+        )
+
+        self.assertEqual(queried, ["D00", "D01", "D02", "D03"])
+        self.assertEqual(
+            [(ob.destination, price) for ob, _, price in verified],
+            [("D02", 12.0), ("D03", 13.0)],
+        )
+        self.assertEqual(verified[0][0].searchOriginName, "Köln")
+        self.assertIn("1 repriced, 1 gone", stderr)
+
+    def test_checks_extend_past_the_margin(self):
+        trips = [_trip(f"D{i:02}", 10.0 + i) for i in range(8)]
+        live = {trip.outbound.destination: [trip] for trip in trips}
+        live["D00"] = live["D01"] = []
+
+        verified, queried, _ = self.verify(
+            [_candidate(t) for t in trips], live, 2, margin=1
+        )
+
+        # D00-D02, then D03 for the second place; D04 was dearer than D03 in the sweep too
+        self.assertEqual(queried, ["D00", "D01", "D02", "D03"])
+        self.assertEqual([ob.destination for ob, _, _ in verified], ["D02", "D03"])
+
+    def test_checks_stop_at_max_checks(self):
+        trips = [_trip(f"D{i:02}", 10.0 + i) for i in range(10)]
+
+        verified, queried, stderr = self.verify(
+            [_candidate(t) for t in trips], {}, 2, margin=1, max_checks=5
+        )
+
+        self.assertEqual(queried, ["D00", "D01", "D02", "D03", "D04"])
+        self.assertEqual(verified, [])
+        self.assertIn("5 of 10 candidates re-queried", stderr)
+
+
+class TestRunWithVerifyLive(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.cache_path = os.path.join(tmp_dir.name, "responses.sqlite3")
+
+    def test_parse_processes_are_used_for_the_sweep(self):
+        with patch.object(
+            travel_helper, "collect_outbound_flights", return_value=[]
+        ) as collect, patch.object(
+            travel_helper, "verify_live", return_value=[]
+        ), redirect_stdout(
+            io.StringIO()
+        ), redirect_stderr(
+            io.StringIO()
+        ):
+            travel_helper.run(
+                output_json=True,
+                fetch_hotels=False,
+                cache_path=self.cache_path,
+                verify_margin=2,
+                parse_processes=3,
+            )
+
+        self.assertEqual(collect.call_args.kwargs["parse_processes"], 3)
+
+    def test_price_pushdown_is_rejected(self):
+        with patch.object(travel_helper, "collect_outbound_flights") as collect:
+            with self.assertRaises(ValueError):
+                travel_helper.run(
+                    fetch_hotels=False,
+                    cache_path=self.cache_path,
+                    verify_margin=2,
+                    price_pushdown=True,
+                )
+
+        collect.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
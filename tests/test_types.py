@@ -0,0 +1,138 @@
+import dataclasses
+import datetime
+import unittest
+from unittest.mock import patch
+
+from ryanair.ryanair import _RyanairBase
+from ryanair import Ryanair
+from ryanair.types import Flight, Trip, LazyFlight, LazyTrip
+from tests.test_ryanair import MOCKED_ONE_WAY_RESPONSE, MOCKED_RETURN_RESPONSE, _body
+
+
+def _flight(**kwargs):
+    fields = dict(
+        departureTime=datetime.datetime(2023, 8, 23, 8, 20),
+        flightNumber="FR 504",
+        price=17.68,
+        currency="EUR",
+        origin="DUB",
+        originFull="Dublin, Ireland",
+        destination="BRS",
+        destinationFull="Bristol, United Kingdom",
+    )
+    fields.update(kwargs)
+    return Flight(**fields)
+
+
+class TestFareTypes(unittest.TestCase):
+    def test_fares_are_immutable_and_have_no_instance_dict(self):
+        flight = _flight()
+        trip = Trip(totalPrice=35.36, outbound=flight, inbound=_flight())
+
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            flight.price = 1.0
+        for fare in (flight, trip):
+            self.assertFalse(hasattr(fare, "__dict__"))
+            with self.assertRaises((AttributeError, TypeError)):
+                fare._origin_code = "DUB"
+
+    def test_with_search_origin_labels_a_copy(self):
+        flight = _flight()
+        trip = Trip(totalPrice=35.36, outbound=flight, inbound=_flight(origin="BRS"))
+
+        labelled = trip.with_search_origin("DUB", "Dublin")
+
+        self.assertIsNone(trip.searchOrigin)
+        self.assertIsNone(flight.searchOrigin)
+        self.assertEqual(
+            (labelled.searchOrigin, labelled.searchOriginName), ("DUB", "Dublin")
+        )
+        for leg in (labelled.outbound, labelled.inbound):
+            self.assertEqual(
+                (leg.searchOrigin, leg.searchOriginName), ("DUB", "Dublin")
+            )
+        self.assertEqual(labelled.outbound, flight.with_search_origin("DUB", "Dublin"))
+        self.assertNotEqual(labelled.outbound, flight)
+
+    def test_parsed_airport_strings_are_shared(self):
+        parser = _RyanairBase()
+        first, second = parser._parse_cheapest_flights(MOCKED_ONE_WAY_RESPONSE["fares"])
+        trip = parser._parse_cheapest_return_flights(MOCKED_RETURN_RESPONSE["fares"])[0]
+
+        self.assertIs(first.originFull, second.originFull)
+        self.assertIs(first.origin, trip.outbound.origin)
+        self.assertIs(first.currency, trip.inbound.currency)
+
+
+class TestLazyFares(unittest.TestCase):
+    def setUp(self):
+        self.eager = _RyanairBase()
+        self.lazy = _RyanairBase(lazy_fares=True)
+
+    def test_lazy_views_match_parsed_fares(self):
+        flights = self.lazy._parse_cheapest_flights(MOCKED_ONE_WAY_RESPONSE["fares"])
+        trips = self.lazy._parse_cheapest_return_flights(
+            MOCKED_RETURN_RESPONSE["fares"]
+        )
+
+        self.assertIsInstance(flights[0], LazyFlight)
+        self.assertIsInstance(trips[0], LazyTrip)
+        self.assertEqual(
+            flights,
+            self.eager._parse_cheapest_flights(MOCKED_ONE_WAY_RESPONSE["fares"]),
+        )
+        self.assertEqual(
+            trips,
+            self.eager._parse_cheapest_return_flights(MOCKED_RETURN_RESPONSE["fares"]),
+        )
+        for field in dataclasses.fields(Trip):
+            self.assertEqual(
+                getattr(trips[0], field.name),
+                getattr(trips[0].to_trip(), field.name),
+            )
+
+    def test_fields_are_parsed_on_first_access_only(self):
+        flight = self.lazy._parse_cheapest_flights(MOCKED_ONE_WAY_RESPONSE["fares"])[0]
+
+        with patch("ryanair.types.datetime") as mock_datetime:
+            self.assertEqual((flight.price, flight.destination), (17.68, "BRS"))
+            mock_datetime.fromisoformat.assert_not_called()
+            mock_datetime.fromisoformat.return_value = datetime.datetime(
+                2023, 8, 23, 8, 20
+            )
+            self.assertIs(flight.departureTime, flight.departureTime)
+            mock_datetime.fromisoformat.assert_called_once()
+
+    def test_lazy_views_are_read_only(self):
+        trip = self.lazy._parse_cheapest_return_flights(
+            MOCKED_RETURN_RESPONSE["fares"]
+        )[0]
+
+        with self.assertRaises(AttributeError):
+            trip.outbound.price = 1.0
+        with self.assertRaises(AttributeError):
+            trip.outbound._origin_code = "DUB"
+
+        labelled = trip.with_search_origin("DUB", "Dublin")
+        self.assertIsNone(trip.inbound.searchOrigin)
+        self.assertEqual(labelled.inbound.searchOrigin, "DUB")
+        self.assertEqual(
+            labelled.to_trip(), trip.to_trip().with_search_origin("DUB", "Dublin")
+        )
+
+    @patch("ryanair.SessionManager.SessionManager.get_session")
+    def test_client_returns_lazy_views_when_asked(self, mock_get_session):
+        mock_get_session.return_value.get.return_value.content = _body(
+            MOCKED_ONE_WAY_RESPONSE
+        )
+
+        flights = Ryanair(lazy_fares=True).get_cheapest_flights(
+            "DUB", "2023-09-01", "2023-09-30"
+        )
+
+        self.assertTrue(all(isinstance(flight, LazyFlight) for flight in flights))
+        self.assertEqual(flights[1].flightNumber, "FR 812")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -17,13 +17,17 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import heapq
 import html
 import json
+import math
 import os
 import re
 import smtplib
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from datetime import datetime, timedelta
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
@@ -35,7 +39,22 @@ if __name__ == "__main__" and __package__ is None:
     if str(_root) not in sys.path:
         sys.path.insert(0, str(_root))
 
-from ryanair import Ryanair
+from ryanair import Ryanair, AsyncRyanair
+from ryanair.cache import DEFAULT_CACHE_PATH, SQLiteResponseCache
+from ryanair.concurrency import AIMDController
+from ryanair.fx import FxError, FxRates, load_rates
+from ryanair.metrics import Metrics
+from ryanair.query_planner import LogicalQuery, plan_queries
+from ryanair.types import Query
+
+# Optional: columnar top-N selection for large sweeps (needs numpy)
+try:
+    import numpy  # noqa: F401
+    from ryanair.frame import FareFrame
+    from ryanair.parallel import FareParserPool
+    _FRAME_AVAILABLE = True
+except ImportError:
+    _FRAME_AVAILABLE = False
 
 # Optional: airport coords for estimated flight duration
 try:
@@ -103,6 +122,11 @@ THURSDAY = 3
 FRIDAY = 4
 OUTBOUND_THURSDAY_AFTER_HOUR = 17
 OUTBOUND_FRIDAY_AFTER_HOUR = 23  # 11 pm
+# Outbound departure windows searched per weekday, as (time from, time to)
+OUTBOUND_SCHEDULE = {
+    THURSDAY: ("17:00", "23:59"),
+    FRIDAY: ("11:00", "23:59"),
+}
 
 # Display: separator between the two legs on one line
 LEG_SEP = "  |  "    # between outbound and inbound on one line
@@ -421,12 +445,28 @@ def _add_weather_attractions_html(
         lines.append("    </div>")
 
 
+def _total_prices(ob, ib, fx: FxRates | None, currencies: list[str]) -> dict[str, float]:
+    """Total price of a trip in its own currency and in each of `currencies`, converted leg by leg."""
+    prices = {ob.currency: round(ob.price + ib.price, 2)}
+    for currency in currencies if fx is not None else ():
+        prices[currency] = round(fx.convert(ob.price, ob.currency, currency) + fx.convert(ib.price, ib.currency, currency), 2)
+    return prices
+
+
+def _other_currencies_str(ob, ib, fx: FxRates | None, currencies: list[str]) -> str:
+    """' / 86.00 GBP / 436.00 PLN' for the other currencies asked for, or empty string."""
+    prices = _total_prices(ob, ib, fx, currencies)
+    return "".join(f" / {prices[c]:.2f} {c}" for c in currencies if c in prices and c != ob.currency)
+
+
 def _build_html(
     cheapest_flights: list[tuple[object, object, float]],
     hotel_results: list[dict],
     adults: int = 2,
     travel_data: dict | None = None,
     timings: dict | None = None,
+    fx: FxRates | None = None,
+    currencies: list[str] = (),
 ) -> str:
     """Build results as HTML string (same content as --html file)."""
     title = "Fly cheap, stay cheap — your daily Ryanair + Trivago deals"
@@ -482,7 +522,8 @@ def _build_html(
             nights = (ret_date - out_date).days
             days = nights + 1
             lines.append("  <div class=\"trip\">")
-            lines.append(f"    <div class=\"trip-header\">{html.escape(dest_city)} ({total:.2f}€) — {days} days, {nights} nights</div>")
+            other_totals = _other_currencies_str(outbound, ret, fx, currencies)
+            lines.append(f"    <div class=\"trip-header\">{html.escape(dest_city)} ({total:.2f}€{other_totals}) — {days} days, {nights} nights</div>")
             lines.append("    <div class=\"flight\">")
             lines.append("      <div class=\"flight-title\">Flight</div>")
             lines.append(f"      <a class=\"trip-details trip-link\" href=\"{html.escape(ryanair_url)}\" target=\"_blank\" rel=\"noopener\">{html.escape(out_leg)}  |  {html.escape(ret_leg)}</a>")
@@ -521,7 +562,8 @@ def _build_html(
             nights = (ret_date - out_date).days
             days = nights + 1
             lines.append("  <div class=\"trip\">")
-            lines.append(f"    <div class=\"trip-header\">{html.escape(dest_city)} ({total:.2f}€) — {days} days, {nights} nights</div>")
+            other_totals = _other_currencies_str(ob, ib, fx, currencies)
+            lines.append(f"    <div class=\"trip-header\">{html.escape(dest_city)} ({total:.2f}€{other_totals}) — {days} days, {nights} nights</div>")
             lines.append("    <div class=\"flight\">")
             lines.append("      <div class=\"flight-title\">Flight</div>")
             lines.append(f"      <a class=\"trip-details trip-link\" href=\"{html.escape(ryanair_url)}\" target=\"_blank\" rel=\"noopener\">{html.escape(out_leg)}  |  {html.escape(ret_leg)}</a>")
@@ -538,6 +580,8 @@ def _build_html(
         lines.append("  <p class=\"timings-note\">")
         lines.append(f"    Total execution time: {total_s:.1f}s. Flights: {flights_s:.1f}s, Weather &amp; attractions: {weather_s:.1f}s, Hotels: {hotels_s:.1f}s.")
         lines.append("  </p>")
+    if fx is not None and currencies:
+        lines.append(f"  <p class=\"timings-note\">Exchange rates ({html.escape(fx.source or fx.base)}) as of {fx.as_of:%Y-%m-%d %H:%M} UTC.</p>")
     lines.append("</body>")
     lines.append("</html>")
     return "\n".join(lines)
@@ -549,9 +593,11 @@ def _print_html(
     adults: int = 2,
     travel_data: dict | None = None,
     timings: dict | None = None,
+    fx: FxRates | None = None,
+    currencies: list[str] = (),
 ) -> None:
     """Write results to travel_helper_YYYY-MM-DD.html and print path."""
-    html_str = _build_html(cheapest_flights, hotel_results, adults, travel_data, timings)
+    html_str = _build_html(cheapest_flights, hotel_results, adults, travel_data, timings, fx, currencies)
     now = datetime.now()
     filename = f"travel_helper_{now.strftime('%Y-%m-%d')}.html"
     path = Path(filename).resolve()
@@ -589,43 +635,393 @@ def _send_email_html(html_body: str, to_email: str, subject: str | None = None)
         print(f"Failed to send email: {e}", file=sys.stderr)
 
 
-def collect_outbound_flights(days_ahead: int | None = None) -> list[tuple[object, object, float]]:
-    """Collect return trips from Weeze/Köln. Only the departure must match: Thu after 5pm or Fri after 11pm.
-    Return is 3–4 nights later (any time of day). Uses API time windows so we get trips in those slots.
-    Returns list of (outbound, return_flight, outbound_price).
+def _outbound_trip_queries(
+    n_days: int,
+    origins: list[tuple[str, str]] | None = None,
+    schedule: dict[int, tuple[str, str]] | None = None,
+) -> list[tuple[str, str, LogicalQuery]]:
+    """One round-trip query per origin airport and scheduled weekday in the next n_days, as (code, name, query).
+    Origins default to ORIGIN_AIRPORTS and the schedule (weekday -> outbound time window) to OUTBOUND_SCHEDULE.
     """
-    api = Ryanair(currency="EUR")
-    outbound = []
-    n_days = days_ahead if days_ahead is not None else DAYS_AHEAD
-    for airport_code, airport_name in ORIGIN_AIRPORTS:
+    queries = []
+    for airport_code, airport_name in origins if origins is not None else ORIGIN_AIRPORTS:
         for day_offset in range(0, n_days):
             search_date = datetime.today().date() + timedelta(days=day_offset)
-            wd = search_date.weekday()
-            if wd == THURSDAY:
-                outbound_time_from, outbound_time_to = "17:00", "23:59"
-            elif wd == FRIDAY:
-                outbound_time_from, outbound_time_to = "11:00", "23:59"
-            else:
+            window = (schedule if schedule is not None else OUTBOUND_SCHEDULE).get(search_date.weekday())
+            if window is None:
                 continue
+            outbound_time_from, outbound_time_to = window
             return_date_from = search_date + timedelta(days=RETURN_DAYS_MIN)
             return_date_to = search_date + timedelta(days=RETURN_DAYS_MAX)
-            trips = api.get_cheapest_return_flights(
+            query = LogicalQuery(
                 airport_code,
                 search_date, search_date,
-                return_date_from, return_date_to,
-                outbound_departure_time_from=outbound_time_from,
-                outbound_departure_time_to=outbound_time_to,
+                time_from=outbound_time_from,
+                time_to=outbound_time_to,
+                return_date_from=return_date_from,
+                return_date_to=return_date_to,
+            )
+            queries.append((airport_code, airport_name, query))
+    return queries
+
+
+def _async_api(
+    concurrency: int, cache: SQLiteResponseCache | None, adaptive: bool, metrics: Metrics | None = None
+) -> AsyncRyanair:
+    """AsyncRyanair with `concurrency` in flight, or at most that many under an AIMD controller when adaptive."""
+    controller = AIMDController(initial_limit=min(4, concurrency), max_limit=concurrency) if adaptive else None
+    return AsyncRyanair(
+        currency="EUR", max_concurrency=concurrency, cache=cache, concurrency=controller, metrics=metrics
+    )
+
+
+def _report_concurrency(api) -> None:
+    if api.concurrency is not None:
+        print(f"Adaptive concurrency: finished at {api.concurrency_limit} in flight "
+              f"({api.concurrency.increases} increases, {api.concurrency.decreases} decreases)", file=sys.stderr)
+
+
+async def _fetch_trips_concurrently(
+    queries: list[Query],
+    concurrency: int,
+    cache: SQLiteResponseCache | None = None,
+    adaptive: bool = False,
+    metrics: Metrics | None = None,
+    return_exceptions: bool = False,
+) -> list[list]:
+    """Run all round-trip queries on one AsyncRyanair client with at most `concurrency` in flight.
+    With return_exceptions, a failed query has its exception in its slot instead of aborting the batch."""
+    async with _async_api(concurrency, cache, adaptive, metrics) as api:
+        results = await api.gather_many(queries, return_exceptions=return_exceptions)
+        _report_concurrency(api)
+        return results
+
+
+async def _execute_plan_concurrently(
+    plan,
+    concurrency: int,
+    cache: SQLiteResponseCache | None = None,
+    adaptive: bool = False,
+    metrics: Metrics | None = None,
+) -> list:
+    """Run a coalesced query plan on one AsyncRyanair client with at most `concurrency` in flight."""
+    async with _async_api(concurrency, cache, adaptive, metrics) as api:
+        results = await plan.execute_async(api)
+        _report_concurrency(api)
+        return results
+
+
+_QUERIES_DONE = object()
+
+
+async def iter_round_trips(
+    origins: list[tuple[str, str]] | None = None,
+    schedule: dict[int, tuple[str, str]] | None = None,
+    days_ahead: int | None = None,
+    concurrency: int = 4,
+    cache: SQLiteResponseCache | None = None,
+    adaptive: bool = False,
+    metrics: Metrics | None = None,
+    max_buffered: int = 100,
+):
+    """Async generator of (outbound, return_flight, outbound_price) for every trip found, in the order the queries
+    complete rather than all at once at the end (see collect_outbound_flights for the options and defaults).
+    Queries run on one AsyncRyanair, `concurrency` at a time. At most `max_buffered` trips wait for the consumer:
+    when it falls behind, no further queries are started until it catches up.
+    """
+    n_days = days_ahead if days_ahead is not None else DAYS_AHEAD
+    queries = _outbound_trip_queries(n_days, origins, schedule)
+    concurrency = max(1, concurrency)
+    # Shared by the workers, each taking the next query when it is done with its last one
+    pending = iter(queries)
+    buffered = asyncio.Queue(maxsize=max(1, max_buffered))
+
+    async def worker(api):
+        try:
+            for airport_code, airport_name, query in pending:
+                for trip in await query.to_query().run(api):
+                    trip = trip.with_search_origin(airport_code, airport_name)
+                    await buffered.put((trip.outbound, trip.inbound, trip.outbound.price))
+        except Exception as e:
+            await buffered.put(e)
+            return
+        await buffered.put(_QUERIES_DONE)
+
+    async with _async_api(concurrency, cache, adaptive, metrics) as api:
+        workers = [asyncio.ensure_future(worker(api)) for _ in range(min(concurrency, len(queries)))]
+        try:
+            running = len(workers)
+            while running:
+                item = await buffered.get()
+                if item is _QUERIES_DONE:
+                    running -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            # Also reached when the consumer stops early, leaving queries unfinished
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+
+class _PriceCeiling:
+    """Running top-n of trip totals. Once n trips are in, no trip dearer than the n-th cheapest can make the cut."""
+
+    def __init__(self, n: int):
+        self.n = n
+        self.queries_capped = 0
+        self._totals = []  # max-heap (negated) of the n cheapest totals so far
+
+    @property
+    def value(self) -> int | None:
+        """The n-th cheapest total so far, rounded up to whole euros (priceValueTo), or None until n are seen."""
+        if self.n <= 0 or len(self._totals) < self.n:
+            return None
+        return math.ceil(-self._totals[0])
+
+    def add(self, trips) -> None:
+        for trip in trips or ():
+            total = trip.outbound.price + trip.inbound.price
+            if len(self._totals) < self.n:
+                heapq.heappush(self._totals, -total)
+            elif total < -self._totals[0]:
+                heapq.heapreplace(self._totals, -total)
+
+    def apply(self, query: LogicalQuery) -> LogicalQuery:
+        """The query with max_price lowered to the current ceiling, if there is one."""
+        ceiling = self.value
+        if ceiling is None or (query.max_price is not None and query.max_price <= ceiling):
+            return query
+        self.queries_capped += 1
+        return replace(query, max_price=ceiling)
+
+
+async def _fetch_trips_with_ceiling(
+    queries: list[LogicalQuery],
+    ceiling: _PriceCeiling,
+    concurrency: int,
+    cache: SQLiteResponseCache | None = None,
+    adaptive: bool = False,
+    metrics: Metrics | None = None,
+) -> list[list]:
+    """Like _fetch_trips_concurrently, but each query is capped at the price ceiling when it is sent."""
+    async with _async_api(concurrency, cache, adaptive, metrics) as api:
+        # Queries wait for a slot here rather than in the client, so they pick up the ceiling as late as possible
+        slots = asyncio.Semaphore(concurrency)
+
+        async def fetch(query):
+            async with slots:
+                trips = await ceiling.apply(query).to_query().run(api)
+            ceiling.add(trips)
+            return trips
+
+        results = await asyncio.gather(*(fetch(q) for q in queries))
+        _report_concurrency(api)
+        return results
+
+
+def collect_outbound_flights(
+    days_ahead: int | None = None,
+    concurrency: int = 0,
+    coalesce_days: int = 0,
+    cache: SQLiteResponseCache | None = None,
+    limit: int | None = None,
+    adaptive: bool = False,
+    metrics: Metrics | None = None,
+    price_pushdown: bool = False,
+    parse_processes: int = 0,
+) -> list[tuple[object, object, float]]:
+    """Collect return trips from Weeze/Köln. Only the departure must match: Thu after 5pm or Fri after 11pm.
+    Return is 3–4 nights later (any time of day). Uses API time windows so we get trips in those slots.
+    With concurrency > 0 the queries run on AsyncRyanair with that many in flight; otherwise one after another.
+    With adaptive, concurrency is the maximum and an AIMD controller adjusts the in-flight limit to the upstream.
+    With coalesce_days > 0, searches on adjacent days with the same time and return windows are merged into requests
+    spanning up to that many days (fewer calls, but only the cheapest fare per destination within each merged window
+    is seen). The Thu and Fri searches of OUTBOUND_SCHEDULE differ in both, so they are always fetched separately.
+    With a cache, responses fetched by earlier runs (still within their TTL) are reused.
+    With a limit, only the `limit` cheapest trips are returned (picked with a FareFrame when numpy is installed).
+    With metrics, the Ryanair client records its requests, retries, cache hits and parsing in it.
+    With price_pushdown and a limit, queries are capped (priceValueTo) at the `limit`-th cheapest total seen so far,
+    so later responses only carry trips that can still make the cut (not combined with coalesce_days).
+    With parse_processes > 0 (and numpy), responses are parsed in that many worker processes into one FareFrame and
+    only the selected trips are built; concurrency > 0 then fetches them on that many threads.
+    Returns list of (outbound, return_flight, outbound_price).
+    """
+    n_days = days_ahead if days_ahead is not None else DAYS_AHEAD
+    queries = _outbound_trip_queries(n_days)
+    ceiling = _PriceCeiling(limit) if price_pushdown and limit is not None and coalesce_days <= 0 else None
+    if ceiling is not None:
+        if concurrency > 0:
+            results = asyncio.run(
+                _fetch_trips_with_ceiling([q for _, _, q in queries], ceiling, concurrency, cache, adaptive, metrics)
             )
-            if trips:
-                for t in trips:
-                    t._origin_airport = airport_name
-                    t._origin_code = airport_code
-                    ob = t.outbound
-                    ob._origin_airport = t._origin_airport
-                    ob._origin_code = t._origin_code
-                    outbound.append((ob, t.inbound, ob.price))
-    outbound.sort(key=lambda x: (x[2] + x[1].price, x[0].departureTime.date(), x[0].destination))
-    return outbound
+        else:
+            api = Ryanair(currency="EUR", cache=cache, metrics=metrics)
+            results = []
+            for _, _, q in queries:
+                results.append(ceiling.apply(q).to_query().run(api))
+                ceiling.add(results[-1])
+        print(f"Price pushdown: {ceiling.queries_capped} of {len(queries)} queries capped (final ceiling {ceiling.value}€)", file=sys.stderr)
+    elif coalesce_days > 0:
+        plan = plan_queries([q for _, _, q in queries], max_span_days=coalesce_days)
+        print(f"Query planner: {len(plan.upstream)} upstream calls for {len(queries)} queries ({plan.calls_saved} saved)", file=sys.stderr)
+        if concurrency > 0:
+            results = asyncio.run(_execute_plan_concurrently(plan, concurrency, cache, adaptive, metrics))
+        else:
+            results = plan.execute(Ryanair(currency="EUR", cache=cache, metrics=metrics))
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+    elif parse_processes > 0 and _FRAME_AVAILABLE:
+        frame = _sweep_into_frame(queries, parse_processes, concurrency, cache, metrics)
+        if limit is not None:
+            frame = frame.top_k(limit)
+        outbound = [(t.outbound, t.inbound, t.outbound.price) for t in frame.to_list()]
+        outbound.sort(key=_trip_rank)
+        return outbound
+    elif concurrency > 0:
+        results = asyncio.run(
+            _fetch_trips_concurrently([q.to_query() for _, _, q in queries], concurrency, cache, adaptive, metrics)
+        )
+    else:
+        api = Ryanair(currency="EUR", cache=cache, metrics=metrics)
+        results = [q.to_query().run(api) for _, _, q in queries]
+    all_trips = []
+    for (airport_code, airport_name, _), trips in zip(queries, results):
+        if trips:
+            all_trips.extend(t.with_search_origin(airport_code, airport_name) for t in trips)
+    if limit is not None and _FRAME_AVAILABLE:
+        all_trips = FareFrame.from_fares(all_trips).top_k(limit).to_list()
+    outbound = [(t.outbound, t.inbound, t.outbound.price) for t in all_trips]
+    outbound.sort(key=_trip_rank)
+    return outbound[:limit] if limit is not None else outbound
+
+
+def _sweep_into_frame(queries, processes: int, threads: int, cache, metrics) -> "FareFrame":
+    """Fetch the raw responses to `queries` (on `threads` threads, or one after another) while worker processes
+    parse them into one FareFrame, labelled with the airport each query was made from."""
+    api = Ryanair(currency="EUR", cache=cache, metrics=metrics)
+    search_origins = [(airport_code, airport_name) for airport_code, airport_name, _ in queries]
+    logical = [q for _, _, q in queries]
+
+    def fetch(q):
+        return api.get_fares_body(q.to_query())
+
+    with FareParserPool(processes) as pool:
+        if threads > 0:
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                return pool.parse(executor.map(fetch, logical), is_return=True, search_origins=search_origins)
+        return pool.parse(map(fetch, logical), is_return=True, search_origins=search_origins)
+
+
+def _trip_rank(trip: tuple[object, object, float]) -> tuple:
+    """Sort key of an (outbound, return_flight, outbound_price) trip: total price, then date and destination."""
+    ob, ib, price = trip
+    return price + ib.price, ob.departureTime.date(), ob.destination
+
+
+def _verification_query(ob, ib) -> LogicalQuery:
+    """A query for exactly this trip's origin, destination and dates (the cheapest such trip may be another flight)."""
+    time_from, time_to = OUTBOUND_SCHEDULE.get(ob.departureTime.weekday(), ("00:00", "23:59"))
+    return LogicalQuery(
+        ob.origin,
+        ob.departureTime.date(), ob.departureTime.date(),
+        time_from=time_from,
+        time_to=time_to,
+        return_date_from=ib.departureTime.date(),
+        return_date_to=ib.departureTime.date(),
+        destination_airport=ob.destination,
+    )
+
+
+def _run_or_exception(query: Query, api):
+    try:
+        return query.run(api)
+    except Exception as e:
+        return e
+
+
+def verify_live(
+    candidates: list[tuple[object, object, float]],
+    limit: int,
+    margin: int = 5,
+    concurrency: int = 0,
+    adaptive: bool = False,
+    metrics: Metrics | None = None,
+    max_checks: int | None = None,
+) -> list[tuple[object, object, float]]:
+    """Re-query the `limit` + `margin` cheapest of `candidates` (ranked trips from a possibly stale sweep) live, each
+    with exact origin/destination/date filters, and return the `limit` cheapest at their live prices.
+    Candidates that sold out or got dearer drop down or out; as long as an unchecked candidate was cheaper in the sweep
+    than the live `limit`-th trip, the next `margin` of those are checked too, up to `max_checks` re-queries in all
+    (default: three times `limit` + `margin`) in case the sweep is too stale to rank by.
+    A candidate whose re-query fails is kept at its sweep price, so one failure doesn't lose the whole sweep.
+    """
+    if max_checks is None:
+        max_checks = 3 * (limit + margin)
+    api = Ryanair(currency="EUR", metrics=metrics) if concurrency <= 0 else None
+    verified = []
+    repriced = gone = failed = 0
+    batch = candidates[: limit + margin]
+    checked = len(batch)
+    while batch:
+        queries = [_verification_query(ob, ib).to_query() for ob, ib, _ in batch]
+        if api is None:
+            results = asyncio.run(
+                _fetch_trips_concurrently(queries, concurrency, None, adaptive, metrics, return_exceptions=True)
+            )
+        else:
+            results = [_run_or_exception(q, api) for q in queries]
+        for (ob, ib, price), trips in zip(batch, results):
+            if isinstance(trips, Exception):
+                failed += 1
+                print(f"Live check of {ob.origin}→{ob.destination} failed, keeping the cached price: {trips}", file=sys.stderr)
+                verified.append((ob, ib, price))
+                continue
+            if not trips:
+                gone += 1
+                continue
+            fresh = min(trips, key=lambda t: t.outbound.price + t.inbound.price)
+            fresh = fresh.with_search_origin(ob.searchOrigin, ob.searchOriginName)
+            if round(fresh.outbound.price + fresh.inbound.price, 2) != round(price + ib.price, 2):
+                repriced += 1
+            verified.append((fresh.outbound, fresh.inbound, fresh.outbound.price))
+        verified.sort(key=_trip_rank)
+        cutoff = _trip_rank(verified[limit - 1])[0] if len(verified) >= limit else float("inf")
+        batch = []
+        while (
+            checked < min(len(candidates), max_checks)
+            and len(batch) < max(margin, 1)
+            and _trip_rank(candidates[checked])[0] < cutoff
+        ):
+            batch.append(candidates[checked])
+            checked += 1
+    print(
+        f"Live check: {checked} of {len(candidates)} candidates re-queried, {repriced} repriced, {gone} gone, "
+        f"{failed} failed (kept at cached prices)",
+        file=sys.stderr,
+    )
+    return verified[:limit]
+
+
+def _flight_json(flight) -> dict:
+    return {
+        "departure": flight.departureTime.isoformat(),
+        "origin": flight.origin,
+        "origin_full": flight.originFull,
+        "destination": flight.destination,
+        "destination_full": flight.destinationFull,
+        "price_eur": flight.price,
+    }
+
+
+async def _stream_round_trips(days_ahead: int | None, concurrency: int, cache_path: str | None) -> None:
+    """Print every round trip as one JSON line as soon as it is found (flights only, unranked)."""
+    cache = SQLiteResponseCache(cache_path) if cache_path else None
+    async for ob, ib, price in iter_round_trips(days_ahead=days_ahead, concurrency=concurrency or 4, cache=cache):
+        print(json.dumps({"outbound": _flight_json(ob), "return": _flight_json(ib)}, ensure_ascii=False), flush=True)
 
 
 def run(
@@ -638,15 +1034,79 @@ def run(
     hotels_per_flight: int = 3,
     days_ahead: int | None = None,
     email: str | None = None,
+    concurrency: int = 0,
+    coalesce_days: int = 0,
+    cache_path: str | None = None,
+    adaptive_concurrency: bool = False,
+    metrics_path: str | None = None,
+    price_pushdown: bool = False,
+    verify_margin: int | None = None,
+    sweep_max_age: float = 6.0,
+    currencies: list[str] | None = None,
+    parse_processes: int = 0,
 ) -> None:
+    if verify_margin is not None and price_pushdown:
+        # Capped queries aren't the ones the sweep cached, so they would all go to the live API
+        raise ValueError("price_pushdown can't be combined with live verification")
     t_start = time.perf_counter()
+    # Fares are fetched once, in EUR, and converted locally to any other currencies asked for
+    currencies = [c for c in currencies or () if c != "EUR"]
+    fx = None
+    if currencies:
+        try:
+            fx = load_rates("EUR")
+        except FxError as e:
+            print(f"No exchange rates, showing EUR only: {e}", file=sys.stderr)
+        else:
+            unknown = [c for c in currencies if c not in fx.rates]
+            if unknown:
+                print(f"No exchange rates for {', '.join(unknown)}", file=sys.stderr)
+            currencies = [c for c in currencies if c in fx.rates]
 
     # 1. Collect return trips (only departure restricted: Thu after 5pm / Fri after 11pm; return 3–4 nights later, any time)
     t0 = time.perf_counter()
-    outbound_flights = collect_outbound_flights(days_ahead=days_ahead)
+    metrics = Metrics() if metrics_path else None
+    if verify_margin is not None:
+        # Broad sweep from a cache that may be hours old, then only the shortlist is checked live
+        # Only this run accepts entries that old: they are stored with the usual TTLs, so plain --cache runs
+        # sharing the file still treat them as fresh for an hour only
+        cache = SQLiteResponseCache(
+            cache_path or DEFAULT_CACHE_PATH, max_ages={"roundTripFares": sweep_max_age * 60 * 60}
+        )
+        candidates = collect_outbound_flights(
+            days_ahead=days_ahead,
+            concurrency=concurrency,
+            coalesce_days=coalesce_days,
+            cache=cache,
+            adaptive=adaptive_concurrency,
+            metrics=metrics,
+            parse_processes=parse_processes,
+        )
+        cheapest_flights = verify_live(
+            candidates,
+            num_cheapest_flights,
+            margin=verify_margin,
+            concurrency=concurrency,
+            adaptive=adaptive_concurrency,
+            metrics=metrics,
+        )
+    else:
+        cache = SQLiteResponseCache(cache_path) if cache_path else None
+        # 2. Only the N cheapest are needed, already sorted by price
+        cheapest_flights = collect_outbound_flights(
+            days_ahead=days_ahead,
+            concurrency=concurrency,
+            coalesce_days=coalesce_days,
+            cache=cache,
+            limit=num_cheapest_flights,
+            adaptive=adaptive_concurrency,
+            metrics=metrics,
+            price_pushdown=price_pushdown,
+            parse_processes=parse_processes,
+        )
     t_flights = time.perf_counter() - t0
-    # 2. Already sorted by price; take the N cheapest
-    cheapest_flights = outbound_flights[:num_cheapest_flights]
+    if metrics is not None:
+        Path(metrics_path).write_text(metrics.to_prometheus(), encoding="utf-8")
 
     # 3. Fetch hotels for those flights (stay = outbound date to return date)
     hotel_results = []
@@ -708,6 +1168,7 @@ def run(
                             "destination_full": r["return_flight"].destinationFull,
                             "price_eur": r["return_flight"].price,
                         },
+                        "total_prices": _total_prices(r["flight"], r["return_flight"], fx, currencies),
                         "hotel_arrival": r["arrival"],
                         "hotel_departure": r["departure"],
                         "hotels": r["hotels"],
@@ -735,10 +1196,13 @@ def run(
                             "destination_full": ib.destinationFull,
                             "price_eur": ib.price,
                         },
+                        "total_prices": _total_prices(ob, ib, fx, currencies),
                     }
                     for ob, ib, price in cheapest_flights
                 ],
             }
+        if fx is not None and currencies:
+            out["exchange_rates"] = {"base": fx.base, "as_of": fx.as_of.isoformat(), "source": fx.source}
         print(json.dumps(out, indent=2, ensure_ascii=False, default=str))
         return
 
@@ -749,6 +1213,8 @@ def run(
             adults=adults,
             travel_data=travel_data,
             timings=timings,
+            fx=fx,
+            currencies=currencies,
         )
         if not email:
             return
@@ -759,6 +1225,8 @@ def run(
             adults=adults,
             travel_data=travel_data,
             timings=timings,
+            fx=fx,
+            currencies=currencies,
         )
         _send_email_html(html_str, email)
         if output_html:
@@ -790,9 +1258,9 @@ def run(
             total = price + ret.price
             nights = (ret.departureTime.date() - outbound.departureTime.date()).days
             days = nights + 1
-            out_leg = f"{out_weekday}{out_dur}  {price}€  {origin_city} ({outbound._origin_code})→{dest_city} ({outbound.destination})"
+            out_leg = f"{out_weekday}{out_dur}  {price}€  {origin_city} ({outbound.searchOrigin})→{dest_city} ({outbound.destination})"
             ret_leg = f"{ret_weekday}{ret_dur}  {ret.price}€  {ret_origin_city} ({ret.origin})→{ret_dest_city} ({ret.destination})"
-            print(f"{i}. {dest_city} ({total:.2f}€) — {days} days, {nights} nights")
+            print(f"{i}. {dest_city} ({total:.2f}€{_other_currencies_str(outbound, ret, fx, currencies)}) — {days} days, {nights} nights")
             print("Flight")
             print(f"   {out_leg}{LEG_SEP}{ret_leg}")
             ryanair_url = _ryanair_booking_url(
@@ -830,9 +1298,9 @@ def run(
             total = price + ib.price
             nights = (ib.departureTime.date() - ob.departureTime.date()).days
             days = nights + 1
-            out_leg = f"{out_weekday}{out_dur}  {price}€  {origin_city} ({ob._origin_code})→{dest_city} ({ob.destination})"
+            out_leg = f"{out_weekday}{out_dur}  {price}€  {origin_city} ({ob.searchOrigin})→{dest_city} ({ob.destination})"
             ret_leg = f"{ret_weekday}{ret_dur}  {ib.price}€  {ret_origin_city} ({ib.origin})→{ret_dest_city} ({ib.destination})"
-            print(f"{i}. {dest_city} ({total:.2f}€) — {days} days, {nights} nights")
+            print(f"{i}. {dest_city} ({total:.2f}€{_other_currencies_str(ob, ib, fx, currencies)}) — {days} days, {nights} nights")
             print("Flight")
             print(f"   {out_leg}{LEG_SEP}{ret_leg}")
             ryanair_url = _ryanair_booking_url(
@@ -845,6 +1313,8 @@ def run(
             _print_weather_attractions_text(dest_city, ob.departureTime.date(), ib.departureTime.date(), weather_by_key, attractions_by_dest)
         if not cheapest_flights:
             print("(No round trips found for Thu after 5pm / Fri after 11pm from Weeze or Köln.)")
+    if fx is not None and currencies:
+        print(f"Exchange rates ({fx.source or fx.base}) as of {fx.as_of:%Y-%m-%d %H:%M} UTC.")
     if not TRIVAGO_AVAILABLE and fetch_hotels:
         print("(Trivago MCP not installed: pip install 'mcp[cli]' for hotels.)", file=sys.stderr)
     elif not hotel_results and fetch_hotels and cheapest_flights:
@@ -907,7 +1377,89 @@ def main() -> None:
         metavar="ADDRESS",
         help="Send results as HTML email to ADDRESS (Gmail: set GMAIL_USER and GMAIL_APP_PASSWORD). Example: --email you@example.com",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Run up to N Ryanair fare queries in parallel (needs httpx; default: 0 = one after another)",
+    )
+    parser.add_argument(
+        "--adaptive-concurrency",
+        action="store_true",
+        help="Treat --concurrency N as a maximum and adapt the number of queries in flight to Ryanair's responses (AIMD)",
+    )
+    parser.add_argument(
+        "--coalesce-days",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Merge searches on adjacent days with the same time and return windows into requests spanning up to N days (fewer API calls; default: 0 = off)",
+    )
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        const=DEFAULT_CACHE_PATH,
+        default=None,
+        metavar="PATH",
+        dest="cache_path",
+        help=f"Reuse Ryanair responses from earlier runs via an SQLite cache shared between processes (default path: {DEFAULT_CACHE_PATH})",
+    )
+    parser.add_argument(
+        "--metrics",
+        type=str,
+        default=None,
+        metavar="PATH",
+        dest="metrics_path",
+        help="Write Ryanair client metrics (requests, latency, retries, cache hits, parse time) to PATH in Prometheus text format",
+    )
+    parser.add_argument(
+        "--verify-live",
+        nargs="?",
+        type=int,
+        const=5,
+        default=None,
+        metavar="M",
+        dest="verify_margin",
+        help="Take the broad sweep from the response cache (see --sweep-max-age, path from --cache) and re-query only the N cheapest trips plus M more (default: 5) live before showing them",
+    )
+    parser.add_argument(
+        "--sweep-max-age",
+        type=float,
+        default=6.0,
+        metavar="HOURS",
+        help="With --verify-live, how long fares cached by the sweep are reused (default: 6)",
+    )
+    parser.add_argument(
+        "--currencies",
+        type=lambda value: [c.strip().upper() for c in value.split(",") if c.strip()],
+        default=None,
+        metavar="CODES",
+        help="Also show trip totals in these currencies, e.g. GBP,PLN (fares are fetched once in EUR and converted with ECB reference rates cached for 12 hours)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Print every round trip as a JSON line as soon as its query completes, unranked and without hotels (--concurrency N queries in flight, default 4)",
+    )
+    parser.add_argument(
+        "--price-pushdown",
+        action="store_true",
+        help="Cap later fare queries at the N-th cheapest trip found so far (priceValueTo), so responses only carry trips that can still make the top N (ignored with --coalesce-days; not allowed with --verify-live)",
+    )
+    parser.add_argument(
+        "--parse-processes",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Parse fare responses in N worker processes into shared-memory columns, building only the N cheapest trips (needs numpy; --concurrency N then fetches on N threads; ignored with --price-pushdown and --coalesce-days)",
+    )
     args = parser.parse_args()
+    if args.verify_margin is not None and args.price_pushdown:
+        parser.error("--price-pushdown can't be combined with --verify-live")
+    if args.stream:
+        asyncio.run(_stream_round_trips(args.days_ahead, args.concurrency, args.cache_path))
+        return
     run(
         output_json=args.json,
         output_html=args.html,
@@ -918,6 +1470,16 @@ def main() -> None:
         hotels_per_flight=args.cheapest_hotels_per_flight,
         days_ahead=args.days_ahead,
         email=args.email,
+        concurrency=args.concurrency,
+        coalesce_days=args.coalesce_days,
+        cache_path=args.cache_path,
+        adaptive_concurrency=args.adaptive_concurrency,
+        metrics_path=args.metrics_path,
+        price_pushdown=args.price_pushdown,
+        verify_margin=args.verify_margin,
+        sweep_max_age=args.sweep_max_age,
+        currencies=args.currencies,
+        parse_processes=args.parse_processes,
     )
 
 
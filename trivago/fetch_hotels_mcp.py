@@ -126,6 +126,42 @@ async def get_location_suggestion(session: ClientSession, query: str) -> tuple[i
     return None
 
 
+def extract_array_from_text(s: str) -> list | None:
+    """Extract the first JSON array from tool output text, preferring the one after "output:" if present."""
+    # Server may return "map[output:[\n  {...},\n  {...}\n]]" - find the array after "output:["
+    start_marker = "output:["
+    idx = s.find(start_marker)
+    if idx != -1:
+        start = idx + len("output:")  # position of "["
+        depth = 0
+        for i in range(start, len(s)):
+            if s[i] == "[":
+                depth += 1
+            elif s[i] == "]":
+                depth -= 1
+                if depth == 0:
+                    try:
+                        return json.loads(s[start : i + 1])
+                    except json.JSONDecodeError:
+                        break
+        return None
+    # Fallback: first "[" to matching "]"
+    start = s.find("[")
+    if start != -1:
+        depth = 0
+        for i in range(start, len(s)):
+            if s[i] == "[":
+                depth += 1
+            elif s[i] == "]":
+                depth -= 1
+                if depth == 0:
+                    try:
+                        return json.loads(s[start : i + 1])
+                    except json.JSONDecodeError:
+                        break
+    return None
+
+
 async def search_accommodations(
     session: ClientSession,
     location_id: int,
@@ -164,40 +200,6 @@ async def search_accommodations(
     full_text = "\n".join(all_text_parts) if all_text_parts else ""
     accommodations = []
 
-    def extract_array_from_text(s: str) -> list | None:
-        # Server may return "map[output:[\n  {...},\n  {...}\n]]" - find the array after "output:["
-        start_marker = "output:["
-        idx = s.find(start_marker)
-        if idx != -1:
-            start = idx + len("output:")  # position of "["
-            depth = 0
-            for i in range(start, len(s)):
-                if s[i] == "[":
-                    depth += 1
-                elif s[i] == "]":
-                    depth -= 1
-                    if depth == 0:
-                        try:
-                            return json.loads(s[start : i + 1])
-                        except json.JSONDecodeError:
-                            break
-            return None
-        # Fallback: first "[" to matching "]"
-        start = s.find("[")
-        if start != -1:
-            depth = 0
-            for i in range(start, len(s)):
-                if s[i] == "[":
-                    depth += 1
-                elif s[i] == "]":
-                    depth -= 1
-                    if depth == 0:
-                        try:
-                            return json.loads(s[start : i + 1])
-                        except json.JSONDecodeError:
-                            break
-        return None
-
     for part in all_text_parts if all_text_parts else []:
         try:
             data = json.loads(part)